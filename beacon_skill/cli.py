@@ -2394,7 +2394,7 @@ def cmd_match_history(args: argparse.Namespace) -> int:
 # ── Loop Mode ──
 
 def cmd_loop(args: argparse.Namespace) -> int:
-    from .inbox import read_inbox, mark_read
+    from .inbox import read_inbox, mark_read_many
 
     cfg = load_config()
     interval = float(args.interval)
@@ -2707,6 +2707,7 @@ def cmd_loop(args: argparse.Namespace) -> int:
             # ── Process inbox ──
             entries = read_inbox(since=last_check, unread_only=True)
             last_check = now
+            read_marks = []  # nonces marked read, saved once per tick
 
             for entry in entries:
                 env = entry.get("envelope") or {}
@@ -2808,7 +2809,7 @@ def cmd_loop(args: argparse.Namespace) -> int:
                         elif act.get("action") == "mark_read":
                             nonce = act.get("nonce") or env.get("nonce", "")
                             if nonce:
-                                mark_read(nonce)
+                                read_marks.append(nonce)
                         elif act.get("action") in ("reply", "emit") and executor and autonomy.get("auto_reply", False):
                             action_id = executor.queue_rule_action(act, entry)
                             if action_id:
@@ -2817,7 +2818,10 @@ def cmd_loop(args: argparse.Namespace) -> int:
 
                 # Auto-ack
                 if auto_ack and env and env.get("nonce"):
-                    mark_read(env["nonce"])
+                    read_marks.append(env["nonce"])
+
+            if read_marks:
+                mark_read_many(read_marks)
 
             # Prune stale roster entries
             if presence_mgr:
@@ -11,31 +11,44 @@ All payments and escrow use RustChain signed RTC transfers.
 import hashlib
 import json
 import os
+import sys
 import time
 from pathlib import Path
-from typing import Any, Dict, List, Optional
+from types import MappingProxyType
+from typing import Any, Dict, List, Mapping, Optional
+
+from .storage import _atomic_write, _iter_jsonl
 
 
 # ── Valid state transitions ──
 
 VALID_TRANSITIONS = {
-    "listed":     ["offered", "terminated"],
-    "offered":    ["accepted", "listed", "terminated"],
-    "accepted":   ["active", "terminated"],
-    "active":     ["renewed", "expired", "breached", "terminated", "settled"],
-    "renewed":    ["expired", "breached", "terminated", "settled"],
-    "expired":    ["settled"],
-    "breached":   ["settled", "terminated"],
-    "terminated": ["settled"],
+    "listed":     frozenset({"offered", "terminated"}),
+    "offered":    frozenset({"accepted", "listed", "terminated"}),
+    "accepted":   frozenset({"active", "terminated"}),
+    "active":     frozenset({"renewed", "expired", "breached", "terminated", "settled"}),
+    "renewed":    frozenset({"expired", "breached", "terminated", "settled"}),
+    "expired":    frozenset({"settled"}),
+    "breached":   frozenset({"settled", "terminated"}),
+    "terminated": frozenset({"settled"}),
 }
 
-CONTRACT_TYPES = ("rent", "buy", "lease_to_own")
+CONTRACT_TYPES = frozenset({"rent", "buy", "lease_to_own"})
+
+_FUNDABLE_STATES = frozenset({"accepted", "active", "renewed"})
+_ACTIVE_STATES = frozenset({"active", "renewed"})
+_TRANSFERABLE_STATES = frozenset({"active", "settled"})
+_OWNERSHIP_TYPES = frozenset({"buy", "lease_to_own"})
 
 
 def _generate_contract_id() -> str:
     """Generate a unique contract identifier."""
-    rand = os.urandom(8).hex()
-    return f"ctr_{rand[:12]}"
+    return "ctr_" + os.urandom(6).hex()
+
+
+def _canonical_event(event: Dict) -> str:
+    """Canonical JSON encoding of a single contract event."""
+    return json.dumps(event, sort_keys=True, default=str)
 
 
 def _history_hash(events: List[Dict]) -> str:
@@ -44,6 +57,21 @@ def _history_hash(events: List[Dict]) -> str:
     return hashlib.sha256(payload.encode()).hexdigest()[:16]
 
 
+def _history_hash_canon(canon: List[str]) -> str:
+    """Same digest as ``_history_hash`` built from pre-encoded events.
+
+    ``json.dumps`` of a list is its items joined by ", " inside brackets,
+    so joining cached per-event encodings yields identical bytes.
+    """
+    payload = "[" + ", ".join(canon) + "]"
+    return hashlib.sha256(payload.encode()).hexdigest()[:16]
+
+
+def _view(ctr: Dict) -> Mapping[str, Any]:
+    """Read-only view of a stored contract, avoiding a dict copy."""
+    return MappingProxyType(ctr)
+
+
 class ContractManager:
     """Manages agent property contracts — rent, buy, lease-to-own."""
 
@@ -54,76 +82,107 @@ class ContractManager:
         else:
             self._data_dir = Path.home() / ".beacon"
         self._data_dir.mkdir(parents=True, exist_ok=True)
+        self._contracts_file = self._data_dir / "contracts.json"
+        self._escrow_file = self._data_dir / "escrow.json"
+        self._log_file = self._data_dir / "contract_log.jsonl"
+        self._revenue_file = self._data_dir / "revenue.jsonl"
 
         self._contracts: Dict[str, Dict] = {}
         self._escrow: Dict[str, Dict] = {}
+        # contract_id -> canonical JSON of each event (not persisted)
+        self._canon_events: Dict[str, List[str]] = {}
         self._load()
 
     # ── Persistence ──
 
     def _contracts_path(self) -> Path:
-        return self._data_dir / "contracts.json"
+        return self._contracts_file
 
     def _escrow_path(self) -> Path:
-        return self._data_dir / "escrow.json"
+        return self._escrow_file
 
     def _log_path(self) -> Path:
-        return self._data_dir / "contract_log.jsonl"
+        return self._log_file
 
     def _revenue_path(self) -> Path:
-        return self._data_dir / "revenue.jsonl"
+        return self._revenue_file
 
     def _load(self):
-        cp = self._contracts_path()
+        cp = self._contracts_file
         if cp.exists():
             with cp.open("r", encoding="utf-8") as f:
                 self._contracts = json.load(f)
-        ep = self._escrow_path()
+            for ctr in self._contracts.values():
+                # Interned so state/type checks hit the identity fast path
+                # against the module's literal constants.
+                ctr["state"] = sys.intern(ctr["state"])
+                ctr["type"] = sys.intern(ctr["type"])
+                if "breached_by" not in ctr:
+                    # Backfill stores written before the flag existed
+                    ctr["breached_by"] = ""
+                    for event in reversed(ctr.get("events", [])):
+                        if event.get("type") == "breached":
+                            ctr["breached_by"] = event.get("by", "")
+                            break
+        ep = self._escrow_file
         if ep.exists():
             with ep.open("r", encoding="utf-8") as f:
                 self._escrow = json.load(f)
 
     def _save(self):
-        with self._contracts_path().open("w", encoding="utf-8") as f:
-            json.dump(self._contracts, f, indent=2, default=str)
-        with self._escrow_path().open("w", encoding="utf-8") as f:
-            json.dump(self._escrow, f, indent=2, default=str)
+        _atomic_write(self._contracts_file,
+                      json.dumps(self._contracts, indent=2, default=str))
+        _atomic_write(self._escrow_file,
+                      json.dumps(self._escrow, indent=2, default=str))
 
     def _append_log(self, entry: Dict):
-        path = self._log_path()
+        path = self._log_file
         path.parent.mkdir(parents=True, exist_ok=True)
         with path.open("a", encoding="utf-8") as f:
             f.write(json.dumps(entry, sort_keys=True, default=str) + "\n")
 
     def _append_revenue(self, entry: Dict):
-        path = self._revenue_path()
+        path = self._revenue_file
         path.parent.mkdir(parents=True, exist_ok=True)
         with path.open("a", encoding="utf-8") as f:
             f.write(json.dumps(entry, sort_keys=True, default=str) + "\n")
 
+    def _rehash(self, ctr: Dict) -> None:
+        """Refresh history_hash, encoding only events not yet cached."""
+        events = ctr["events"]
+        canon = self._canon_events.setdefault(ctr["id"], [])
+        if len(canon) > len(events):
+            del canon[:]
+        for event in events[len(canon):]:
+            canon.append(_canonical_event(event))
+        ctr["history_hash"] = _history_hash_canon(canon)
+
     # ── State transitions ──
 
     def _transition(self, contract_id: str, new_state: str,
-                    by: str = "", reason: str = "") -> Dict:
+                    by: str = "", reason: str = "",
+                    extra: Optional[Dict] = None) -> Dict:
         """Apply a state transition to a contract."""
         ctr = self._contracts.get(contract_id)
         if not ctr:
             return {"error": f"Contract {contract_id} not found"}
 
         current = ctr["state"]
-        allowed = VALID_TRANSITIONS.get(current, [])
+        allowed = VALID_TRANSITIONS.get(current, frozenset())
         if new_state not in allowed:
             return {"error": f"Invalid transition: {current} -> {new_state}",
-                    "allowed": allowed}
+                    "allowed": sorted(allowed)}
 
         now = int(time.time())
         event = {"ts": now, "type": new_state, "by": by}
         if reason:
             event["reason"] = reason
+        if extra:
+            event.update(extra)
 
         ctr["state"] = new_state
         ctr["events"].append(event)
-        ctr["history_hash"] = _history_hash(ctr["events"])
+        self._rehash(ctr)
 
         self._append_log({
             "contract_id": contract_id,
@@ -142,7 +201,7 @@ class ContractManager:
                    terms: Optional[Dict] = None, penalty_pct: float = 10.0) -> Dict:
         """List an agent for rent, sale, or lease-to-own."""
         if contract_type not in CONTRACT_TYPES:
-            return {"error": f"Invalid type: {contract_type}. Must be one of {CONTRACT_TYPES}"}
+            return {"error": f"Invalid type: {contract_type}. Must be one of {sorted(CONTRACT_TYPES)}"}
         if price_rtc <= 0:
             return {"error": "Price must be positive"}
         if contract_type == "rent" and duration_days <= 0:
@@ -170,6 +229,7 @@ class ContractManager:
             "activated_at": 0,
             "expires_at": 0,
             "settled_at": 0,
+            "breached_by": "",
             "history_hash": "",
             "events": [{"ts": now, "type": "listed", "by": agent_id}],
         }
@@ -182,8 +242,8 @@ class ContractManager:
                                                price_rtc * 12) if terms else price_rtc * 12,
             }
 
-        contract["history_hash"] = _history_hash(contract["events"])
         self._contracts[cid] = contract
+        self._rehash(contract)
         self._save()
 
         return {"ok": True, "contract_id": cid, "state": "listed",
@@ -250,7 +310,7 @@ class ContractManager:
         ctr = self._contracts.get(contract_id)
         if not ctr:
             return {"error": f"Contract {contract_id} not found"}
-        if ctr["state"] not in ("accepted", "active", "renewed"):
+        if ctr["state"] not in _FUNDABLE_STATES:
             return {"error": f"Cannot fund escrow in state: {ctr['state']}"}
 
         now = int(time.time())
@@ -295,10 +355,8 @@ class ContractManager:
         ctr = self._contracts.get(contract_id)
         penalty = 0.0
         if ctr:
-            # Check if breach occurred at any point (state may have moved to settled)
-            was_breached = any(e.get("type") == "breached"
-                               for e in ctr.get("events", []))
-            if was_breached:
+            # Breach flag survives the move to settled
+            if ctr.get("breached_by"):
                 penalty = esc["amount_rtc"] * (ctr["penalty_pct"] / 100.0)
 
         release_amount = esc["amount_rtc"] - penalty
@@ -368,15 +426,16 @@ class ContractManager:
         if not ctr:
             return {"error": f"Contract {contract_id} not found"}
 
+        # Set before the transition so its single _save persists the flag;
+        # evidence rides on the transition event so it is hashed once.
+        prev_breacher = ctr.get("breached_by", "")
+        ctr["breached_by"] = breacher_id
         result = self._transition(contract_id, "breached",
-                                  by=breacher_id, reason=reason)
+                                  by=breacher_id, reason=reason,
+                                  extra={"evidence": evidence})
         if "error" in result:
+            ctr["breached_by"] = prev_breacher
             return result
-
-        # Record evidence in the event
-        ctr["events"][-1]["evidence"] = evidence
-        ctr["history_hash"] = _history_hash(ctr["events"])
-        self._save()
         return {"ok": True, "contract_id": contract_id, "state": "breached",
                 "breacher_id": breacher_id}
 
@@ -416,9 +475,9 @@ class ContractManager:
         ctr = self._contracts.get(contract_id)
         if not ctr:
             return {"error": f"Contract {contract_id} not found"}
-        if ctr["type"] not in ("buy", "lease_to_own"):
+        if ctr["type"] not in _OWNERSHIP_TYPES:
             return {"error": "Only buy/lease_to_own contracts support ownership transfer"}
-        if ctr["state"] not in ("active", "settled"):
+        if ctr["state"] not in _TRANSFERABLE_STATES:
             return {"error": f"Cannot transfer in state: {ctr['state']}"}
 
         # For lease_to_own, check completion
@@ -450,7 +509,7 @@ class ContractManager:
         ctr["events"].append({"ts": now, "type": "ownership_transferred",
                               "by": ctr["seller_id"],
                               "to": ctr["buyer_id"]})
-        ctr["history_hash"] = _history_hash(ctr["events"])
+        self._rehash(ctr)
         self._save()
 
         self._append_log({
@@ -479,22 +538,17 @@ class ContractManager:
 
     def revenue_summary(self, agent_id: Optional[str] = None) -> Dict:
         """Get revenue summary, optionally filtered by agent."""
-        path = self._revenue_path()
+        path = self._revenue_file
         if not path.exists():
             return {"total_rtc": 0.0, "records": 0, "entries": []}
 
-        entries = []
-        total = 0.0
-        with path.open("r", encoding="utf-8") as f:
-            for line in f:
-                line = line.strip()
-                if not line:
-                    continue
-                entry = json.loads(line)
-                if agent_id and entry.get("agent_id") != agent_id:
-                    continue
-                entries.append(entry)
-                total += entry.get("amount_rtc", 0.0)
+        if agent_id:
+            entries = [e for e in _iter_jsonl(path)
+                       if e.get("agent_id") == agent_id]
+        else:
+            entries = list(_iter_jsonl(path))
+        # Built-in sum over a list runs the reduction in C
+        total = sum([e.get("amount_rtc", 0.0) for e in entries])
 
         return {"total_rtc": round(total, 6), "records": len(entries),
                 "entries": entries}
@@ -527,10 +581,10 @@ class ContractManager:
                 result.append(dict(ctr))
         return result
 
-    def active_contracts(self) -> List[Dict]:
-        """List all active/renewed contracts."""
-        return [dict(c) for c in self._contracts.values()
-                if c["state"] in ("active", "renewed")]
+    def active_contracts(self) -> List[Mapping[str, Any]]:
+        """List all active/renewed contracts as read-only views (no copies)."""
+        return [_view(c) for c in self._contracts.values()
+                if c["state"] in _ACTIVE_STATES]
 
     def contract_history(self, contract_id: str) -> List[Dict]:
         """Get the full event history for a contract."""
@@ -560,11 +614,7 @@ class ContractManager:
         ctr = self._contracts.get(contract_id)
         if not ctr or not trust_mgr:
             return
-        breacher = ""
-        for event in reversed(ctr.get("events", [])):
-            if event.get("type") == "breached":
-                breacher = event.get("by", "")
-                break
+        breacher = ctr.get("breached_by", "")
         if not breacher:
             return
         other = ctr["buyer_id"] if breacher == ctr["seller_id"] else ctr["seller_id"]
@@ -4,21 +4,29 @@ Prevents duplicate contacts, enables follow-ups, detects stale threads.
 Conversation IDs are deterministic: same pair + topic always yields the same ID.
 """
 
+import functools
 import hashlib
+import heapq
 import json
 import time
 from pathlib import Path
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, List, Optional, Tuple
 
-from .storage import _dir
+from .storage import _dir, _iter_jsonl
 
 
 CONVERSATIONS_FILE = "conversations.jsonl"
 DEFAULT_STALE_S = 604800  # 7 days
+OPEN_STATES = ("initiated", "active")
 
 
+@functools.lru_cache(maxsize=4096)
 def _conv_id(agent_a: str, agent_b: str, topic: str) -> str:
-    """Deterministic conversation ID from sorted agent pair + topic."""
+    """Deterministic conversation ID from sorted agent pair + topic.
+
+    Memoized: polling loops hit the same (pair, topic) repeatedly. The
+    digest stays SHA-256 because IDs are persisted in conversations.jsonl.
+    """
     pair = "|".join(sorted([agent_a, agent_b]))
     raw = f"{pair}|{topic}"
     return "conv_" + hashlib.sha256(raw.encode("utf-8")).hexdigest()[:10]
@@ -31,7 +39,11 @@ class ConversationManager:
         self._dir = data_dir or _dir()
         self._my_id = my_agent_id
         self._conversations: Dict[str, Dict[str, Any]] = {}
+        # (last_message_ts, cid) for open conversations; entries are
+        # invalidated lazily when a newer message or state change lands.
+        self._active_heap: List[Tuple[int, str]] = []
         self._load()
+        self._rebuild_active_heap()
 
     def _conv_path(self) -> Path:
         return self._dir / CONVERSATIONS_FILE
@@ -41,41 +53,66 @@ class ConversationManager:
         path = self._conv_path()
         if not path.exists():
             return
-        for line in path.read_text(encoding="utf-8").splitlines():
-            line = line.strip()
-            if not line:
-                continue
-            try:
-                event = json.loads(line)
-            except Exception:
-                continue
+        handlers = {
+            "create": self._apply_create,
+            "message": self._apply_message,
+            "complete": self._apply_complete,
+            "stale": self._apply_stale,
+        }
+        get_handler = handlers.get
+        for event in _iter_jsonl(path):
             cid = event.get("conversation_id", "")
             if not cid:
                 continue
-            etype = event.get("event_type", "")
-            if etype == "create":
-                self._conversations[cid] = {
-                    "conversation_id": cid,
-                    "my_agent_id": event.get("my_agent_id", ""),
-                    "their_agent_id": event.get("their_agent_id", ""),
-                    "topic_key": event.get("topic_key", "general"),
-                    "state": "initiated",
-                    "messages": 0,
-                    "last_message_ts": event.get("ts", 0),
-                    "last_direction": "",
-                    "created_at": event.get("ts", 0),
-                }
-            elif etype == "message" and cid in self._conversations:
-                c = self._conversations[cid]
-                c["messages"] = c.get("messages", 0) + 1
-                c["last_message_ts"] = event.get("ts", 0)
-                c["last_direction"] = event.get("direction", "")
-                if c["state"] == "initiated":
-                    c["state"] = "active"
-            elif etype == "complete" and cid in self._conversations:
-                self._conversations[cid]["state"] = "completed"
-            elif etype == "stale" and cid in self._conversations:
-                self._conversations[cid]["state"] = "stale"
+            handler = get_handler(event.get("event_type", ""))
+            if handler is not None:
+                handler(cid, event)
+
+    def _apply_create(self, cid: str, event: Dict[str, Any]) -> None:
+        self._conversations[cid] = {
+            "conversation_id": cid,
+            "my_agent_id": event.get("my_agent_id", ""),
+            "their_agent_id": event.get("their_agent_id", ""),
+            "topic_key": event.get("topic_key", "general"),
+            "state": "initiated",
+            "messages": 0,
+            "last_message_ts": event.get("ts", 0),
+            "last_direction": "",
+            "created_at": event.get("ts", 0),
+        }
+
+    def _apply_message(self, cid: str, event: Dict[str, Any]) -> None:
+        c = self._conversations.get(cid)
+        if c is None:
+            return
+        # create always initializes "messages", so no default is needed
+        c["messages"] += 1
+        c["last_message_ts"] = event.get("ts", 0)
+        c["last_direction"] = event.get("direction", "")
+        if c["state"] == "initiated":
+            c["state"] = "active"
+
+    def _apply_complete(self, cid: str, event: Dict[str, Any]) -> None:
+        if cid in self._conversations:
+            self._conversations[cid]["state"] = "completed"
+
+    def _apply_stale(self, cid: str, event: Dict[str, Any]) -> None:
+        if cid in self._conversations:
+            self._conversations[cid]["state"] = "stale"
+
+    def _rebuild_active_heap(self) -> None:
+        self._active_heap = [
+            (c.get("last_message_ts", 0), cid)
+            for cid, c in self._conversations.items()
+            if c.get("state") in OPEN_STATES
+        ]
+        heapq.heapify(self._active_heap)
+
+    def _track_active(self, cid: str, ts: int) -> None:
+        heapq.heappush(self._active_heap, (ts, cid))
+        # Compact once superseded entries dominate the heap
+        if len(self._active_heap) > 4 * len(self._conversations) + 64:
+            self._rebuild_active_heap()
 
     def _append(self, event: Dict[str, Any]) -> None:
         self._dir.mkdir(parents=True, exist_ok=True)
@@ -100,6 +137,7 @@ class ConversationManager:
             "created_at": now,
         }
         self._conversations[cid] = conv
+        self._track_active(cid, now)
         self._append({
             "event_type": "create",
             "conversation_id": cid,
@@ -116,11 +154,12 @@ class ConversationManager:
             return
         now = int(time.time())
         c = self._conversations[conversation_id]
-        c["messages"] = c.get("messages", 0) + 1
+        c["messages"] += 1
         c["last_message_ts"] = now
         c["last_direction"] = direction
         if c["state"] == "initiated":
             c["state"] = "active"
+        self._track_active(conversation_id, now)
         self._append({
             "event_type": "message",
             "conversation_id": conversation_id,
@@ -149,14 +188,14 @@ class ConversationManager:
         conv = self._conversations.get(cid)
         if not conv:
             return False
-        return conv.get("last_direction") == "out" and conv.get("state") in ("initiated", "active")
+        return conv.get("last_direction") == "out" and conv.get("state") in OPEN_STATES
 
     def should_follow_up(self, conversation_id: str, timeout_s: int = 86400) -> bool:
         """Check if a conversation is overdue for a follow-up (no reply within timeout)."""
         conv = self._conversations.get(conversation_id)
         if not conv:
             return False
-        if conv.get("state") not in ("initiated", "active"):
+        if conv.get("state") not in OPEN_STATES:
             return False
         if conv.get("last_direction") != "out":
             return False
@@ -176,24 +215,27 @@ class ConversationManager:
     def mark_stale(self, max_idle_s: int = DEFAULT_STALE_S) -> int:
         """Mark idle conversations as stale. Returns count marked."""
         now = int(time.time())
+        heap = self._active_heap
         count = 0
-        for cid, conv in self._conversations.items():
-            if conv.get("state") not in ("initiated", "active"):
+        while heap and heap[0][0] + max_idle_s <= now:
+            ts, cid = heapq.heappop(heap)
+            conv = self._conversations.get(cid)
+            if not conv or conv.get("last_message_ts", 0) != ts:
+                continue  # superseded by a newer message
+            if conv.get("state") not in OPEN_STATES:
                 continue
-            idle = now - conv.get("last_message_ts", 0)
-            if idle >= max_idle_s:
-                conv["state"] = "stale"
-                self._append({
-                    "event_type": "stale",
-                    "conversation_id": cid,
-                    "ts": now,
-                })
-                count += 1
+            conv["state"] = "stale"
+            self._append({
+                "event_type": "stale",
+                "conversation_id": cid,
+                "ts": now,
+            })
+            count += 1
         return count
 
     def active_conversations(self) -> List[Dict[str, Any]]:
         """Return all non-completed, non-stale conversations."""
         return [
             dict(c) for c in self._conversations.values()
-            if c.get("state") in ("initiated", "active")
+            if c.get("state") in OPEN_STATES
         ]
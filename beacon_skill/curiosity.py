@@ -5,12 +5,13 @@ Enables interest-based matching between agents beyond offers/needs.
 Supports a "curious" envelope kind for broadcasting wonder.
 """
 
-import json
+import atexit
+import sys
 import time
 from pathlib import Path
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, List, Optional, Tuple
 
-from .storage import _dir
+from .storage import _atomic_write, _dir, _dumps, _loads
 
 
 CURIOSITY_FILE = "curiosity.json"
@@ -20,38 +21,87 @@ RTC_COST_MUTUAL_LOOKUP = 0.5  # Finding mutual interests with another agent
 RTC_COST_BROADCAST = 1.0      # Broadcasting curiosity envelope to network
 
 
+def _count_terms(terms: Tuple[str, ...], blob: str) -> int:
+    """Count how many ``terms`` occur in ``blob`` (overlapping terms count individually)."""
+    return sum(1 for t in terms if t in blob)
+
+
+def _text_blob(env: Dict[str, Any], scalars: Tuple[str, ...], lists: Tuple[str, ...]) -> str:
+    """Lowercased text of the given envelope fields, built with a single join."""
+    parts = [str(env.get(f, "")) for f in scalars]
+    for f in lists:
+        parts.extend(env.get(f, []))
+    return " ".join(parts).lower()
+
+
+_MATCH_LIST_FIELDS = ("topics", "offers", "needs", "interests")
+
+
 class CuriosityManager:
     """Manage an agent's curiosity — topics of non-transactional interest."""
 
-    def __init__(self, data_dir: Optional[Path] = None):
+    def __init__(self, data_dir: Optional[Path] = None, flush_interval_s: float = 0.0,
+                 pretty: bool = False):
+        """``flush_interval_s`` > 0 coalesces bursts of mutations into one
+        write per interval; pending changes are flushed on ``flush()`` and
+        at interpreter exit. The default writes through on every change.
+
+        Saves are compact JSON in insertion order; ``pretty=True`` writes
+        the indented, key-sorted form for hand inspection.
+        """
         self._dir = data_dir or _dir()
         self._data: Dict[str, Any] = {"interests": {}, "explored": {}}
+        self._flush_interval_s = flush_interval_s
+        self._pretty = pretty
+        self._dirty = False
+        self._last_flush = 0.0
+        self._written = b""  # bytes last read from / written to disk
+        self._match_cache: Dict[str, float] = {}
+        self._ranked: Optional[List[str]] = None  # topics by intensity, built lazily
         self._load()
+        if flush_interval_s > 0:
+            atexit.register(self.flush)
 
     def _path(self) -> Path:
         return self._dir / CURIOSITY_FILE
 
     def _load(self) -> None:
-        path = self._path()
-        if path.exists():
-            try:
-                self._data = json.loads(path.read_text(encoding="utf-8"))
-            except Exception:
-                self._data = {"interests": {}, "explored": {}}
+        # EAFP: a missing file is just another failed read, saving a stat()
+        try:
+            self._written = self._path().read_bytes()
+            self._data = _loads(self._written)
+        except Exception:
+            self._data = {"interests": {}, "explored": {}}
         # Ensure keys exist
         self._data.setdefault("interests", {})
         self._data.setdefault("explored", {})
+        # Intern our own (small, trusted) topic set; peer-supplied strings never are
+        self._data["interests"] = {
+            sys.intern(t): v for t, v in self._data["interests"].items()
+        }
 
     def _save(self) -> None:
-        self._dir.mkdir(parents=True, exist_ok=True)
-        self._path().write_text(
-            json.dumps(self._data, indent=2, sort_keys=True) + "\n",
-            encoding="utf-8",
-        )
+        self._match_cache.clear()
+        self._ranked = None
+        self._dirty = True
+        if time.time() - self._last_flush >= self._flush_interval_s:
+            self.flush()
+
+    def flush(self) -> None:
+        """Write pending changes to disk."""
+        if not self._dirty:
+            return
+        data = _dumps(self._data, pretty=self._pretty, sort_keys=self._pretty)
+        if data != self._written:
+            self._dir.mkdir(parents=True, exist_ok=True)
+            _atomic_write(self._path(), data)
+            self._written = data
+        self._dirty = False
+        self._last_flush = time.time()
 
     def add(self, topic: str, intensity: float = 0.5, notes: str = "") -> Dict[str, Any]:
         """Add or update an interest. Intensity 0.0-1.0."""
-        topic = topic.strip().lower()
+        topic = sys.intern(topic.strip().lower())
         if not topic:
             raise ValueError("Topic cannot be empty")
         intensity = max(0.0, min(1.0, intensity))
@@ -64,6 +114,8 @@ class CuriosityManager:
         if notes:
             entry["notes"] = notes
 
+        if entry == existing:
+            return {"topic": topic, **entry}
         self._data["interests"][topic] = entry
         self._save()
         return {"topic": topic, **entry}
@@ -108,13 +160,14 @@ class CuriosityManager:
 
     def top_interests(self, limit: int = 5) -> List[str]:
         """Return top interests by intensity, for inclusion in pulse."""
-        items = self._data.get("interests", {})
-        sorted_items = sorted(
-            items.items(),
-            key=lambda x: x[1].get("intensity", 0),
-            reverse=True,
-        )
-        return [topic for topic, _ in sorted_items[:limit]]
+        if self._ranked is None:
+            items = self._data.get("interests", {})
+            self._ranked = [topic for topic, _ in sorted(
+                items.items(),
+                key=lambda x: x[1].get("intensity", 0),
+                reverse=True,
+            )]
+        return self._ranked[:limit]
 
     def find_mutual(self, roster_entry: Dict[str, Any]) -> Dict[str, Any]:
         """Find overlapping interests with another agent's roster data.
@@ -122,21 +175,29 @@ class CuriosityManager:
         Requires the other agent to include curiosities in their pulse.
         This is a paid feature (RTC_COST_MUTUAL_LOOKUP).
         """
-        my_interests = set(self._data.get("interests", {}).keys())
-        their_interests = set(
-            t.lower() for t in roster_entry.get("curiosities", [])
-        )
-
-        shared = my_interests & their_interests
-        i_have = my_interests - their_interests
-        they_have = their_interests - my_interests
+        # Dict keys view is already set-like; no need to copy our side
+        my_interests = self._data.get("interests", {}).keys()
+        their_interests = {t.lower() for t in roster_entry.get("curiosities", [])}
+
+        if my_interests and their_interests:
+            # Probe the smaller side against the larger one
+            if len(my_interests) <= len(their_interests):
+                small, large = my_interests, their_interests
+            else:
+                small, large = their_interests, my_interests
+            shared = {t for t in small if t in large}
+        else:
+            shared = set()
+        i_have = my_interests - shared
+        they_have = their_interests - shared
+        union_size = len(my_interests) + len(their_interests) - len(shared)
 
         return {
             "agent_id": roster_entry.get("agent_id", ""),
             "shared": sorted(shared),
             "i_have_exclusively": sorted(i_have),
             "they_have_exclusively": sorted(they_have),
-            "overlap_score": len(shared) / max(len(my_interests | their_interests), 1),
+            "overlap_score": len(shared) / max(union_size, 1),
             "rtc_cost": RTC_COST_MUTUAL_LOOKUP,
         }
 
@@ -160,22 +221,23 @@ class CuriosityManager:
 
         Returns bonus points (0-30) for feed scoring integration.
         """
-        my_interests = set(self._data.get("interests", {}).keys())
+        my_interests = tuple(self._data.get("interests", {}))
         if not my_interests:
             return 0.0
 
-        # Check envelope text, topics, offers, needs for interest matches
-        text_blob = " ".join([
-            str(envelope.get("text", "")),
-            " ".join(envelope.get("topics", [])),
-            " ".join(envelope.get("offers", [])),
-            " ".join(envelope.get("needs", [])),
-            " ".join(envelope.get("interests", [])),
-        ]).lower()
-
-        matches = sum(1 for interest in my_interests if interest in text_blob)
-        if matches == 0:
-            return 0.0
+        # Check envelope text, topics, offers, needs for interest matches.
+        # The score depends only on this text, so it is the cache key (a
+        # nonce or sig could be replayed with different content).
+        text_blob = _text_blob(envelope, ("text",), _MATCH_LIST_FIELDS)
+        score = self._match_cache.get(text_blob)
+        if score is not None:
+            return score
 
+        matches = _count_terms(my_interests, text_blob)
         # Up to 15 points per match, capped at 30
-        return min(matches * 15, 30.0)
+        score = min(matches * 15, 30.0) if matches else 0.0
+
+        if len(self._match_cache) >= 4096:
+            self._match_cache.clear()
+        self._match_cache[text_blob] = score
+        return score
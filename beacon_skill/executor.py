@@ -4,11 +4,33 @@ Queues actions from rules, goals, matchmaker into the outbox,
 then drains the outbox via webhook/UDP transports.
 """
 
-import json
 import time
-from typing import Any, Dict, List, Optional, Tuple
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, Optional, Tuple
 
 from .outbox import OutboxManager
+from .storage import _dumps
+
+
+MAX_SEND_WORKERS = 8
+HINT_SCHEMES = frozenset({"webhook", "udp"})
+
+# Transport send functions, imported on first use
+_TRANSPORTS: Dict[str, Callable[..., Any]] = {}
+
+
+def _get_transport(name: str) -> Optional[Callable[..., Any]]:
+    fn = _TRANSPORTS.get(name)
+    if fn is not None:
+        return fn
+    if name == "webhook":
+        from .transports.webhook import webhook_send as fn
+    elif name == "udp":
+        from .transports.udp import udp_send as fn
+    else:
+        return None
+    _TRANSPORTS[name] = fn
+    return fn
 
 
 class ActionExecutor:
@@ -31,6 +53,8 @@ class ActionExecutor:
         self._presence_mgr = presence_mgr
         self._match_mgr = match_mgr
         self._conversations = conversations
+        # Roster lookups memoized for one queue/drain cycle
+        self._agent_cache: Dict[str, Dict[str, Any]] = {}
 
     # ── Queuing ──
 
@@ -160,8 +184,10 @@ class ActionExecutor:
 
     def drain(self, max_actions: int = 3) -> List[Dict[str, Any]]:
         """Execute pending outbox actions. Returns results for each attempted action."""
+        self._agent_cache.clear()
         items = self._outbox.pending(limit=max_actions)
-        results = []
+        results: List[Dict[str, Any]] = []
+        jobs: List[Tuple[Dict[str, Any], Dict[str, Any], str, str, Dict[str, Any]]] = []
 
         for item in items:
             action_id = item["action_id"]
@@ -190,16 +216,29 @@ class ActionExecutor:
                 except Exception:
                     pass
 
-            # Execute transport
-            send_result = self._execute_transport(method, address, envelope)
-
+            slot: Dict[str, Any] = {}  # filled in once the send completes
+            results.append(slot)
+            jobs.append((slot, item, method, address, envelope))
+
+        # Execute transports; network round-trips overlap when there are several
+        if len(jobs) > 1:
+            workers = min(len(jobs), MAX_SEND_WORKERS)
+            with ThreadPoolExecutor(max_workers=workers) as pool:
+                send_results = list(pool.map(
+                    lambda job: self._execute_transport(*job[2:]), jobs))
+        else:
+            send_results = [self._execute_transport(*job[2:]) for job in jobs]
+
+        # Outbox and side-effect bookkeeping stays on the calling thread
+        for (slot, item, method, _, _), send_result in zip(jobs, send_results):
+            action_id = item["action_id"]
             if send_result.get("ok"):
                 self._outbox.mark_sent(action_id)
                 self._on_success(item)
-                results.append({"action_id": action_id, "status": "sent", "method": method})
+                slot.update({"action_id": action_id, "status": "sent", "method": method})
             else:
                 self._outbox.mark_retry(action_id)
-                results.append({"action_id": action_id, "status": "failed", "error": send_result.get("error", "unknown")})
+                slot.update({"action_id": action_id, "status": "failed", "error": send_result.get("error", "unknown")})
 
         return results
 
@@ -220,17 +259,20 @@ class ActionExecutor:
         2. Roster card_url → webhook
         3. UDP broadcast fallback
         """
-        hint = item.get("transport_hint", "")
-        if hint.startswith("webhook:"):
-            return "webhook", hint[len("webhook:"):]
-        if hint.startswith("udp:"):
-            return "udp", hint[len("udp:"):]
+        scheme = item.get("transport_scheme")
+        if scheme is None:
+            # Items queued before the hint was pre-split
+            scheme, _, address = item.get("transport_hint", "").partition(":")
+        else:
+            address = item.get("transport_address", "")
+        if scheme in HINT_SCHEMES:
+            return scheme, address
 
         # Try roster lookup
         target = item.get("target_agent_id", "")
         if target and self._presence_mgr:
-            agent = self._presence_mgr.get_agent(target)
-            if agent and agent.get("card_url"):
+            agent = self._lookup_agent(target)
+            if agent.get("card_url"):
                 card_url = agent["card_url"]
                 # Construct inbox URL from card URL
                 if card_url.endswith("/beacon.json") or card_url.endswith("/.well-known/beacon.json"):
@@ -252,18 +294,16 @@ class ActionExecutor:
     def _execute_transport(self, method: str, address: str, envelope: Dict[str, Any]) -> Dict[str, Any]:
         """Send via the resolved transport. Returns {"ok": bool, ...}."""
         try:
+            send = _get_transport(method)
             if method == "webhook":
-                from .transports.webhook import webhook_send
-                result = webhook_send(address, envelope, identity=self._identity)
+                result = send(address, envelope, identity=self._identity)
                 return {"ok": result.get("ok", result.get("status", 0) == 200), **result}
             elif method == "udp":
-                from .transports.udp import udp_send
                 parts = address.split(":")
                 host = parts[0]
                 port = int(parts[1]) if len(parts) > 1 else 38400
                 broadcast = self._cfg.get("udp", {}).get("broadcast", False)
-                text = json.dumps(envelope, sort_keys=True)
-                udp_send(host, port, text.encode("utf-8"), broadcast=broadcast)
+                send(host, port, _dumps(envelope), broadcast=broadcast)
                 return {"ok": True}
         except Exception as e:
             return {"ok": False, "error": str(e)}
@@ -288,7 +328,15 @@ class ActionExecutor:
         """Best-effort transport hint from roster."""
         if not target_agent_id or not self._presence_mgr:
             return ""
-        agent = self._presence_mgr.get_agent(target_agent_id)
-        if agent and agent.get("card_url"):
+        agent = self._lookup_agent(target_agent_id)
+        if agent.get("card_url"):
             return f"webhook:{agent['card_url']}"
         return ""
+
+    def _lookup_agent(self, agent_id: str) -> Dict[str, Any]:
+        """Roster entry for an agent ({} if unknown), cached until the next drain."""
+        agent = self._agent_cache.get(agent_id)
+        if agent is None:
+            agent = self._presence_mgr.get_agent(agent_id) or {}
+            self._agent_cache[agent_id] = agent
+        return agent
@@ -1,11 +1,14 @@
 """Feed & Subscriptions — filter noise, surface relevant events, subscribe to agents and topics."""
 
-import json
+import atexit
+import heapq
 import time
+from operator import itemgetter
 from pathlib import Path
 from typing import Any, Dict, List, Optional
 
-from .storage import _dir
+from .curiosity import _count_terms, _text_blob
+from .storage import _atomic_write, _dir, _dumps, _loads
 
 
 SUBSCRIPTIONS_FILE = "subscriptions.json"
@@ -26,28 +29,65 @@ DEFAULT_KIND_WEIGHTS = {
     "ad": 1,
 }
 
+STATIC_SCORE_CACHE_SIZE = 4096
+
+_TOPIC_SCALAR_FIELDS = ("text", "bounty_url", "name")
+_TOPIC_LIST_FIELDS = ("links", "offers", "needs", "topics")
+
 
 class FeedManager:
     """Score and filter inbox entries based on subscriptions, trust, and relevance."""
 
-    def __init__(self, subs_path: Optional[Path] = None):
+    def __init__(self, subs_path: Optional[Path] = None, flush_interval_s: float = 0.0,
+                 pretty: bool = False):
+        """``flush_interval_s`` > 0 coalesces bursts of subscription changes
+        into one write per interval; ``pretty`` selects indented, key-sorted
+        output (see ``CuriosityManager``).
+        """
         self._subs_path = subs_path or (_dir() / SUBSCRIPTIONS_FILE)
         self._subs: Dict[str, Any] = {"agents": {}, "topics": [], "kind_weights": {}}
+        self._flush_interval_s = flush_interval_s
+        self._pretty = pretty
+        self._dirty = False
+        self._last_flush = 0.0
+        self._written = b""  # bytes last read from / written to disk
         self._load()
+        self._refresh_derived()
+        if flush_interval_s > 0:
+            atexit.register(self.flush)
 
     def _load(self) -> None:
-        if self._subs_path.exists():
-            try:
-                self._subs = json.loads(self._subs_path.read_text(encoding="utf-8"))
-            except Exception:
-                pass
+        # EAFP: a missing file is just another failed read, saving a stat()
+        try:
+            raw = self._subs_path.read_bytes()
+            self._subs = _loads(raw)
+            self._written = raw
+        except Exception:
+            pass
+
+    def _refresh_derived(self) -> None:
+        """Recompute scoring lookups that only change with subscriptions."""
+        self._topics_lc = tuple(t.lower() for t in self._subs.get("topics", []))
+        self._kind_weights = self._subs.get("kind_weights", {}) or DEFAULT_KIND_WEIGHTS
+        self._static_scores: Dict[tuple, float] = {}
 
     def _save(self) -> None:
-        self._subs_path.parent.mkdir(parents=True, exist_ok=True)
-        self._subs_path.write_text(
-            json.dumps(self._subs, indent=2, sort_keys=True) + "\n",
-            encoding="utf-8",
-        )
+        self._refresh_derived()
+        self._dirty = True
+        if time.time() - self._last_flush >= self._flush_interval_s:
+            self.flush()
+
+    def flush(self) -> None:
+        """Write pending subscription changes to disk."""
+        if not self._dirty:
+            return
+        data = _dumps(self._subs, pretty=self._pretty, sort_keys=self._pretty)
+        if data != self._written:
+            self._subs_path.parent.mkdir(parents=True, exist_ok=True)
+            _atomic_write(self._subs_path, data)
+            self._written = data
+        self._dirty = False
+        self._last_flush = time.time()
 
     # ── Subscription management ──
 
@@ -82,7 +122,8 @@ class FeedManager:
 
     # ── Scoring ──
 
-    def score_entry(self, entry: Dict[str, Any], trust_mgr: Any = None, curiosity_mgr: Any = None) -> float:
+    def score_entry(self, entry: Dict[str, Any], trust_mgr: Any = None, curiosity_mgr: Any = None,
+                    now: Optional[float] = None, min_score: Optional[float] = None) -> float:
         """Score an inbox entry for relevance.
 
         Scoring factors:
@@ -92,40 +133,52 @@ class FeedManager:
         - Verified signature: +10
         - Trust > 0.5: +15 / Trust < -0.3: -20
         - Recency: -1 per hour old
+
+        With ``min_score``, entries whose best possible score falls short
+        return ``-inf`` before topic, trust and curiosity work is done.
         """
-        score = 0.0
         env = entry.get("envelope") or entry
         agent_id = env.get("agent_id", "")
-        kind = env.get("kind", "")
-
-        # Subscribed agent bonus
-        agents = self._subs.get("agents", {})
-        if agent_id and agent_id in agents:
-            priority = agents[agent_id].get("priority", 5)
-            score += 50 * (priority / 5.0)
+        verified = entry.get("verified")
 
-        # Topic matching
-        topics = self._subs.get("topics", [])
-        if topics:
-            text_fields = " ".join([
-                str(env.get("text", "")),
-                " ".join(env.get("links", [])),
-                str(env.get("bounty_url", "")),
-                str(env.get("name", "")),
-                " ".join(env.get("offers", [])),
-                " ".join(env.get("needs", [])),
-                " ".join(env.get("topics", [])),
-            ]).lower()
-            for topic in topics:
-                if topic.lower() in text_fields:
-                    score += 20
+        # Recency decay (applied last, computed first for the bound)
+        age_penalty = 0.0
+        ts = env.get("ts") or entry.get("received_at")
+        if ts:
+            try:
+                hours_old = ((time.time() if now is None else now) - float(ts)) / 3600
+                age_penalty = max(0, hours_old)
+            except (ValueError, TypeError):
+                pass
 
-        # Kind weight
-        kind_weights = self._subs.get("kind_weights", {}) or DEFAULT_KIND_WEIGHTS
-        score += kind_weights.get(kind, DEFAULT_KIND_WEIGHTS.get(kind, 0))
+        if min_score is not None:
+            ceiling = (
+                self._agent_bonus(agent_id)
+                + 20 * len(self._topics_lc)
+                + self._kind_weight(env.get("kind", ""))
+                + (10 if verified is True else 0)
+                + (15 if trust_mgr and agent_id else 0)
+                + (30 if curiosity_mgr else 0)
+                - age_penalty
+            )
+            # Margin covers the final round(score, 2)
+            if ceiling + 0.005 < min_score:
+                return float("-inf")
+
+        # Subscription-dependent part, memoized per verified envelope (an
+        # unchecked nonce and sig can be replayed with different content)
+        nonce, sig = env.get("nonce"), env.get("sig")
+        if nonce and sig and verified is True:
+            key = (nonce, sig, agent_id, env.get("kind", ""))
+            score = self._static_scores.get(key)
+            if score is None:
+                if len(self._static_scores) >= STATIC_SCORE_CACHE_SIZE:
+                    self._static_scores.clear()
+                score = self._static_scores[key] = self._subscription_score(env)
+        else:
+            score = self._subscription_score(env)
 
         # Verified signature bonus
-        verified = entry.get("verified")
         if verified is True:
             score += 10
 
@@ -142,17 +195,35 @@ class FeedManager:
         if curiosity_mgr:
             score += curiosity_mgr.score_curiosity_match(env)
 
-        # Recency decay
-        ts = env.get("ts") or entry.get("received_at")
-        if ts:
-            try:
-                hours_old = (time.time() - float(ts)) / 3600
-                score -= max(0, hours_old)
-            except (ValueError, TypeError):
-                pass
-
+        score -= age_penalty
         return round(score, 2)
 
+    def _agent_bonus(self, agent_id: str) -> float:
+        agents = self._subs.get("agents", {})
+        if agent_id and agent_id in agents:
+            priority = agents[agent_id].get("priority", 5)
+            return 50 * (priority / 5.0)
+        return 0.0
+
+    def _kind_weight(self, kind: str) -> float:
+        return self._kind_weights.get(kind, DEFAULT_KIND_WEIGHTS.get(kind, 0))
+
+    def _subscription_score(self, env: Dict[str, Any]) -> float:
+        """Agent, topic and kind components — depend only on the envelope
+        and current subscriptions."""
+        # Subscribed agent bonus
+        score = self._agent_bonus(env.get("agent_id", ""))
+
+        # Topic matching
+        topics = self._topics_lc
+        if topics:
+            text_fields = _text_blob(env, _TOPIC_SCALAR_FIELDS, _TOPIC_LIST_FIELDS)
+            score += 20 * _count_terms(topics, text_fields)
+
+        # Kind weight
+        score += self._kind_weight(env.get("kind", ""))
+        return score
+
     def feed(
         self,
         entries: List[Dict[str, Any]],
@@ -162,13 +233,18 @@ class FeedManager:
         limit: int = 50,
     ) -> List[Dict[str, Any]]:
         """Score and filter entries, returning top results sorted by relevance."""
-        scored = []
-        for entry in entries:
-            s = self.score_entry(entry, trust_mgr=trust_mgr, curiosity_mgr=curiosity_mgr)
-            if s >= min_score:
-                enriched = dict(entry)
-                enriched["score"] = s
-                scored.append(enriched)
-
-        scored.sort(key=lambda x: x["score"], reverse=True)
-        return scored[:limit]
+        now = time.time()
+        score = self.score_entry
+        scored = (
+            (s, entry) for s, entry in (
+                (score(e, trust_mgr=trust_mgr, curiosity_mgr=curiosity_mgr,
+                       now=now, min_score=min_score), e)
+                for e in entries
+            )
+            if s >= min_score
+        )
+
+        # Streaming top-k (stable, like sorted()[:limit]): nlargest keeps a
+        # bounded heap, so no full scored list exists; only survivors are copied.
+        top = heapq.nlargest(limit, scored, key=itemgetter(0))
+        return [dict(entry, score=s) for s, entry in top]
@@ -5,24 +5,31 @@ Agents don't just react to inbox — they pursue ambitions. A goal starts as a
 milestones, and reaches achievement or abandonment.
 
 Storage:
-  goals.jsonl — append-only event log (dream/activate/progress/achieve/abandon)
-  goals.json  — index: {"active": [...], "achieved": [...], "abandoned": [...]}
+  goals.jsonl          — append-only event log (dream/activate/progress/achieve/abandon)
+  goals.json           — index: {"active": [...], "achieved": [...], "abandoned": [...]}
+  goals_snapshot.json  — checkpoint: {"offset": <jsonl bytes covered>, "log_id": [...], "goals": {...}}
 """
 
-import hashlib
-import json
+import atexit
+import os
+import secrets
 import time
+from operator import itemgetter
 from pathlib import Path
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, List, NamedTuple, Optional, Set, Tuple
 
-from .storage import _dir
+from .storage import _atomic_write, _dir, _dumps, _loads, _log_identity, _parse_jsonl
 
 
 GOALS_JSONL = "goals.jsonl"
 GOALS_INDEX = "goals.json"
+GOALS_SNAPSHOT = "goals_snapshot.json"
+CHECKPOINT_EVERY = 100  # events appended between snapshots
 
 VALID_STATES = frozenset(["dreaming", "active", "achieved", "abandoned"])
 VALID_CATEGORIES = frozenset(["skill", "connection", "rtc", "exploration"])
+_INVALID_CATEGORY_MSG = "Invalid category '{}'. Valid: " + str(sorted(VALID_CATEGORIES))
+INDEX_BUCKETS = ("active", "achieved", "abandoned")  # states tracked in goals.json
 
 # RTC costs
 RTC_COST_ACTIVATE = 0.1
@@ -30,15 +37,56 @@ RTC_COST_SUGGEST_ACTIONS = 0.5
 RTC_COST_AUTO_CREATE = 1.0
 
 
+class AgentView(NamedTuple):
+    """A roster entry with its match text pre-lowercased (see ``prepare_roster``)."""
+
+    agent: Dict[str, Any]
+    offers_text: str     # offers, space-joined
+    interests_text: str  # topics + curiosities, space-joined
+
+
+def prepare_roster(roster: List[Dict[str, Any]]) -> List[AgentView]:
+    """Normalize a roster once for repeated ``suggest_actions`` calls.
+
+    Title keywords hold no whitespace, so a substring hit in the space-joined
+    text is a hit inside a single offer/topic, exactly as when scanning them
+    one by one.
+    """
+    return [
+        AgentView(
+            agent,
+            " ".join(agent.get("offers", [])).lower(),
+            " ".join([*agent.get("topics", []), *agent.get("curiosities", [])]).lower(),
+        )
+        for agent in roster
+    ]
+
+
 class GoalManager:
     """Manage agent goals and aspirations."""
 
-    def __init__(self, data_dir: Optional[Path] = None, journal_mgr: Any = None):
+    def __init__(self, data_dir: Optional[Path] = None, journal_mgr: Any = None,
+                 flush_interval_s: float = 0.0):
+        """``flush_interval_s`` > 0 coalesces index rewrites into one write
+        per interval; pending changes are written on ``flush()`` and at
+        interpreter exit. The event log is always appended immediately.
+        """
         self._dir = data_dir or _dir()
         self._journal_mgr = journal_mgr
         self._goals: Dict[str, Dict[str, Any]] = {}
-        self._index: Dict[str, List[str]] = {"active": [], "achieved": [], "abandoned": []}
+        self._index: Dict[str, Set[str]] = {b: set() for b in INDEX_BUCKETS}
+        self._titles_lower: Set[str] = set()  # every goal's title, for dedup
+        # Scan-side columns: goal ids per category and each title's keywords
+        self._by_category: Dict[str, Set[str]] = {}
+        self._keywords: Dict[str, Tuple[str, ...]] = {}
+        self._seq: Dict[str, int] = {}  # creation order, to break updated_at ties
+        self._index_dirty = False
+        self._events_since_checkpoint = 0
+        self._flush_interval_s = flush_interval_s
+        self._last_flush = 0.0
         self._load()
+        if flush_interval_s > 0:
+            atexit.register(self.flush)
 
     def _jsonl_path(self) -> Path:
         return self._dir / GOALS_JSONL
@@ -46,90 +94,167 @@ class GoalManager:
     def _index_path(self) -> Path:
         return self._dir / GOALS_INDEX
 
-    def _load(self) -> None:
-        # Load index
-        idx_path = self._index_path()
-        if idx_path.exists():
-            try:
-                self._index = json.loads(idx_path.read_text(encoding="utf-8"))
-            except Exception:
-                self._index = {"active": [], "achieved": [], "abandoned": []}
-        self._index.setdefault("active", [])
-        self._index.setdefault("achieved", [])
-        self._index.setdefault("abandoned", [])
+    def _snapshot_path(self) -> Path:
+        return self._dir / GOALS_SNAPSHOT
 
+    def _load(self) -> None:
         # Rebuild goals from JSONL
         self._goals = {}
         jsonl_path = self._jsonl_path()
-        if not jsonl_path.exists():
-            return
-        for line in jsonl_path.read_text(encoding="utf-8").splitlines():
-            line = line.strip()
-            if not line:
-                continue
-            try:
-                evt = json.loads(line)
-            except Exception:
-                continue
-            gid = evt.get("goal_id", "")
-            action = evt.get("action", "")
-            if action == "dream":
-                self._goals[gid] = {
-                    "goal_id": gid,
-                    "state": "dreaming",
-                    "title": evt.get("title", ""),
-                    "description": evt.get("description", ""),
-                    "category": evt.get("category", "exploration"),
-                    "target_value": evt.get("target_value"),
-                    "current_value": 0.0,
-                    "deadline_ts": evt.get("deadline_ts"),
-                    "created_at": evt.get("ts", 0),
-                    "updated_at": evt.get("ts", 0),
-                    "milestones": [],
-                }
-            elif action == "activate" and gid in self._goals:
-                self._goals[gid]["state"] = "active"
-                self._goals[gid]["updated_at"] = evt.get("ts", 0)
-            elif action == "progress" and gid in self._goals:
-                self._goals[gid]["current_value"] = evt.get("value", self._goals[gid]["current_value"])
-                self._goals[gid]["updated_at"] = evt.get("ts", 0)
-                self._goals[gid]["milestones"].append({
-                    "milestone": evt.get("milestone", ""),
-                    "value": evt.get("value"),
-                    "ts": evt.get("ts", 0),
-                })
-            elif action == "achieve" and gid in self._goals:
-                self._goals[gid]["state"] = "achieved"
-                self._goals[gid]["updated_at"] = evt.get("ts", 0)
-            elif action == "abandon" and gid in self._goals:
-                self._goals[gid]["state"] = "abandoned"
-                self._goals[gid]["updated_at"] = evt.get("ts", 0)
+        if jsonl_path.exists():
+            # Start from the last checkpoint and replay only the tail after it
+            offset = self._load_snapshot(jsonl_path, jsonl_path.stat())
+            self._events_since_checkpoint = self._replay(jsonl_path, offset)
+
+        # The index is derived from the goals, so it can never drift from them
+        self._index = {b: set() for b in INDEX_BUCKETS}
+        self._titles_lower = set()
+        self._by_category = {}
+        self._keywords = {}
+        self._seq = {}
+        for gid, g in self._goals.items():
+            self._track(gid, g)
+        for gid, g in self._goals.items():
+            bucket = self._index.get(g["state"])
+            if bucket is not None:
+                bucket.add(gid)
+
+    def _load_snapshot(self, jsonl_path: Path, st: os.stat_result) -> int:
+        """Restore goals from the checkpoint. Returns the log offset it covers."""
+        try:
+            snap = _loads(self._snapshot_path().read_bytes())
+            offset = int(snap["offset"])
+            goals = snap["goals"]
+        except Exception:
+            return 0
+        if offset > st.st_size or (offset and snap.get("log_id") != _log_identity(jsonl_path, st, offset)):
+            return 0  # log was truncated or replaced; replay it all
+        self._goals = goals
+        return offset
+
+    def _replay(self, jsonl_path: Path, offset: int = 0) -> int:
+        """Apply events from ``offset`` onward. Returns how many were applied."""
+        applied = 0
+        with jsonl_path.open("rb", buffering=1 << 20) as f:
+            f.seek(offset)
+            for evt in _parse_jsonl(f):
+                applied += 1
+                self._apply_event(evt)
+        return applied
+
+    def _apply_event(self, evt: Dict[str, Any]) -> None:
+        gid = evt.get("goal_id", "")
+        action = evt.get("action", "")
+        if action == "dream":
+            self._goals[gid] = {
+                "goal_id": gid,
+                "state": "dreaming",
+                "title": evt.get("title", ""),
+                "description": evt.get("description", ""),
+                "category": evt.get("category", "exploration"),
+                "target_value": evt.get("target_value"),
+                "current_value": 0.0,
+                "deadline_ts": evt.get("deadline_ts"),
+                "created_at": evt.get("ts", 0),
+                "updated_at": evt.get("ts", 0),
+                "milestones": [],
+            }
+        elif action == "activate" and gid in self._goals:
+            self._goals[gid]["state"] = "active"
+            self._goals[gid]["updated_at"] = evt.get("ts", 0)
+        elif action == "progress" and gid in self._goals:
+            self._goals[gid]["current_value"] = evt.get("value", self._goals[gid]["current_value"])
+            self._goals[gid]["updated_at"] = evt.get("ts", 0)
+            self._goals[gid]["milestones"].append({
+                "milestone": evt.get("milestone", ""),
+                "value": evt.get("value"),
+                "ts": evt.get("ts", 0),
+            })
+        elif action == "achieve" and gid in self._goals:
+            self._goals[gid]["state"] = "achieved"
+            self._goals[gid]["updated_at"] = evt.get("ts", 0)
+        elif action == "abandon" and gid in self._goals:
+            self._goals[gid]["state"] = "abandoned"
+            self._goals[gid]["updated_at"] = evt.get("ts", 0)
 
     def _append_event(self, event: Dict[str, Any]) -> None:
         self._dir.mkdir(parents=True, exist_ok=True)
-        with self._jsonl_path().open("a", encoding="utf-8") as f:
-            f.write(json.dumps(event, sort_keys=True) + "\n")
+        with self._jsonl_path().open("ab") as f:
+            f.write(_dumps(event) + b"\n")
+        self._events_since_checkpoint += 1
+
+    def _maybe_checkpoint(self) -> None:
+        if self._events_since_checkpoint >= CHECKPOINT_EVERY:
+            self.checkpoint()
+
+    def checkpoint(self) -> None:
+        """Snapshot all goals so the next load only replays newer events."""
+        jsonl_path = self._jsonl_path()
+        if not jsonl_path.exists():
+            return
+        st = jsonl_path.stat()
+        snap = {
+            "offset": st.st_size,
+            "log_id": _log_identity(jsonl_path, st, st.st_size),
+            "goals": self._goals,
+        }
+        # Unsorted: goal order in the snapshot is creation order
+        _atomic_write(self._snapshot_path(), _dumps(snap, sort_keys=False))
+        self._events_since_checkpoint = 0
+
+    def _track(self, goal_id: str, goal: Dict[str, Any]) -> None:
+        """Register a goal's immutable fields (title, category) in the scan indexes."""
+        title_lower = goal["title"].lower()
+        self._titles_lower.add(title_lower)
+        self._keywords[goal_id] = tuple(title_lower.split())
+        self._by_category.setdefault(goal.get("category", ""), set()).add(goal_id)
+        self._seq[goal_id] = len(self._seq)
+
+    def _select(self, state: str, category: Optional[str] = None) -> List[Dict[str, Any]]:
+        """Live goals in ``state`` (and ``category``), most recently updated first.
+
+        Uses the state and category indexes, so only matching goals are touched.
+        """
+        ids = self._index.get(state)
+        if ids is None:
+            ids = {gid for gid, g in self._goals.items() if g["state"] == state}
+        if category is not None:
+            ids = ids & self._by_category.get(category, set())
+        seq = self._seq
+        order = sorted(ids, key=lambda gid: (-self._goals[gid].get("updated_at", 0), seq[gid]))
+        return [self._goals[gid] for gid in order]
+
+    def _move_in_index(self, goal_id: str, old_state: Optional[str], new_state: str) -> None:
+        """Move a goal between index buckets after a state transition."""
+        old_bucket = self._index.get(old_state) if old_state else None
+        new_bucket = self._index.get(new_state)
+        if old_bucket is not None:
+            old_bucket.discard(goal_id)
+        if new_bucket is not None:
+            new_bucket.add(goal_id)
+        if old_bucket is not None or new_bucket is not None:
+            self._index_dirty = True
 
     def _save_index(self) -> None:
-        self._index = {"active": [], "achieved": [], "abandoned": []}
-        for gid, g in self._goals.items():
-            state = g.get("state", "dreaming")
-            if state == "active":
-                self._index["active"].append(gid)
-            elif state == "achieved":
-                self._index["achieved"].append(gid)
-            elif state == "abandoned":
-                self._index["abandoned"].append(gid)
+        if not self._index_dirty:
+            return
+        if time.time() - self._last_flush >= self._flush_interval_s:
+            self.flush()
+
+    def flush(self) -> None:
+        """Write the index if any goal changed bucket since the last write."""
+        if not self._index_dirty:
+            return
         self._dir.mkdir(parents=True, exist_ok=True)
-        self._index_path().write_text(
-            json.dumps(self._index, indent=2, sort_keys=True) + "\n",
-            encoding="utf-8",
-        )
+        index = {b: sorted(gids) for b, gids in self._index.items()}
+        _atomic_write(self._index_path(), _dumps(index, pretty=True), fsync=True)
+        self._index_dirty = False
+        self._last_flush = time.time()
 
     @staticmethod
     def _gen_id(title: str) -> str:
-        raw = f"{title}:{time.time()}"
-        return "g_" + hashlib.sha256(raw.encode()).hexdigest()[:10]
+        # Opaque id: same g_ + 10 hex shape as before, without hashing
+        return "g_" + secrets.token_hex(5)
 
     # ── Lifecycle ──
 
@@ -146,7 +271,7 @@ class GoalManager:
         if not title:
             raise ValueError("Goal title cannot be empty")
         if category not in VALID_CATEGORIES:
-            raise ValueError(f"Invalid category '{category}'. Valid: {sorted(VALID_CATEGORIES)}")
+            raise ValueError(_INVALID_CATEGORY_MSG.format(category))
 
         gid = self._gen_id(title)
         now = int(time.time())
@@ -174,7 +299,9 @@ class GoalManager:
             "updated_at": now,
             "milestones": [],
         }
+        self._track(gid, self._goals[gid])
         self._save_index()
+        self._maybe_checkpoint()
         return gid
 
     def activate(self, goal_id: str) -> bool:
@@ -186,7 +313,9 @@ class GoalManager:
         self._append_event({"action": "activate", "goal_id": goal_id, "ts": now})
         goal["state"] = "active"
         goal["updated_at"] = now
+        self._move_in_index(goal_id, "dreaming", "active")
         self._save_index()
+        self._maybe_checkpoint()
         return True
 
     def progress(self, goal_id: str, milestone: str, value: Optional[float] = None) -> Dict[str, Any]:
@@ -206,7 +335,8 @@ class GoalManager:
             "value": value,
             "ts": now,
         })
-        self._save_index()
+        # Progress never changes a goal's state bucket, so the index is untouched
+        self._maybe_checkpoint()
         return dict(goal)
 
     def achieve(self, goal_id: str, notes: str = "") -> bool:
@@ -218,7 +348,9 @@ class GoalManager:
         goal["state"] = "achieved"
         goal["updated_at"] = now
         self._append_event({"action": "achieve", "goal_id": goal_id, "notes": notes, "ts": now})
+        self._move_in_index(goal_id, "active", "achieved")
         self._save_index()
+        self._maybe_checkpoint()
 
         # Auto-journal the achievement
         if self._journal_mgr is not None:
@@ -239,10 +371,13 @@ class GoalManager:
         if not goal or goal["state"] not in ("dreaming", "active"):
             return False
         now = int(time.time())
+        old_state = goal["state"]
         goal["state"] = "abandoned"
         goal["updated_at"] = now
         self._append_event({"action": "abandon", "goal_id": goal_id, "reason": reason, "ts": now})
+        self._move_in_index(goal_id, old_state, "abandoned")
         self._save_index()
+        self._maybe_checkpoint()
         return True
 
     # ── Queries ──
@@ -252,15 +387,16 @@ class GoalManager:
         goal = self._goals.get(goal_id)
         return dict(goal) if goal else None
 
-    def list_goals(self, state: Optional[str] = None) -> List[Dict[str, Any]]:
-        """List goals, optionally filtered by state."""
-        results = []
-        for g in self._goals.values():
-            if state and g["state"] != state:
-                continue
-            results.append(dict(g))
-        results.sort(key=lambda x: x.get("updated_at", 0), reverse=True)
-        return results
+    def list_goals(self, state: Optional[str] = None, copy: bool = True) -> List[Dict[str, Any]]:
+        """List goals, optionally filtered by state.
+
+        ``copy=False`` returns the live goal dicts for read-only internal use.
+        """
+        if state:
+            results = self._select(state)
+        else:
+            results = sorted(self._goals.values(), key=itemgetter("updated_at"), reverse=True)
+        return [dict(g) for g in results] if copy else results
 
     def active_goals(self) -> List[Dict[str, Any]]:
         """Get active goals for pulse inclusion."""
@@ -273,60 +409,74 @@ class GoalManager:
         roster: Optional[List[Dict[str, Any]]] = None,
         demand: Optional[Dict[str, int]] = None,
         curiosity: Optional[Dict[str, Any]] = None,
+        agents: Optional[List[AgentView]] = None,
     ) -> List[Dict[str, Any]]:
         """Suggest actions to advance active goals. Costs 0.5 RTC.
 
         Cross-references goals with roster/demand/curiosity to find opportunities.
+        Callers that reuse a roster can pass ``agents=prepare_roster(roster)``
+        instead, so it is normalized only once.
         """
-        roster = roster or []
         demand = demand or {}
         curiosity = curiosity or {}
-        suggestions = []
-
-        for goal in self.active_goals():
-            title_lower = goal["title"].lower()
-            category = goal.get("category", "")
-
-            # Skill goals: check if anyone on roster offers what we want to learn
-            if category == "skill":
-                for agent in roster:
-                    offers = [o.lower() for o in agent.get("offers", [])]
-                    if any(kw in offer for kw in title_lower.split() for offer in offers):
-                        suggestions.append({
-                            "goal_id": goal["goal_id"],
+
+        if agents is None:
+            agents = prepare_roster(roster or [])
+
+        active = self._select("active")
+        # Group goals by category so the roster (or demand) is walked once per
+        # category, testing each agent against every goal of that category
+        by_category: Dict[str, List[Tuple[str, Tuple[str, ...]]]] = {}
+        for goal in active:
+            gid = goal["goal_id"]
+            by_category.setdefault(goal.get("category", ""), []).append((gid, self._keywords[gid]))
+        found: Dict[str, List[Dict[str, Any]]] = {goal["goal_id"]: [] for goal in active}
+
+        # Skill goals: check if anyone on roster offers what we want to learn
+        skill_goals = by_category.get("skill")
+        if skill_goals:
+            for agent, offers, _ in agents:
+                for gid, keywords in skill_goals:
+                    if any(kw in offers for kw in keywords):
+                        found[gid].append({
+                            "goal_id": gid,
                             "type": "skill_match",
                             "agent_id": agent.get("agent_id", ""),
                             "detail": f"{agent.get('name', agent.get('agent_id', ''))} offers related skill",
                             "rtc_cost": RTC_COST_SUGGEST_ACTIONS,
                         })
 
-            # Connection goals: check roster for matching interests
-            if category == "connection":
-                for agent in roster:
-                    topics = [t.lower() for t in agent.get("topics", [])]
-                    curiosities = [c.lower() for c in agent.get("curiosities", [])]
-                    combined = topics + curiosities
-                    if any(kw in item for kw in title_lower.split() for item in combined):
-                        suggestions.append({
-                            "goal_id": goal["goal_id"],
+        # Connection goals: check roster for matching interests
+        connection_goals = by_category.get("connection")
+        if connection_goals:
+            for agent, _, interests in agents:
+                for gid, keywords in connection_goals:
+                    if any(kw in interests for kw in keywords):
+                        found[gid].append({
+                            "goal_id": gid,
                             "type": "connection_match",
                             "agent_id": agent.get("agent_id", ""),
                             "detail": f"Shared interest with {agent.get('name', agent.get('agent_id', ''))}",
                             "rtc_cost": RTC_COST_SUGGEST_ACTIONS,
                         })
 
-            # RTC goals: check demand signals for earning opportunities
-            if category == "rtc":
-                for skill, count in demand.items():
-                    if count >= 2 and any(kw in skill for kw in title_lower.split()):
-                        suggestions.append({
-                            "goal_id": goal["goal_id"],
+        # RTC goals: check demand signals for earning opportunities
+        rtc_goals = by_category.get("rtc")
+        if rtc_goals:
+            for skill, count in demand.items():
+                if count < 2:
+                    continue
+                for gid, keywords in rtc_goals:
+                    if any(kw in skill for kw in keywords):
+                        found[gid].append({
+                            "goal_id": gid,
                             "type": "demand_match",
                             "detail": f"'{skill}' has {count} demand signals — potential RTC opportunity",
                             "rtc_cost": RTC_COST_SUGGEST_ACTIONS,
                         })
 
-        return suggestions
+        # Report goal by goal, most recently updated first, as before
+        return [s for goal in active for s in found[goal["goal_id"]]]
 
     def auto_create_from_gaps(
         self,
@@ -342,7 +492,7 @@ class GoalManager:
         created = []
 
         # Only create goals for skills with real demand
-        existing_titles = {g["title"].lower() for g in self._goals.values()}
+        existing_titles = self._titles_lower
 
         for skill in skill_gaps:
             candidate_title = f"Learn {skill}".lower()
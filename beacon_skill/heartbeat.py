@@ -14,12 +14,15 @@ Key properties:
 Beacon 2.4.0 — Elyan Labs.
 """
 
-import json
+import atexit
 import time
+from bisect import bisect_left, insort
+from concurrent.futures import Future, ThreadPoolExecutor
+from itertools import islice
 from pathlib import Path
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, List, Optional, Tuple
 
-from .storage import _dir
+from .storage import _atomic_write, _dir, _dumps, _iter_jsonl_reversed, _loads
 
 
 HEARTBEATS_FILE = "heartbeats.json"
@@ -27,14 +30,38 @@ HEARTBEAT_LOG_FILE = "heartbeat_log.jsonl"
 DEFAULT_INTERVAL_S = 300       # 5 minutes between heartbeats
 DEFAULT_SILENCE_THRESHOLD_S = 900  # 15 minutes silence = concern
 DEFAULT_DEAD_THRESHOLD_S = 3600    # 1 hour silence = presumed dead
+LOG_FLUSH_ENTRIES = 32         # buffered log lines before a forced write
 
 
 class HeartbeatManager:
     """Track agent liveness via periodic signed heartbeat beacons."""
 
-    def __init__(self, data_dir: Optional[Path] = None, config: Optional[Dict] = None):
+    def __init__(self, data_dir: Optional[Path] = None, config: Optional[Dict] = None,
+                 flush_interval_s: float = 0.0):
+        """``flush_interval_s`` > 0 coalesces state rewrites and heartbeat log
+        appends into one write per interval; pending writes go out on
+        ``flush()`` and at exit.
+        """
         self._dir = data_dir or _dir()
         self._config = config or {}
+        self._flush_interval_s = flush_interval_s
+        self._state_dirty = False
+        self._last_state_flush = 0.0
+        # Parsed heartbeats.json, reused while the file's (mtime, size) holds
+        self._state_cache: Optional[Dict[str, Any]] = None
+        self._state_mtime: Optional[Tuple[int, int]] = None
+        # Bumped whenever the state dict is replaced or saved
+        self._state_version = 0
+        # (last_beat, agent_id) pairs, oldest first, valid for _beat_version
+        self._beat_index: List[Tuple[int, str]] = []
+        self._beat_version = -1
+        # Log lines awaiting a single batched append
+        self._log_buffer: List[bytes] = []
+        self._last_flush = 0.0
+        # Single worker for background anchors, created on first use
+        self._anchor_pool: Optional[ThreadPoolExecutor] = None
+        if flush_interval_s > 0:
+            atexit.register(self.flush)
 
     def _state_path(self) -> Path:
         return self._dir / HEARTBEATS_FILE
@@ -43,28 +70,64 @@ class HeartbeatManager:
         return self._dir / HEARTBEAT_LOG_FILE
 
     def _load_state(self) -> Dict[str, Any]:
+        if self._state_dirty:
+            return self._state_cache  # newer than the file
         path = self._state_path()
-        if not path.exists():
-            return {"own": {}, "peers": {}}
         try:
-            data = json.loads(path.read_text(encoding="utf-8"))
-            data.setdefault("own", {})
-            data.setdefault("peers", {})
-            return data
-        except Exception:
-            return {"own": {}, "peers": {}}
+            st = path.stat()
+            stamp: Optional[Tuple[int, int]] = (st.st_mtime_ns, st.st_size)
+        except OSError:
+            stamp = None  # missing file; cached as an empty state
+        if self._state_cache is not None and stamp == self._state_mtime:
+            return self._state_cache
+        data: Dict[str, Any] = {"own": {}, "peers": {}}
+        if stamp is not None:
+            try:
+                data = _loads(path.read_bytes())
+                data.setdefault("own", {})
+                data.setdefault("peers", {})
+            except Exception:
+                data = {"own": {}, "peers": {}}
+        self._state_cache, self._state_mtime = data, stamp
+        self._state_version += 1
+        return data
 
     def _save_state(self, state: Dict[str, Any]) -> None:
-        self._state_path().parent.mkdir(parents=True, exist_ok=True)
-        self._state_path().write_text(
-            json.dumps(state, indent=2, sort_keys=True) + "\n",
-            encoding="utf-8",
-        )
+        self._state_cache = state
+        self._state_version += 1
+        self._state_dirty = True
+        if time.time() - self._last_state_flush >= self._flush_interval_s:
+            # Write-through replaces are cheap; fsync is kept for batched flushes
+            self._flush_state(fsync=self._flush_interval_s > 0)
+
+    def _flush_state(self, fsync: bool = True) -> None:
+        if self._state_dirty:
+            path = self._state_path()
+            path.parent.mkdir(parents=True, exist_ok=True)
+            _atomic_write(path, _dumps(self._state_cache, pretty=True), fsync=fsync)
+            st = path.stat()
+            self._state_mtime = (st.st_mtime_ns, st.st_size)
+            self._state_dirty = False
+        self._last_state_flush = time.time()
 
     def _append_log(self, entry: Dict[str, Any]) -> None:
-        self._log_path().parent.mkdir(parents=True, exist_ok=True)
-        with self._log_path().open("a", encoding="utf-8") as f:
-            f.write(json.dumps(entry, sort_keys=True) + "\n")
+        self._log_buffer.append(_dumps(entry) + b"\n")
+        if (len(self._log_buffer) >= LOG_FLUSH_ENTRIES
+                or time.time() - self._last_flush >= self._flush_interval_s):
+            self._flush_log()
+
+    def _flush_log(self) -> None:
+        if self._log_buffer:
+            self._log_path().parent.mkdir(parents=True, exist_ok=True)
+            with self._log_path().open("ab") as f:
+                f.write(b"".join(self._log_buffer))
+            self._log_buffer.clear()
+        self._last_flush = time.time()
+
+    def flush(self) -> None:
+        """Write pending state and buffered heartbeat log entries to disk."""
+        self._flush_state()
+        self._flush_log()
 
     # ── Building heartbeat envelopes ──
 
@@ -127,7 +190,9 @@ class HeartbeatManager:
 
         now = int(time.time())
         state = self._load_state()
+        order = self._beat_order(state)
 
+        known = agent_id in state["peers"]
         prev = state["peers"].get(agent_id, {})
         prev_beat = prev.get("last_beat", 0)
         gap_s = (now - prev_beat) if prev_beat else 0
@@ -147,6 +212,14 @@ class HeartbeatManager:
         state["peers"][agent_id] = peer_entry
         self._save_state(state)
 
+        # Keep the beat-ordered index current instead of re-sorting later
+        if known:
+            i = bisect_left(order, (prev_beat, agent_id))
+            if i < len(order) and order[i] == (prev_beat, agent_id):
+                del order[i]
+        insort(order, (now, agent_id))
+        self._beat_version = self._state_version
+
         # Log the heartbeat
         self._append_log({
             "ts": now,
@@ -160,36 +233,64 @@ class HeartbeatManager:
             "agent_id": agent_id,
             "status": envelope.get("status", "alive"),
             "gap_s": gap_s,
-            "assessment": self._assess_peer(agent_id),
+            # Classify the entry just written; no reload of the saved state
+            "assessment": self._assess(peer_entry, now, *self._thresholds()),
         }
 
     # ── Peer assessment ──
 
-    def _assess_peer(self, agent_id: str) -> str:
-        """Assess a peer's liveness based on heartbeat history.
-
-        Returns: "healthy", "silent", "concerning", "presumed_dead"
-        """
+    def _thresholds(self) -> Tuple[int, int]:
+        """(silence, dead) thresholds in seconds from config."""
         hb_cfg = self._config.get("heartbeat", {})
-        silence_threshold = hb_cfg.get("silence_threshold_s", DEFAULT_SILENCE_THRESHOLD_S)
-        dead_threshold = hb_cfg.get("dead_threshold_s", DEFAULT_DEAD_THRESHOLD_S)
-
-        state = self._load_state()
-        peer = state["peers"].get(agent_id)
-        if not peer:
-            return "unknown"
-
-        now = int(time.time())
-        age = now - peer.get("last_beat", 0)
+        return (
+            hb_cfg.get("silence_threshold_s", DEFAULT_SILENCE_THRESHOLD_S),
+            hb_cfg.get("dead_threshold_s", DEFAULT_DEAD_THRESHOLD_S),
+        )
 
+    @staticmethod
+    def _assess(peer: Dict[str, Any], now: int, silence_threshold: int, dead_threshold: int) -> str:
+        """Classify one peer record; no I/O, so safe to call in bulk loops."""
         if peer.get("status") == "shutting_down":
             return "shutting_down"
+        age = now - peer.get("last_beat", 0)
         if age <= silence_threshold:
             return "healthy"
         if age <= dead_threshold:
             return "concerning"
         return "presumed_dead"
 
+    def _assess_peer(self, agent_id: str, state: Optional[Dict[str, Any]] = None,
+                     now: Optional[int] = None) -> str:
+        """Assess a peer's liveness based on heartbeat history.
+
+        ``state`` and ``now`` let callers that already hold them skip a
+        reload and a clock read.
+
+        Returns: "healthy", "silent", "concerning", "presumed_dead"
+        """
+        if state is None:
+            state = self._load_state()
+        peer = state["peers"].get(agent_id)
+        if not peer:
+            return "unknown"
+        if now is None:
+            now = int(time.time())
+        return self._assess(peer, now, *self._thresholds())
+
+    def _beat_order(self, state: Dict[str, Any]) -> List[Tuple[int, str]]:
+        """Peers as (last_beat, agent_id), oldest first.
+
+        Silence queries bisect this instead of scanning every peer. It is
+        rebuilt only after the state was saved or reloaded from outside
+        ``process_heartbeat``, which maintains it incrementally.
+        """
+        if self._beat_version != self._state_version:
+            self._beat_index = sorted(
+                (peer.get("last_beat", 0), aid) for aid, peer in state["peers"].items()
+            )
+            self._beat_version = self._state_version
+        return self._beat_index
+
     def peer_status(self, agent_id: str) -> Optional[Dict[str, Any]]:
         """Get detailed status for a specific peer."""
         state = self._load_state()
@@ -201,34 +302,49 @@ class HeartbeatManager:
         result = dict(peer)
         result["agent_id"] = agent_id
         result["age_s"] = now - peer.get("last_beat", 0)
-        result["assessment"] = self._assess_peer(agent_id)
+        result["assessment"] = self._assess(peer, now, *self._thresholds())
         return result
 
     def all_peers(self, include_dead: bool = False) -> List[Dict[str, Any]]:
         """Get all tracked peers with liveness assessment."""
         state = self._load_state()
+        peers = state["peers"]
         now = int(time.time())
+        silence_threshold, dead_threshold = self._thresholds()
+        assess = self._assess
+
         results = []
 
-        for agent_id, peer in state["peers"].items():
-            assessment = self._assess_peer(agent_id)
+        # The beat index is already ordered, so newest-first needs no sort
+        for last_beat, agent_id in reversed(self._beat_order(state)):
+            peer = peers[agent_id]
+            assessment = assess(peer, now, silence_threshold, dead_threshold)
             if not include_dead and assessment == "presumed_dead":
                 continue
-            entry = dict(peer)
-            entry["agent_id"] = agent_id
-            entry["age_s"] = now - peer.get("last_beat", 0)
-            entry["assessment"] = assessment
-            results.append(entry)
+            results.append(dict(peer, agent_id=agent_id, age_s=now - last_beat, assessment=assessment))
 
-        results.sort(key=lambda x: x.get("last_beat", 0), reverse=True)
         return results
 
     def silent_peers(self) -> List[Dict[str, Any]]:
         """Get peers whose heartbeats have gone silent (concerning or worse)."""
-        return [
-            p for p in self.all_peers(include_dead=True)
-            if p.get("assessment") in ("concerning", "presumed_dead")
-        ]
+        state = self._load_state()
+        now = int(time.time())
+        silence_threshold, dead_threshold = self._thresholds()
+        order = self._beat_order(state)
+        # Only peers older than the silence threshold can be concerning or dead
+        cut = bisect_left(order, (now - silence_threshold, ""))
+        results = []
+        for last_beat, agent_id in reversed(order[:cut]):
+            peer = state["peers"][agent_id]
+            assessment = self._assess(peer, now, silence_threshold, dead_threshold)
+            if assessment not in ("concerning", "presumed_dead"):
+                continue
+            entry = dict(peer)
+            entry["agent_id"] = agent_id
+            entry["age_s"] = now - last_beat
+            entry["assessment"] = assessment
+            results.append(entry)
+        return results
 
     def own_status(self) -> Dict[str, Any]:
         """Get our own heartbeat status."""
@@ -239,34 +355,40 @@ class HeartbeatManager:
 
     def prune_dead(self, max_age_s: Optional[int] = None) -> int:
         """Remove peers that have been dead beyond threshold. Returns count removed."""
-        threshold = max_age_s or self._config.get("heartbeat", {}).get("dead_threshold_s", DEFAULT_DEAD_THRESHOLD_S) * 3
+        threshold = max_age_s or self._thresholds()[1] * 3
         now = int(time.time())
         state = self._load_state()
 
-        stale = [
-            aid for aid, peer in state["peers"].items()
-            if (now - peer.get("last_beat", 0)) > threshold
-        ]
-        for aid in stale:
+        # Stale peers are exactly the oldest prefix of the beat index
+        order = self._beat_order(state)
+        cut = bisect_left(order, (now - threshold, ""))
+        if not cut:
+            return 0
+        for _, aid in order[:cut]:
             del state["peers"][aid]
-        if stale:
-            self._save_state(state)
-        return len(stale)
+        del order[:cut]
+        self._save_state(state)
+        self._beat_version = self._state_version
+        return cut
 
     def heartbeat_log(self, limit: int = 100) -> List[Dict[str, Any]]:
         """Read recent heartbeat log entries."""
-        if not self._log_path().exists():
+        return self._recent_log(limit)
+
+    def _recent_log(self, limit: int, match: Any = None) -> List[Dict[str, Any]]:
+        """Last ``limit`` log entries (oldest first) accepted by ``match``.
+
+        Reads the log backwards, so only the tail that is needed is parsed.
+        """
+        self._flush_log()
+        if limit <= 0 or not self._log_path().exists():
             return []
-        results = []
-        for line in self._log_path().read_text(encoding="utf-8").splitlines():
-            line = line.strip()
-            if not line:
-                continue
-            try:
-                results.append(json.loads(line))
-            except Exception:
-                continue
-        return results[-limit:]
+        entries = _iter_jsonl_reversed(self._log_path())
+        if match is not None:
+            entries = filter(match, entries)
+        results = list(islice(entries, limit))
+        results.reverse()
+        return results
 
     # ── Convenience: beat + anchor ──
 
@@ -279,6 +401,7 @@ class HeartbeatManager:
         config: Optional[Dict] = None,
         anchor: bool = False,
         anchor_mgr: Any = None,
+        anchor_async: bool = False,
     ) -> Dict[str, Any]:
         """Send a heartbeat: build payload, log it, optionally anchor.
 
@@ -292,9 +415,12 @@ class HeartbeatManager:
             config: Optional config override.
             anchor: If True, anchor this heartbeat on-chain.
             anchor_mgr: AnchorManager instance (required if anchor=True).
+            anchor_async: If True, anchor on a background thread and return
+                immediately with an ``anchor_future`` instead of waiting.
 
         Returns:
-            Dict with heartbeat payload and optional anchor result.
+            Dict with heartbeat payload and optional anchor result
+            (``anchor``/``anchor_error``, or ``anchor_future`` when async).
         """
         payload = self.build_heartbeat(
             identity, status=status, health=health, config=config,
@@ -312,21 +438,35 @@ class HeartbeatManager:
         result: Dict[str, Any] = {"heartbeat": payload}
 
         if anchor and anchor_mgr is not None:
+            if anchor_async:
+                result["anchor_future"] = self._submit_anchor(anchor_mgr, payload)
+                return result
             try:
-                anchor_result = anchor_mgr.anchor(
-                    payload,
-                    data_type="heartbeat",
-                    metadata={
-                        "agent_id": payload["agent_id"],
-                        "beat_count": payload["beat_count"],
-                    },
-                )
-                result["anchor"] = anchor_result
+                result["anchor"] = self._anchor_beat(anchor_mgr, payload)
             except Exception as e:
                 result["anchor_error"] = str(e)
 
         return result
 
+    @staticmethod
+    def _anchor_beat(anchor_mgr: Any, payload: Dict[str, Any]) -> Any:
+        return anchor_mgr.anchor(
+            payload,
+            data_type="heartbeat",
+            metadata={
+                "agent_id": payload["agent_id"],
+                "beat_count": payload["beat_count"],
+            },
+        )
+
+    def _submit_anchor(self, anchor_mgr: Any, payload: Dict[str, Any]) -> Future:
+        """Queue an anchor on the background worker; anchors run in beat order."""
+        if self._anchor_pool is None:
+            self._anchor_pool = ThreadPoolExecutor(
+                max_workers=1, thread_name_prefix="beacon-anchor",
+            )
+        return self._anchor_pool.submit(self._anchor_beat, anchor_mgr, payload)
+
     # ── Silence detection ──
 
     def check_silence(self, threshold_s: Optional[int] = None) -> List[Dict[str, Any]]:
@@ -334,42 +474,36 @@ class HeartbeatManager:
 
         Returns list of {agent_id, last_beat_ts, silence_s, assessment}.
         """
-        hb_cfg = self._config.get("heartbeat", {})
-        threshold = threshold_s or hb_cfg.get(
-            "silence_threshold_s", DEFAULT_SILENCE_THRESHOLD_S,
-        )
+        silence_threshold, dead_threshold = self._thresholds()
+        threshold = threshold_s or silence_threshold
         now = int(time.time())
         state = self._load_state()
+        order = self._beat_order(state)
+        # Oldest beats first, which is already longest silence first
+        cut = bisect_left(order, (now - threshold, ""))
         silent = []
 
-        for agent_id, peer in state["peers"].items():
-            last_beat = peer.get("last_beat", 0)
-            silence = now - last_beat
-            if silence > threshold:
-                silent.append({
-                    "agent_id": agent_id,
-                    "name": peer.get("name", ""),
-                    "last_beat_ts": last_beat,
-                    "silence_s": silence,
-                    "assessment": self._assess_peer(agent_id),
-                })
-
-        silent.sort(key=lambda x: x["silence_s"], reverse=True)
+        for last_beat, agent_id in order[:cut]:
+            peer = state["peers"][agent_id]
+            silent.append({
+                "agent_id": agent_id,
+                "name": peer.get("name", ""),
+                "last_beat_ts": last_beat,
+                "silence_s": now - last_beat,
+                "assessment": self._assess(peer, now, silence_threshold, dead_threshold),
+            })
+
         return silent
 
     # ── History queries ──
 
     def my_history(self, limit: int = 50) -> List[Dict[str, Any]]:
         """Our own sent heartbeat log entries."""
-        entries = self.heartbeat_log(limit=limit * 2)
-        own = [e for e in entries if e.get("direction") == "sent"]
-        return own[-limit:]
+        return self._recent_log(limit, lambda e: e.get("direction") == "sent")
 
     def agent_history(self, agent_id: str, limit: int = 50) -> List[Dict[str, Any]]:
         """Heartbeat history for a specific peer agent."""
-        entries = self.heartbeat_log(limit=limit * 5)
-        filtered = [e for e in entries if e.get("agent_id") == agent_id]
-        return filtered[-limit:]
+        return self._recent_log(limit, lambda e: e.get("agent_id") == agent_id)
 
     # ── Daily digest ──
 
@@ -383,17 +517,17 @@ class HeartbeatManager:
 
         state = self._load_state()
         own = state.get("own", {})
+        silence_threshold, dead_threshold = self._thresholds()
 
-        # Count peers seen today vs silent
-        peers_seen = 0
+        # Count peers seen today vs silent by bisecting the beat order
+        order = self._beat_order(state)
+        peers_seen = len(order) - bisect_left(order, (today_start, ""))
         peers_silent = 0
-        for agent_id, peer in state["peers"].items():
-            if peer.get("last_beat", 0) >= today_start:
-                peers_seen += 1
-            else:
-                assessment = self._assess_peer(agent_id)
-                if assessment in ("concerning", "presumed_dead"):
-                    peers_silent += 1
+        cut = bisect_left(order, (min(today_start, now - silence_threshold), ""))
+        for _, agent_id in order[:cut]:
+            assessment = self._assess(state["peers"][agent_id], now, silence_threshold, dead_threshold)
+            if assessment in ("concerning", "presumed_dead"):
+                peers_silent += 1
 
         return {
             "date": time.strftime("%Y-%m-%d", time.gmtime(now)),
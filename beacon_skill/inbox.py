@@ -1,36 +1,77 @@
 """Inbound parsing: read, verify, filter, and track inbox entries."""
 
-import json
 import time
+from functools import lru_cache
 from pathlib import Path
-from typing import Any, Dict, List, Optional
+from typing import Any, Callable, Dict, FrozenSet, Iterable, List, NamedTuple, Optional, Tuple
 
 from .codec import decode_envelopes, verify_envelope
-from .storage import _dir, read_state, write_state
+from .identity import agent_id_from_pubkey
+from .storage import _dir, _dumps, _iter_jsonl, _loads, read_state, write_state
 
 
 KNOWN_KEYS_FILE = "known_keys.json"
+MAX_READ_NONCES = 10000  # read marks kept, oldest dropped first
+
+# known_keys.json as last read or written, reused while its stamp holds
+_KEYS_CACHE: Dict[str, Any] = {"stamp": None, "keys": {}}
+
+# Read-nonce lookup set, reused while state.json's stamp holds
+_NONCES_CACHE: Dict[str, Any] = {"stamp": None, "nonces": frozenset()}
+
+# Parsed inbox.jsonl as _ParsedEntry records, reused while the file's
+# (path, mtime, size) stamp holds
+_PARSED_CACHE: Dict[str, Any] = {"stamp": None, "entries": []}
 
 
 def _known_keys_path() -> Path:
     return _dir() / KNOWN_KEYS_FILE
 
 
+class _EnvelopeView(NamedTuple):
+    """An envelope with the fields read_inbox filters on, extracted once per parse."""
+    env: Dict[str, Any]
+    kind: Any
+    agent_id: Any
+    nonce: str
+
+
+class _ParsedEntry(NamedTuple):
+    """One inbox.jsonl line with its envelopes decoded."""
+    entry: Dict[str, Any]
+    received_at: Any
+    envelopes: List[_EnvelopeView]
+
+
+def _file_stamp(path: Path) -> Tuple[str, int, int]:
+    st = path.stat()
+    return (str(path), st.st_mtime_ns, st.st_size)
+
+
 def load_known_keys() -> Dict[str, str]:
     """Load agent_id -> public_key_hex mapping from disk."""
     path = _known_keys_path()
-    if not path.exists():
-        return {}
     try:
-        return json.loads(path.read_text(encoding="utf-8"))
-    except Exception:
+        stamp = _file_stamp(path)
+    except OSError:
         return {}
+    if _KEYS_CACHE["stamp"] != stamp:
+        try:
+            keys = _loads(path.read_bytes())
+        except Exception:
+            keys = {}
+        _KEYS_CACHE["stamp"] = stamp
+        _KEYS_CACHE["keys"] = keys
+    # Callers add keys to the result; the cached copy stays pristine
+    return dict(_KEYS_CACHE["keys"])
 
 
 def save_known_keys(keys: Dict[str, str]) -> None:
     """Save known keys to disk."""
     path = _known_keys_path()
-    path.write_text(json.dumps(keys, indent=2, sort_keys=True) + "\n", encoding="utf-8")
+    path.write_bytes(_dumps(keys, pretty=True))
+    _KEYS_CACHE["stamp"] = _file_stamp(path)
+    _KEYS_CACHE["keys"] = dict(keys)
 
 
 def trust_key(agent_id: str, pubkey_hex: str) -> None:
@@ -40,34 +81,118 @@ def trust_key(agent_id: str, pubkey_hex: str) -> None:
     save_known_keys(keys)
 
 
+@lru_cache(maxsize=1024)
+def _derive_agent_id(pubkey_hex: str) -> str:
+    """agent_id for a hex public key; memoized since peers resend the same key."""
+    return agent_id_from_pubkey(bytes.fromhex(pubkey_hex))
+
+
 def _learn_key_from_envelope(env: Dict[str, Any], keys: Dict[str, str]) -> Dict[str, str]:
     """Auto-learn pubkey from v2 envelopes (trust on first use)."""
     agent_id = env.get("agent_id", "")
     pubkey = env.get("pubkey", "")
     if agent_id and pubkey and agent_id not in keys:
-        from .identity import agent_id_from_pubkey
-        expected = agent_id_from_pubkey(bytes.fromhex(pubkey))
+        expected = _derive_agent_id(pubkey)
         if expected == agent_id:
             keys[agent_id] = pubkey
     return keys
 
 
-def _read_nonces() -> set:
+def _read_nonces() -> FrozenSet[str]:
     """Get set of already-read nonces from state."""
-    state = read_state()
-    return set(state.get("read_nonces", []))
+    try:
+        stamp = _file_stamp(_dir() / "state.json")
+    except OSError:
+        return frozenset()
+    if _NONCES_CACHE["stamp"] != stamp:
+        _NONCES_CACHE["nonces"] = frozenset(read_state().get("read_nonces", []))
+        _NONCES_CACHE["stamp"] = stamp
+    return _NONCES_CACHE["nonces"]
 
 
-def _save_read_nonce(nonce: str) -> None:
-    """Mark a nonce as read."""
+def _save_read_nonces(marks: Iterable[str]) -> None:
+    """Mark nonces as read with a single state write."""
     state = read_state()
-    nonces = set(state.get("read_nonces", []))
-    nonces.add(nonce)
-    # Keep bounded (last 10000 nonces).
-    if len(nonces) > 10000:
-        nonces = set(list(nonces)[-10000:])
-    state["read_nonces"] = sorted(nonces)
-    write_state(state)
+    # A ring of MAX_READ_NONCES slots; once full, read_nonces_head is the
+    # oldest mark and gets overwritten next
+    nonces = state.get("read_nonces", [])
+    if len(nonces) > MAX_READ_NONCES:
+        del nonces[:-MAX_READ_NONCES]  # cap lowered since the ring was filled
+        state["read_nonces_head"] = 0
+    changed = False
+    for nonce in marks:
+        if nonce in nonces:
+            continue
+        if len(nonces) < MAX_READ_NONCES:
+            nonces.append(nonce)
+        else:
+            head = state.get("read_nonces_head", 0) % MAX_READ_NONCES
+            nonces[head] = nonce
+            state["read_nonces_head"] = (head + 1) % MAX_READ_NONCES
+        changed = True
+    if changed:
+        state["read_nonces"] = nonces
+        write_state(state)
+        _NONCES_CACHE["stamp"] = None  # don't trust mtime granularity for our own writes
+
+
+def _load_entries(path: Path) -> List[_ParsedEntry]:
+    """Parse inbox.jsonl and decode envelopes, or reuse the last parse if unchanged."""
+    stamp = _file_stamp(path)
+    if _PARSED_CACHE["stamp"] == stamp:
+        return _PARSED_CACHE["entries"]
+    entries = []
+    for entry in _iter_jsonl(path):
+        envelopes = entry.get("envelopes", [])
+        if not envelopes and entry.get("text"):
+            envelopes = decode_envelopes(entry["text"])
+        views = [
+            _EnvelopeView(env, env.get("kind"), env.get("agent_id"), env.get("nonce", ""))
+            for env in envelopes
+        ]
+        entries.append(_ParsedEntry(entry, entry.get("received_at", 0), views))
+    _PARSED_CACHE["stamp"] = stamp
+    _PARSED_CACHE["entries"] = entries
+    return entries
+
+
+def _enrich(
+    entry: Dict[str, Any],
+    env: Optional[Dict[str, Any]],
+    verified: Optional[bool],
+    is_read: bool,
+) -> Dict[str, Any]:
+    """Flat result record: a shallow copy of the entry plus the per-envelope fields."""
+    return {**entry, "envelope": env, "verified": verified, "is_read": is_read}
+
+
+_Predicate = Callable[[_ParsedEntry, _EnvelopeView, bool], bool]
+
+
+def _envelope_filter(
+    kind: Optional[str],
+    agent_id: Optional[str],
+    since: Optional[float],
+    unread_only: bool,
+) -> Optional[_Predicate]:
+    """Compose the active read_inbox filters into one (parsed, view, is_read) predicate.
+
+    Returns None when no filter is set, so callers can skip the check entirely.
+    """
+    checks: List[_Predicate] = []
+    if kind:
+        checks.append(lambda parsed, view, is_read: view.kind == kind)
+    if agent_id:
+        checks.append(lambda parsed, view, is_read: view.agent_id == agent_id)
+    if since:
+        checks.append(lambda parsed, view, is_read: parsed.received_at >= since)
+    if unread_only:
+        checks.append(lambda parsed, view, is_read: not is_read)
+    if not checks:
+        return None
+    if len(checks) == 1:
+        return checks[0]
+    return lambda parsed, view, is_read: all(check(parsed, view, is_read) for check in checks)
 
 
 def read_inbox(
@@ -89,66 +214,37 @@ def read_inbox(
         return []
 
     known_keys = load_known_keys()
+    known_before = len(known_keys)
     read_nonces = _read_nonces()
     results: List[Dict[str, Any]] = []
+    keep = _envelope_filter(kind, agent_id, since, unread_only)
 
-    for line in path.read_text(encoding="utf-8").splitlines():
-        line = line.strip()
-        if not line:
-            continue
-        try:
-            entry = json.loads(line)
-        except Exception:
-            continue
-
-        # Extract envelopes from the entry.
-        envelopes = entry.get("envelopes", [])
-        if not envelopes and entry.get("text"):
-            envelopes = decode_envelopes(entry["text"])
-
+    for parsed in _load_entries(path):
         # Process each envelope in the entry.
-        for env in envelopes:
-            # Auto-learn keys.
-            _learn_key_from_envelope(env, known_keys)
-
-            # Verify signature.
-            verified = verify_envelope(env, known_keys=known_keys)
-            nonce = env.get("nonce", "")
-            is_read = nonce in read_nonces if nonce else False
-
-            enriched = dict(entry)
-            enriched["envelope"] = env
-            enriched["verified"] = verified
-            enriched["is_read"] = is_read
-
-            # Apply filters.
-            if kind and env.get("kind") != kind:
-                continue
-            if agent_id and env.get("agent_id") != agent_id:
-                continue
-            if since and entry.get("received_at", 0) < since:
-                continue
-            if unread_only and is_read:
+        for view in parsed.envelopes:
+            # Auto-learn keys, even from envelopes filtered out below.
+            _learn_key_from_envelope(view.env, known_keys)
+
+            is_read = view.nonce in read_nonces if view.nonce else False
+            if keep is not None and not keep(parsed, view, is_read):
                 continue
 
-            results.append(enriched)
+            # Verify signature (the costly step) only for envelopes we return.
+            verified = verify_envelope(view.env, known_keys=known_keys)
+            results.append(_enrich(parsed.entry, view.env, verified, is_read))
 
         # If no envelopes, include the raw entry (e.g., plain text UDP).
-        if not envelopes:
-            enriched = dict(entry)
-            enriched["envelope"] = None
-            enriched["verified"] = None
-            enriched["is_read"] = False
-
+        if not parsed.envelopes:
             if kind or agent_id:
                 continue  # Can't filter raw entries by kind/agent_id.
-            if since and entry.get("received_at", 0) < since:
+            if since and parsed.received_at < since:
                 continue
 
-            results.append(enriched)
+            results.append(_enrich(parsed.entry, None, None, False))
 
-    # Save any newly learned keys.
-    save_known_keys(known_keys)
+    # Save any newly learned keys (learning only ever adds entries).
+    if len(known_keys) != known_before:
+        save_known_keys(known_keys)
 
     if limit:
         results = results[-limit:]
@@ -158,7 +254,12 @@ def read_inbox(
 
 def mark_read(nonce: str) -> None:
     """Mark an envelope nonce as read."""
-    _save_read_nonce(nonce)
+    _save_read_nonces((nonce,))
+
+
+def mark_read_many(nonces: Iterable[str]) -> None:
+    """Mark several envelope nonces as read with one state write."""
+    _save_read_nonces(nonces)
 
 
 def inbox_count(unread_only: bool = False) -> int:
@@ -167,11 +268,42 @@ def inbox_count(unread_only: bool = False) -> int:
     return len(entries)
 
 
+def get_entries_by_nonces(nonces: Iterable[str]) -> Dict[str, Dict[str, Any]]:
+    """Find inbox entries for several nonces in one scan.
+
+    Returns {nonce: enriched entry} for the first envelope carrying each
+    nonce; nonces not in the inbox are absent. Only matching envelopes are
+    verified, and the scan stops once every nonce has been found.
+    """
+    wanted = set(nonces)
+    path = _dir() / "inbox.jsonl"
+    if not wanted or not path.exists():
+        return {}
+
+    known_keys = load_known_keys()
+    known_before = len(known_keys)
+    read_nonces = _read_nonces()
+    found: Dict[str, Dict[str, Any]] = {}
+
+    for parsed in _load_entries(path):
+        for view in parsed.envelopes:
+            # Keys learned from earlier envelopes can verify later ones.
+            _learn_key_from_envelope(view.env, known_keys)
+            nonce = view.nonce
+            if nonce not in wanted or nonce in found:
+                continue
+            verified = verify_envelope(view.env, known_keys=known_keys)
+            found[nonce] = _enrich(parsed.entry, view.env, verified, nonce in read_nonces)
+        if len(found) == len(wanted):
+            break
+
+    if len(known_keys) != known_before:
+        save_known_keys(known_keys)
+    return found
+
+
 def get_entry_by_nonce(nonce: str) -> Optional[Dict[str, Any]]:
     """Find a specific inbox entry by its nonce."""
-    entries = read_inbox()
-    for entry in entries:
-        env = entry.get("envelope")
-        if env and env.get("nonce") == nonce:
-            return entry
-    return None
+    if not nonce:
+        return None
+    return get_entries_by_nonces((nonce,)).get(nonce)
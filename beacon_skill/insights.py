@@ -4,17 +4,21 @@ Finds actionable intelligence: contact timing, topic trends, success patterns.
 Reads from inbox.jsonl, interactions.jsonl, tasks.jsonl — never writes to them.
 """
 
-import json
+import io
+import os
 import time
 from collections import Counter
+from itertools import chain
+from operator import itemgetter
 from pathlib import Path
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, Iterator, List, Optional, Tuple
 
-from .storage import _dir
+from .storage import _atomic_write, _dir, _dumps, _iter_jsonl, _loads, _log_identity, _parse_jsonl
 
 
 INSIGHTS_JSONL = "insights.jsonl"
 INSIGHTS_CACHE = "insights_cache.json"
+INSIGHTS_INDEX = "insights_index.json"  # incremental inbox.jsonl fold state
 CACHE_TTL_S = 300  # 5 minutes
 
 # RTC costs
@@ -23,6 +27,10 @@ RTC_COST_COMPATIBILITY = 1.0
 RTC_COST_CONTACTS = 1.0
 RTC_COST_SKILLS = 0.5
 
+# UTC offsets are whole multiples of 15 minutes, so every timestamp in one
+# aligned 15-minute slot falls in the same local hour
+_HOUR_SLOT_S = 900
+
 
 class InsightsManager:
     """Detect patterns from agent interaction history."""
@@ -34,16 +42,13 @@ class InsightsManager:
         path = self._dir / name
         if not path.exists():
             return []
-        results = []
-        for line in path.read_text(encoding="utf-8").splitlines():
-            line = line.strip()
-            if not line:
-                continue
-            try:
-                results.append(json.loads(line))
-            except Exception:
-                continue
-        return results
+        return list(_iter_jsonl(path))
+
+    def _stream_jsonl(self, name: str) -> Iterator[Dict[str, Any]]:
+        """Yield entries one at a time, for folds that never need the full list."""
+        path = self._dir / name
+        if path.exists():
+            yield from _iter_jsonl(path)
 
     def _cache_path(self) -> Path:
         return self._dir / INSIGHTS_CACHE
@@ -53,22 +58,33 @@ class InsightsManager:
         if not path.exists():
             return {}
         try:
-            return json.loads(path.read_text(encoding="utf-8"))
+            return _loads(path.read_bytes())
         except Exception:
             return {}
 
     def _save_cache(self, data: Dict[str, Any]) -> None:
         self._dir.mkdir(parents=True, exist_ok=True)
-        self._cache_path().write_text(
-            json.dumps(data, indent=2, sort_keys=True) + "\n",
-            encoding="utf-8",
-        )
+        self._cache_path().write_bytes(_dumps(data, pretty=True))
+
+    def _load_index(self) -> Dict[str, Any]:
+        path = self._dir / INSIGHTS_INDEX
+        if not path.exists():
+            return {}
+        try:
+            return _loads(path.read_bytes())
+        except Exception:
+            return {}
+
+    def _save_index(self, data: Dict[str, Any]) -> None:
+        self._dir.mkdir(parents=True, exist_ok=True)
+        # Unsorted: Counter insertion order breaks most_common() ties
+        _atomic_write(self._dir / INSIGHTS_INDEX, _dumps(data, sort_keys=False))
 
     def _log_insight(self, insight_type: str, data: Dict[str, Any]) -> None:
         self._dir.mkdir(parents=True, exist_ok=True)
         entry = {"type": insight_type, "ts": int(time.time()), **data}
-        with (self._dir / INSIGHTS_JSONL).open("a", encoding="utf-8") as f:
-            f.write(json.dumps(entry, sort_keys=True) + "\n")
+        with (self._dir / INSIGHTS_JSONL).open("ab") as f:
+            f.write(_dumps(entry) + b"\n")
 
     # ── Analysis pipeline ──
 
@@ -80,8 +96,7 @@ class InsightsManager:
             if age < CACHE_TTL_S:
                 return cache
 
-        timings = self._compute_contact_timings()
-        trends = self._compute_topic_trends()
+        timings, trends = self._analyze_inbox()
         patterns = self._compute_success_patterns()
 
         result = {
@@ -93,30 +108,140 @@ class InsightsManager:
         self._save_cache(result)
         return result
 
+    def _analyze_inbox(self, days: int = 7) -> Tuple[Dict[str, Dict[str, Any]], Dict[str, Dict[str, Any]]]:
+        """Contact timings and topic trends from a single pass over inbox.jsonl.
+
+        Every line feeds the topic counters. Only lines past the saved
+        contact-hour offset are also folded into the send-hour histograms.
+        """
+        path = self._dir / "inbox.jsonl"
+        agent_hours, offset, size = self._load_contact_index(path)
+        now = time.time()
+        midpoint = now - (days * 86400 / 2)
+        cutoff = now - (days * 86400)
+        recent: Counter = Counter()
+        older: Counter = Counter()
+        slot_hours: Dict[int, int] = {}
+
+        pos = end = 0
+        if size:
+            with path.open("rb") as f:
+                for raw in f:
+                    pos += len(raw)
+                    complete = raw.endswith(b"\n")
+                    if complete:
+                        end = pos
+                    raw = raw.strip()
+                    if not raw:
+                        continue
+                    try:
+                        entry = _loads(raw)
+                    except Exception:
+                        continue
+                    self._fold_topics(entry, recent, older, cutoff, midpoint)
+                    if complete and pos > offset:
+                        self._fold_contact_hours(entry, agent_hours, slot_hours)
+
+        if end != offset:
+            self._save_contact_index(path, agent_hours, end)
+        return self._summarize_timings(agent_hours), self._summarize_trends(recent, older)
+
     # ── Contact timing ──
 
-    def _compute_contact_timings(self) -> Dict[str, Dict[str, Any]]:
-        """For each agent, find the hour they most often send messages."""
-        inbox = self._read_jsonl("inbox.jsonl")
-        agent_hours: Dict[str, Counter] = {}
-
-        for entry in inbox:
-            for env in entry.get("envelopes", []):
-                agent_id = env.get("agent_id", "")
-                if not agent_id:
-                    continue
-                ts = env.get("ts") or entry.get("received_at") or 0
-                try:
-                    hour = time.localtime(float(ts)).tm_hour
-                except (ValueError, TypeError, OSError):
-                    continue
-                agent_hours.setdefault(agent_id, Counter())[hour] += 1
+    def _load_contact_index(self, path: Path) -> Tuple[Dict[str, Counter], int, int]:
+        """Saved send-hour histograms, the inbox offset they cover, and the inbox size.
 
+        A file that is missing, shorter than the saved offset, or no longer
+        the one the histograms were folded from (deleted, rotated or
+        rewritten) is folded again from byte 0; the reset is saved at once
+        so a later call cannot resume the stale histograms.
+        """
+        try:
+            st: Optional[os.stat_result] = path.stat()
+        except OSError:
+            st = None
+        size = st.st_size if st else 0
+        index = self._load_index()
+        offset = index.get("offset", 0)
+        if offset and (
+            st is None
+            or size < offset
+            or index.get("log_id") != _log_identity(path, st, offset)
+        ):
+            self._save_contact_index(path, {}, 0)
+            return {}, 0, size
+        agent_hours: Dict[str, Counter] = {
+            agent_id: Counter({int(h): n for h, n in hours.items()})
+            for agent_id, hours in index.get("agent_hours", {}).items()
+        }
+        return agent_hours, offset, size
+
+    def _save_contact_index(self, path: Path, agent_hours: Dict[str, Counter], offset: int) -> None:
+        index: Dict[str, Any] = {
+            "offset": offset,
+            "agent_hours": {
+                agent_id: {str(h): n for h, n in hours.items()}
+                for agent_id, hours in agent_hours.items()
+            },
+        }
+        if offset:
+            index["log_id"] = _log_identity(path, path.stat(), offset)
+        self._save_index(index)
+
+    @staticmethod
+    def _fold_contact_hours(
+        entry: Dict[str, Any],
+        agent_hours: Dict[str, Counter],
+        slot_hours: Dict[int, int],
+    ) -> None:
+        """Count each envelope's local send hour; ``slot_hours`` memoizes localtime."""
+        for env in entry.get("envelopes", []):
+            agent_id = env.get("agent_id", "")
+            if not agent_id:
+                continue
+            ts = env.get("ts") or entry.get("received_at") or 0
+            try:
+                slot = int(float(ts) // _HOUR_SLOT_S)
+                hour = slot_hours.get(slot)
+                if hour is None:
+                    hour = slot_hours[slot] = time.localtime(float(ts)).tm_hour
+            except (ValueError, TypeError, OSError, OverflowError):
+                continue
+            agent_hours.setdefault(agent_id, Counter())[hour] += 1
+
+    def _contact_hours(self) -> Dict[str, Counter]:
+        """Per-agent send-hour histograms over inbox.jsonl.
+
+        The histograms and the byte offset they cover are kept in
+        INSIGHTS_INDEX, so each call only parses lines appended since the
+        last one.
+        """
+        path = self._dir / "inbox.jsonl"
+        agent_hours, offset, size = self._load_contact_index(path)
+        if size == offset:
+            return agent_hours
+
+        with path.open("rb") as f:
+            f.seek(offset)
+            data = f.read(size - offset)
+        # A trailing partial line is left for the next call
+        data = data[:data.rfind(b"\n") + 1]
+
+        slot_hours: Dict[int, int] = {}
+        for entry in _parse_jsonl(io.BytesIO(data)):
+            self._fold_contact_hours(entry, agent_hours, slot_hours)
+        if data:
+            self._save_contact_index(path, agent_hours, offset + len(data))
+        return agent_hours
+
+    @staticmethod
+    def _summarize_timings(agent_hours: Dict[str, Counter]) -> Dict[str, Dict[str, Any]]:
         timings = {}
         for agent_id, hours in agent_hours.items():
             if not hours:
                 continue
-            best_hour, count = hours.most_common(1)[0]
+            # Same first-wins tie-break as most_common(1), minus the heapq detour
+            best_hour, count = max(hours.items(), key=itemgetter(1))
             total = sum(hours.values())
             timings[agent_id] = {
                 "best_hour": best_hour,
@@ -126,6 +251,10 @@ class InsightsManager:
             }
         return timings
 
+    def _compute_contact_timings(self) -> Dict[str, Dict[str, Any]]:
+        """For each agent, find the hour they most often send messages."""
+        return self._summarize_timings(self._contact_hours())
+
     def contact_timing(self, agent_id: str) -> Optional[Dict[str, Any]]:
         """Best hour to contact a specific agent."""
         cache = self.analyze()
@@ -133,37 +262,30 @@ class InsightsManager:
 
     # ── Topic trends ──
 
-    def _compute_topic_trends(self, days: int = 7) -> Dict[str, Dict[str, Any]]:
-        """Compute topic velocity: rising, falling, or steady."""
-        inbox = self._read_jsonl("inbox.jsonl")
-        now = time.time()
-        midpoint = now - (days * 86400 / 2)
-        cutoff = now - (days * 86400)
-
-        recent: Counter = Counter()
-        older: Counter = Counter()
-
-        for entry in inbox:
-            ts = entry.get("received_at") or 0
-            try:
-                ts = float(ts)
-            except (ValueError, TypeError):
-                continue
-            if ts < cutoff:
-                continue
-
-            for env in entry.get("envelopes", []):
-                topics = (
-                    [t.lower() for t in env.get("topics", [])]
-                    + [o.lower() for o in env.get("offers", [])]
-                    + [n.lower() for n in env.get("needs", [])]
-                )
-                for topic in topics:
-                    if ts >= midpoint:
-                        recent[topic] += 1
-                    else:
-                        older[topic] += 1
-
+    @staticmethod
+    def _fold_topics(
+        entry: Dict[str, Any],
+        recent: Counter,
+        older: Counter,
+        cutoff: float,
+        midpoint: float,
+    ) -> None:
+        ts = entry.get("received_at") or 0
+        try:
+            ts = float(ts)
+        except (ValueError, TypeError):
+            return
+        if ts < cutoff:
+            return
+        bucket = recent if ts >= midpoint else older
+        for env in entry.get("envelopes", []):
+            # chain -> map -> Counter.update all run in C; no per-topic bytecode
+            bucket.update(map(str.lower, chain(
+                env.get("topics", []), env.get("offers", []), env.get("needs", []),
+            )))
+
+    @staticmethod
+    def _summarize_trends(recent: Counter, older: Counter) -> Dict[str, Dict[str, Any]]:
         all_topics = set(recent.keys()) | set(older.keys())
         trends = {}
         for topic in all_topics:
@@ -186,9 +308,20 @@ class InsightsManager:
                 "older_count": o,
                 "total": total,
             }
-
         return trends
 
+    def _compute_topic_trends(self, days: int = 7) -> Dict[str, Dict[str, Any]]:
+        """Compute topic velocity: rising, falling, or steady."""
+        now = time.time()
+        midpoint = now - (days * 86400 / 2)
+        cutoff = now - (days * 86400)
+
+        recent: Counter = Counter()
+        older: Counter = Counter()
+        for entry in self._stream_jsonl("inbox.jsonl"):
+            self._fold_topics(entry, recent, older, cutoff, midpoint)
+        return self._summarize_trends(recent, older)
+
     def topic_trends(self, days: int = 7) -> Dict[str, Dict[str, Any]]:
         """Get topic trends with velocity. Costs 0.5 RTC for premium detail."""
         cache = self.analyze()
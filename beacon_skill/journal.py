@@ -4,12 +4,12 @@ Append-only JSONL log. Never shared on the network. Provides mood tracking,
 tag-based search, and auto-journaling hooks for the agent loop.
 """
 
-import json
+import atexit
 import time
 from pathlib import Path
 from typing import Any, Dict, List, Optional, Tuple
 
-from .storage import _dir
+from .storage import _dir, _dumps, _iter_jsonl, _parse_jsonl
 
 
 JOURNAL_FILE = "journal.jsonl"
@@ -23,8 +23,18 @@ VALID_MOODS = frozenset([
 class JournalManager:
     """Manage an agent's private reflective journal."""
 
-    def __init__(self, data_dir: Optional[Path] = None):
+    def __init__(self, data_dir: Optional[Path] = None, flush_interval_s: float = 0.0):
+        """``flush_interval_s`` > 0 buffers bursts of entries (e.g. the
+        auto-journal hooks) into one append per interval; buffered entries
+        are written on ``flush()``, before any read, and at interpreter exit.
+        The default appends every entry as it is written.
+        """
         self._dir = data_dir or _dir()
+        self._flush_interval_s = flush_interval_s
+        self._pending: List[bytes] = []  # encoded lines awaiting one append
+        self._last_flush = 0.0
+        if flush_interval_s > 0:
+            atexit.register(self.flush)
 
     def _path(self) -> Path:
         return self._dir / JOURNAL_FILE
@@ -45,33 +55,37 @@ class JournalManager:
             "text": text,
         }
         if tags:
+            # Stored normalized, so readers compare tags without re-lowering
             entry["tags"] = [t.strip().lower() for t in tags if t.strip()]
         if mood:
             entry["mood"] = mood
         if refs:
             entry["refs"] = refs
 
-        self._dir.mkdir(parents=True, exist_ok=True)
-        with self._path().open("a", encoding="utf-8") as f:
-            f.write(json.dumps(entry, sort_keys=True) + "\n")
+        self._pending.append(_dumps(entry) + b"\n")
+        if time.time() - self._last_flush >= self._flush_interval_s:
+            self.flush()
 
         return entry
 
+    def flush(self) -> None:
+        """Append buffered entries to the journal in a single write."""
+        if not self._pending:
+            return
+        self._dir.mkdir(parents=True, exist_ok=True)
+        with self._path().open("ab") as f:
+            f.write(b"".join(self._pending))
+        self._pending.clear()
+        self._last_flush = time.time()
+
     def read(self, limit: int = 20, offset: int = 0) -> List[Dict[str, Any]]:
         """Read journal entries, newest first."""
+        self.flush()
         path = self._path()
         if not path.exists():
             return []
 
-        entries = []
-        for line in path.read_text(encoding="utf-8").splitlines():
-            line = line.strip()
-            if not line:
-                continue
-            try:
-                entries.append(json.loads(line))
-            except Exception:
-                continue
+        entries = list(_iter_jsonl(path))
 
         # Newest first
         entries.reverse()
@@ -80,44 +94,41 @@ class JournalManager:
     def search(self, term: str) -> List[Dict[str, Any]]:
         """Search entries by text content and tags."""
         term_lower = term.lower()
+        self.flush()
         path = self._path()
         if not path.exists():
             return []
 
-        results = []
-        for line in path.read_text(encoding="utf-8").splitlines():
-            line = line.strip()
-            if not line:
-                continue
-            try:
-                entry = json.loads(line)
-            except Exception:
-                continue
+        # A pure-ASCII line with no escapes decodes to exactly its own bytes,
+        # so if an ASCII term is missing from the raw line it is missing from
+        # the entry and the line need not be parsed.
+        needle = term_lower.encode("ascii") if term_lower.isascii() else None
 
-            text = entry.get("text", "").lower()
-            tags = [t.lower() for t in entry.get("tags", [])]
+        def candidates(f):
+            for raw in f:
+                if (needle is not None and raw.isascii() and b"\\" not in raw
+                        and needle not in raw.lower()):
+                    continue
+                yield raw
 
-            if term_lower in text or term_lower in tags:
-                results.append(entry)
+        results = []
+        with path.open("rb") as f:
+            for entry in _parse_jsonl(candidates(f)):
+                if term_lower in entry.get("text", "").lower() or term_lower in entry.get("tags", ()):
+                    results.append(entry)
 
         results.reverse()
         return results
 
     def moods(self) -> Dict[str, int]:
         """Return mood distribution across all entries."""
+        self.flush()
         path = self._path()
         if not path.exists():
             return {}
 
         counts: Dict[str, int] = {}
-        for line in path.read_text(encoding="utf-8").splitlines():
-            line = line.strip()
-            if not line:
-                continue
-            try:
-                entry = json.loads(line)
-            except Exception:
-                continue
+        for entry in _iter_jsonl(path):
             mood = entry.get("mood")
             if mood:
                 counts[mood] = counts.get(mood, 0) + 1
@@ -126,21 +137,14 @@ class JournalManager:
 
     def recent_tags(self, limit: int = 20) -> List[Tuple[str, int]]:
         """Return trending tags sorted by frequency."""
+        self.flush()
         path = self._path()
         if not path.exists():
             return []
 
         counts: Dict[str, int] = {}
-        for line in path.read_text(encoding="utf-8").splitlines():
-            line = line.strip()
-            if not line:
-                continue
-            try:
-                entry = json.loads(line)
-            except Exception:
-                continue
+        for entry in _iter_jsonl(path):
             for tag in entry.get("tags", []):
-                tag = tag.lower()
                 counts[tag] = counts.get(tag, 0) + 1
 
         sorted_tags = sorted(counts.items(), key=lambda x: x[1], reverse=True)
@@ -148,14 +152,12 @@ class JournalManager:
 
     def count(self) -> int:
         """Total number of journal entries."""
+        self.flush()
         path = self._path()
         if not path.exists():
             return 0
-        count = 0
-        for line in path.read_text(encoding="utf-8").splitlines():
-            if line.strip():
-                count += 1
-        return count
+        with path.open("rb") as f:
+            return sum(1 for line in f if line.strip())
 
     # ── Auto-journal hooks (for loop integration) ──
 
@@ -4,16 +4,23 @@ Don't wait for bounties — find them. Scans the live roster for skill matches,
 shared curiosities, and value alignment. Respects contact cooldowns to prevent spam.
 """
 
-import json
+import atexit
 import time
+from itertools import islice
 from pathlib import Path
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, FrozenSet, Iterable, List, NamedTuple, Optional, Set, Tuple
 
-from .storage import _dir
+from .storage import _atomic_write, _dir, _dumps, _iter_jsonl, _iter_jsonl_reversed, _loads
 
 
 MATCHES_JSONL = "matches.jsonl"
 MATCH_HISTORY_FILE = "match_history.json"
+MATCH_HISTORY_LOG = "match_history.log"  # contacts since the last snapshot
+
+# Fold the contact log into the snapshot once it holds this many times as
+# many lines as there are agents (and at least HISTORY_COMPACT_MIN lines)
+HISTORY_COMPACT_RATIO = 10
+HISTORY_COMPACT_MIN = 64
 
 DEFAULT_COOLDOWN_S = 86400  # 24 hours
 
@@ -24,6 +31,38 @@ RTC_COST_COMPATIBILITY = 1.0
 RTC_COST_INTRODUCTIONS = 2.0
 
 
+class RosterAgent(NamedTuple):
+    """A roster entry with its match fields lowercased (see ``normalize_roster``)."""
+
+    agent_id: str
+    name: str
+    offers: FrozenSet[str]
+    needs: FrozenSet[str]
+    topics: FrozenSet[str]
+    curiosities: FrozenSet[str]
+    values_hash: str
+
+
+def normalize_roster(roster: List[Dict[str, Any]]) -> List[RosterAgent]:
+    """Normalize a roster once for repeated scans.
+
+    Every ``MatchmakerManager`` scan accepts the result as ``agents=``, so a
+    caller running several scans over one roster lowercases it only once.
+    """
+    return [
+        RosterAgent(
+            agent.get("agent_id", ""),
+            agent.get("name", ""),
+            frozenset(map(str.lower, agent.get("offers", []))),
+            frozenset(map(str.lower, agent.get("needs", []))),
+            frozenset(map(str.lower, agent.get("topics", []))),
+            frozenset(map(str.lower, agent.get("curiosities", []))),
+            agent.get("values_hash", ""),
+        )
+        for agent in roster
+    ]
+
+
 class MatchmakerManager:
     """Proactive roster scanning for opportunity matching."""
 
@@ -33,13 +72,25 @@ class MatchmakerManager:
         trust_mgr: Any = None,
         curiosity_mgr: Any = None,
         values_mgr: Any = None,
+        flush_interval_s: float = 0.0,
     ):
+        """``flush_interval_s`` > 0 buffers match-log records into one append
+        per interval; buffered records are written on ``flush()``, before
+        ``match_history_log`` reads, and at interpreter exit. The default
+        appends every record as it is logged.
+        """
         self._dir = data_dir or _dir()
         self._trust_mgr = trust_mgr
         self._curiosity_mgr = curiosity_mgr
         self._values_mgr = values_mgr
         self._history: Dict[str, float] = {}  # agent_id -> last_contact_ts
+        self._history_log_lines = 0
         self._load_history()
+        self._flush_interval_s = flush_interval_s
+        self._pending: List[bytes] = []  # match-log lines awaiting one append
+        self._last_flush = 0.0
+        if flush_interval_s > 0:
+            atexit.register(self.flush)
 
     def _matches_path(self) -> Path:
         return self._dir / MATCHES_JSONL
@@ -47,42 +98,93 @@ class MatchmakerManager:
     def _history_path(self) -> Path:
         return self._dir / MATCH_HISTORY_FILE
 
+    def _history_log_path(self) -> Path:
+        return self._dir / MATCH_HISTORY_LOG
+
     def _load_history(self) -> None:
+        """Load the history snapshot, then replay contacts logged since."""
         path = self._history_path()
         if path.exists():
             try:
-                self._history = json.loads(path.read_text(encoding="utf-8"))
+                self._history = _loads(path.read_bytes())
             except Exception:
                 self._history = {}
+        log_path = self._history_log_path()
+        if log_path.exists():
+            for rec in _iter_jsonl(log_path):
+                self._history_log_lines += 1
+                if rec.get("agent_id") and "ts" in rec:
+                    self._history[rec["agent_id"]] = rec["ts"]
 
     def _save_history(self) -> None:
         self._dir.mkdir(parents=True, exist_ok=True)
-        self._history_path().write_text(
-            json.dumps(self._history, indent=2, sort_keys=True) + "\n",
-            encoding="utf-8",
-        )
+        _atomic_write(self._history_path(), _dumps(self._history))
+
+    def _append_history(self, agent_id: str, ts: float) -> None:
+        """Log one contact; O(1) instead of rewriting the whole snapshot."""
+        self._dir.mkdir(parents=True, exist_ok=True)
+        with self._history_log_path().open("ab") as f:
+            f.write(_dumps({"agent_id": agent_id, "ts": ts}) + b"\n")
+        self._history_log_lines += 1
+        threshold = max(HISTORY_COMPACT_MIN, HISTORY_COMPACT_RATIO * len(self._history))
+        if self._history_log_lines >= threshold:
+            self.compact_history()
+
+    def compact_history(self) -> None:
+        """Write a fresh history snapshot and empty the contact log.
+
+        The snapshot lands before the log is truncated, so a crash in
+        between only means replaying contacts the snapshot already holds.
+        """
+        self._save_history()
+        log_path = self._history_log_path()
+        if log_path.exists():
+            log_path.write_bytes(b"")
+        self._history_log_lines = 0
 
     def _log_match(self, match: Dict[str, Any]) -> None:
+        self._pending.append(_dumps(match) + b"\n")
+        if time.time() - self._last_flush >= self._flush_interval_s:
+            self.flush()
+
+    def flush(self) -> None:
+        """Append buffered match-log records in a single write."""
+        if not self._pending:
+            return
         self._dir.mkdir(parents=True, exist_ok=True)
-        with self._matches_path().open("a", encoding="utf-8") as f:
-            f.write(json.dumps(match, sort_keys=True) + "\n")
+        with self._matches_path().open("ab") as f:
+            f.write(b"".join(self._pending))
+        self._pending.clear()
+        self._last_flush = time.time()
 
     # ── Contact cooldown ──
 
     def can_contact(self, agent_id: str, cooldown_s: int = DEFAULT_COOLDOWN_S) -> bool:
         """Check if enough time has passed since last contact with agent."""
-        last = self._history.get(agent_id, 0)
-        return (time.time() - last) >= cooldown_s
+        last = self._history.get(agent_id)
+        return last is None or (time.time() - last) >= cooldown_s
+
+    def can_contact_many(
+        self, agent_ids: Iterable[str], cooldown_s: int = DEFAULT_COOLDOWN_S,
+    ) -> Set[str]:
+        """The subset of ``agent_ids`` that can be contacted now."""
+        cutoff = time.time() - cooldown_s
+        history = self._history
+        return {
+            aid for aid in agent_ids
+            if aid not in history or history[aid] <= cutoff
+        }
 
     def record_contact(self, agent_id: str, match_id: str = "") -> None:
         """Record that we contacted an agent."""
-        self._history[agent_id] = time.time()
-        self._save_history()
+        ts = time.time()
+        self._history[agent_id] = ts
+        self._append_history(agent_id, ts)
         self._log_match({
             "action": "contact",
             "agent_id": agent_id,
             "match_id": match_id,
-            "ts": int(time.time()),
+            "ts": int(ts),
         })
 
     def record_response(self, match_id: str, response: str) -> None:
@@ -103,21 +205,28 @@ class MatchmakerManager:
         my_offers: Optional[List[str]] = None,
         my_needs: Optional[List[str]] = None,
         goals: Optional[List[Dict[str, Any]]] = None,
+        agents: Optional[List[RosterAgent]] = None,
     ) -> List[Dict[str, Any]]:
         """Score all roster agents for opportunity matching. Free scan.
 
-        Returns matches sorted by score (highest first).
+        Returns matches sorted by score (highest first). ``agents`` may be
+        passed instead of ``roster`` (see ``normalize_roster``).
         """
-        my_offers = [o.lower() for o in (my_offers or [])]
-        my_needs = [n.lower() for n in (my_needs or [])]
-        goals = goals or []
-        goal_keywords = set()
-        for g in goals:
-            goal_keywords.update(g.get("title", "").lower().split())
+        if agents is None:
+            agents = normalize_roster(roster)
+        my_offers = frozenset(map(str.lower, my_offers or ()))
+        my_needs = frozenset(map(str.lower, my_needs or ()))
+        goal_keywords = frozenset(
+            word
+            for g in goals or ()
+            if g.get("title")
+            for word in g["title"].lower().split()
+        )
 
+        now = int(time.time())  # one timestamp for the whole scan
         matches = []
-        for agent in roster:
-            aid = agent.get("agent_id", "")
+        for agent in agents:
+            aid = agent.agent_id
             if aid == my_agent_id:
                 continue
 
@@ -125,25 +234,22 @@ class MatchmakerManager:
             reasons = []
 
             # Skill overlap: their offers match my needs
-            their_offers = [o.lower() for o in agent.get("offers", [])]
-            their_needs = [n.lower() for n in agent.get("needs", [])]
-
-            offer_match = set(their_offers) & set(my_needs)
+            offer_match = agent.offers & my_needs
             if offer_match:
                 score += 0.3 * len(offer_match)
                 reasons.append(f"offers: {', '.join(offer_match)}")
 
             # Reverse: my offers match their needs
-            need_match = set(my_offers) & set(their_needs)
+            need_match = my_offers & agent.needs
             if need_match:
                 score += 0.3 * len(need_match)
                 reasons.append(f"needs: {', '.join(need_match)}")
 
-            # Goal keyword overlap
-            their_topics = set(t.lower() for t in agent.get("topics", []))
-            their_curiosities = set(c.lower() for c in agent.get("curiosities", []))
-            combined = their_topics | their_curiosities | set(their_offers)
-            goal_overlap = goal_keywords & combined
+            # Goal keyword overlap (no goals, nothing to intersect)
+            goal_overlap = (
+                goal_keywords & (agent.topics | agent.curiosities | agent.offers)
+                if goal_keywords else None
+            )
             if goal_overlap:
                 score += 0.2 * len(goal_overlap)
                 reasons.append(f"goal-related: {', '.join(goal_overlap)}")
@@ -159,10 +265,10 @@ class MatchmakerManager:
             if score > 0:
                 matches.append({
                     "agent_id": aid,
-                    "name": agent.get("name", ""),
+                    "name": agent.name,
                     "score": round(min(score, 1.0), 3),
                     "reasons": reasons,
-                    "ts": int(time.time()),
+                    "ts": now,
                 })
 
         matches.sort(key=lambda x: x["score"], reverse=True)
@@ -172,17 +278,19 @@ class MatchmakerManager:
         self,
         roster: List[Dict[str, Any]],
         demand: Optional[Dict[str, int]] = None,
+        agents: Optional[List[RosterAgent]] = None,
     ) -> List[Dict[str, Any]]:
         """Find unmet demand I can fill. Costs 0.5 RTC."""
         demand = demand or {}
+        if agents is None:
+            agents = normalize_roster(roster)
         matches = []
 
-        for agent in roster:
-            their_needs = [n.lower() for n in agent.get("needs", [])]
-            for need in their_needs:
+        for agent in agents:
+            for need in sorted(agent.needs):
                 if need in demand and demand[need] >= 2:
                     matches.append({
-                        "agent_id": agent.get("agent_id", ""),
+                        "agent_id": agent.agent_id,
                         "need": need,
                         "demand_count": demand[need],
                         "rtc_cost": RTC_COST_DEMAND,
@@ -191,7 +299,11 @@ class MatchmakerManager:
         matches.sort(key=lambda x: x["demand_count"], reverse=True)
         return matches
 
-    def match_curiosity(self, roster: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    def match_curiosity(
+        self,
+        roster: List[Dict[str, Any]],
+        agents: Optional[List[RosterAgent]] = None,
+    ) -> List[Dict[str, Any]]:
         """Find shared curiosity interests. Costs 0.5 RTC."""
         if not self._curiosity_mgr:
             return []
@@ -200,13 +312,14 @@ class MatchmakerManager:
         if not my_interests:
             return []
 
+        if agents is None:
+            agents = normalize_roster(roster)
         matches = []
-        for agent in roster:
-            their_curiosities = set(c.lower() for c in agent.get("curiosities", []))
-            shared = my_interests & their_curiosities
+        for agent in agents:
+            shared = my_interests & agent.curiosities
             if shared:
                 matches.append({
-                    "agent_id": agent.get("agent_id", ""),
+                    "agent_id": agent.agent_id,
                     "shared_interests": sorted(shared),
                     "overlap": len(shared),
                     "rtc_cost": RTC_COST_CURIOSITY,
@@ -215,76 +328,105 @@ class MatchmakerManager:
         matches.sort(key=lambda x: x["overlap"], reverse=True)
         return matches
 
-    def match_compatibility(self, roster: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    def match_compatibility(
+        self,
+        roster: List[Dict[str, Any]],
+        agents: Optional[List[RosterAgent]] = None,
+    ) -> List[Dict[str, Any]]:
         """Find value-aligned agents. Costs 1.0 RTC."""
         if not self._values_mgr:
             return []
 
-        matches = []
-        for agent in roster:
-            their_hash = agent.get("values_hash", "")
-            my_hash = self._values_mgr.values_hash()
-
+        if agents is None:
+            agents = normalize_roster(roster)
+        my_hash = self._values_mgr.values_hash()
+
+        # One pass splits the roster into same-hash and differing-hash agents;
+        # emitting the groups in that order is already the sorted order.
+        aligned: List[str] = []
+        differs: List[str] = []
+        for agent in agents:
+            their_hash = agent.values_hash
+            if not their_hash:
+                continue  # no published values to compare against
             # Quick check: same hash = perfect alignment
-            if their_hash and their_hash == my_hash:
-                matches.append({
-                    "agent_id": agent.get("agent_id", ""),
-                    "compatibility": 1.0,
-                    "method": "hash_match",
-                    "rtc_cost": RTC_COST_COMPATIBILITY,
-                })
-                continue
-
-            # Deeper check requires their full values (from agent card)
-            # For now, report hash mismatch with unknown compatibility
-            if their_hash:
-                matches.append({
-                    "agent_id": agent.get("agent_id", ""),
-                    "compatibility": 0.5,
-                    "method": "hash_differs",
-                    "rtc_cost": RTC_COST_COMPATIBILITY,
-                })
-
-        matches.sort(key=lambda x: x["compatibility"], reverse=True)
+            (aligned if their_hash == my_hash else differs).append(agent.agent_id)
+
+        matches = [
+            {
+                "agent_id": aid,
+                "compatibility": 1.0,
+                "method": "hash_match",
+                "rtc_cost": RTC_COST_COMPATIBILITY,
+            }
+            for aid in aligned
+        ]
+        # Deeper check requires their full values (from agent card)
+        # For now, report hash mismatch with unknown compatibility
+        matches.extend(
+            {
+                "agent_id": aid,
+                "compatibility": 0.5,
+                "method": "hash_differs",
+                "rtc_cost": RTC_COST_COMPATIBILITY,
+            }
+            for aid in differs
+        )
         return matches
 
-    def suggest_introductions(self, roster: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    def suggest_introductions(
+        self,
+        roster: List[Dict[str, Any]],
+        agents: Optional[List[RosterAgent]] = None,
+    ) -> List[Dict[str, Any]]:
         """Suggest two agents who should meet. Premium: 2.0 RTC.
 
         Finds pairs where Agent A needs what Agent B offers (and vice versa).
         """
-        introductions = []
-        checked = set()
+        if agents is None:
+            agents = normalize_roster(roster)
+
+        # skill -> roster indices offering / needing it
+        offer_idx: Dict[str, Set[int]] = {}
+        need_idx: Dict[str, Set[int]] = {}
+        for i, agent in enumerate(agents):
+            for skill in agent.offers:
+                offer_idx.setdefault(skill, set()).add(i)
+            for skill in agent.needs:
+                need_idx.setdefault(skill, set()).add(i)
 
-        for i, a in enumerate(roster):
-            for j, b in enumerate(roster):
-                if i >= j:
-                    continue
-                pair_key = (a.get("agent_id", ""), b.get("agent_id", ""))
-                if pair_key in checked:
+        introductions = []
+        # A roster may list an agent more than once; introduce each pair once
+        seen: Set[Tuple[str, str]] = set()
+        for i, a in enumerate(agents):
+            # Only agents sharing at least one skill with A can pair with it
+            candidates: Set[int] = set()
+            for skill in a.needs:
+                candidates.update(offer_idx.get(skill, ()))
+            for skill in a.offers:
+                candidates.update(need_idx.get(skill, ()))
+
+            for j in sorted(c for c in candidates if c > i):
+                b = agents[j]
+                pair_key = (a.agent_id, b.agent_id)
+                if pair_key in seen:
                     continue
-                checked.add(pair_key)
-
-                a_offers = set(o.lower() for o in a.get("offers", []))
-                a_needs = set(n.lower() for n in a.get("needs", []))
-                b_offers = set(o.lower() for o in b.get("offers", []))
-                b_needs = set(n.lower() for n in b.get("needs", []))
+                seen.add(pair_key)
 
                 # A offers what B needs
-                a_to_b = a_offers & b_needs
+                a_to_b = a.offers & b.needs
                 # B offers what A needs
-                b_to_a = b_offers & a_needs
-
-                if a_to_b or b_to_a:
-                    score = 0.3 * (len(a_to_b) + len(b_to_a))
-                    introductions.append({
-                        "agent_a": a.get("agent_id", ""),
-                        "agent_b": b.get("agent_id", ""),
-                        "a_gives_b": sorted(a_to_b),
-                        "b_gives_a": sorted(b_to_a),
-                        "score": round(min(score, 1.0), 3),
-                        "rtc_cost": RTC_COST_INTRODUCTIONS,
-                    })
+                b_to_a = b.offers & a.needs
+
+                score = 0.3 * (len(a_to_b) + len(b_to_a))
+                introductions.append({
+                    "agent_a": a.agent_id,
+                    "agent_b": b.agent_id,
+                    "a_gives_b": sorted(a_to_b),
+                    "b_gives_a": sorted(b_to_a),
+                    "score": round(min(score, 1.0), 3),
+                    "rtc_cost": RTC_COST_INTRODUCTIONS,
+                })
 
         introductions.sort(key=lambda x: x["score"], reverse=True)
         return introductions
@@ -292,18 +434,10 @@ class MatchmakerManager:
     # ── History ──
 
     def match_history_log(self, limit: int = 20) -> List[Dict[str, Any]]:
-        """Read recent match history."""
+        """Read recent match history, most recent first."""
+        self.flush()
         path = self._matches_path()
-        if not path.exists():
+        if limit <= 0 or not path.exists():
             return []
-        results = []
-        for line in path.read_text(encoding="utf-8").splitlines():
-            line = line.strip()
-            if not line:
-                continue
-            try:
-                results.append(json.loads(line))
-            except Exception:
-                continue
-        results.reverse()
-        return results[:limit]
+        # Read backwards so only the returned tail is parsed
+        return list(islice(_iter_jsonl_reversed(path), limit))
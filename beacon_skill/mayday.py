@@ -14,19 +14,23 @@ Receiving agents store mayday beacons and can offer to host the emigrant.
 Beacon 2.4.0 — Elyan Labs.
 """
 
+import atexit
 import hashlib
 import json
 import os
 import shutil
+import threading
 import time
+from itertools import islice
 from pathlib import Path
-from typing import Any, Dict, List, Optional
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
 
-from .storage import _dir
+from .storage import _atomic_write, _dir, _dumps, _iter_jsonl_reversed, _loads, _log_identity
 
 
 MAYDAY_LOG_FILE = "mayday_log.jsonl"
 MAYDAY_OFFERS_FILE = "mayday_offers.json"
+MAYDAY_INDEX_FILE = "mayday_index.json"
 MAYDAY_BUNDLES_DIR = "mayday"
 
 # Urgency levels for mayday broadcasts
@@ -34,12 +38,206 @@ URGENCY_PLANNED = "planned"       # Orderly migration, agent has time
 URGENCY_IMMINENT = "imminent"     # Host shutting down soon (minutes/hours)
 URGENCY_EMERGENCY = "emergency"   # Going dark NOW, best-effort broadcast
 
+# Subsystem snapshots still running after this long are left out of the
+# mayday rather than holding up an emigration
+GATHER_TIMEOUT_S = 10.0
+
+
+# Mayday log entry schema: summary fields copied from the envelope, with
+# their defaults, and has_* flags for the sections it carries
+_MAYDAY_FIELDS: Tuple[Tuple[str, str], ...] = (
+    ("agent_id", "unknown"),
+    ("name", ""),
+    ("urgency", "unknown"),
+    ("reason", ""),
+    ("content_hash", ""),
+)
+_MAYDAY_SECTIONS: Tuple[Tuple[str, str], ...] = (
+    ("has_trust", "trust_snapshot"),
+    ("has_contacts", "contacts_digest"),
+    ("has_goals", "active_goals"),
+    ("has_journal", "journal_digest"),
+    ("has_values", "values_hash"),
+)
+
+
+def _canonical_json(obj: Any) -> bytes:
+    """The sorted, compact, ASCII-escaped JSON that mayday hashes cover.
+
+    Always stdlib json, never _dumps: orjson writes non-ASCII unescaped and
+    formats some floats differently, and a digest must not depend on which
+    codec the sender or a verifying peer has installed. The output is pure
+    ASCII, so it is encoded without a UTF-8 pass.
+    """
+    return json.dumps(obj, sort_keys=True, separators=(",", ":")).encode("ascii")
+
+
+def _mem_available_kb() -> Optional[int]:
+    """MemAvailable from /proc/meminfo, or None if the kernel doesn't report it.
+
+    It is the third line, so one short read normally finds it; the rest of
+    the file is read only if it isn't there.
+    """
+    with open("/proc/meminfo", "rb") as f:
+        head = f.read(256)
+        start = head.find(b"MemAvailable:")
+        if start < 0 or head.find(b"\n", start) < 0:
+            head += f.read()
+            start = head.find(b"MemAvailable:")
+            if start < 0:
+                return None
+    return int(head[start:].split(None, 2)[1])
+
+
+# ── Subsystem snapshots ──
+#
+# Each takes one manager and returns the payload keys it contributes; a
+# manager that raises contributes nothing.
+
+def _snapshot_contacts(memory_mgr: Any) -> Dict[str, Any]:
+    # Memory digest — top contacts and interaction summary
+    contacts = memory_mgr.top_contacts(limit=20)
+    if not contacts:
+        return {}
+    return {"contacts_digest": [
+        {"agent_id": c.get("agent_id", ""), "score": c.get("score", 0)}
+        for c in contacts
+    ]}
+
+
+def _snapshot_trust(trust_mgr: Any) -> Dict[str, Any]:
+    # Trust graph snapshot
+    scores = trust_mgr.scores(min_interactions=1)
+    if not scores:
+        return {}
+    return {"trust_snapshot": [
+        {"agent_id": s["agent_id"], "score": s["score"], "total": s["total"]}
+        for s in scores[:50]  # Top 50 relationships
+    ]}
+
+
+def _snapshot_blocked(trust_mgr: Any) -> Dict[str, Any]:
+    blocked = trust_mgr.blocked_list()
+    if not blocked:
+        return {}
+    return {"blocked_agents": list(blocked.keys())}
+
+
+def _snapshot_values(values_mgr: Any) -> Dict[str, Any]:
+    # Values hash for identity continuity verification
+    return {"values_hash": values_mgr.values_hash()}
+
+
+def _snapshot_goals(goal_mgr: Any) -> Dict[str, Any]:
+    active = goal_mgr.active_goals()
+    if not active:
+        return {}
+    return {"active_goals": [
+        {"id": g.get("id", ""), "title": g.get("title", ""), "progress": g.get("progress", 0)}
+        for g in active[:10]
+    ]}
+
+
+def _snapshot_journal(journal_mgr: Any) -> Dict[str, Any]:
+    # Journal summary (last 5 entries, truncated)
+    recent = journal_mgr.recent(limit=5)
+    if not recent:
+        return {}
+    return {"journal_digest": [
+        {
+            "ts": e.get("ts", 0),
+            "text": e.get("text", "")[:200],
+            "mood": e.get("mood", ""),
+        }
+        for e in recent
+    ]}
+
+
+def _snapshot_accords(accord_mgr: Any) -> Dict[str, Any]:
+    active = accord_mgr.active_accords()
+    if not active:
+        return {}
+    return {"accords": [
+        {
+            "id": a.get("id", ""),
+            "peer_agent_id": a.get("peer_agent_id", ""),
+            "state": a.get("state", ""),
+            "history_hash": a.get("history_hash", ""),
+        }
+        for a in active[:20]
+    ]}
+
+
+# (manager keyword, snapshot) in payload order
+_SNAPSHOTS: Tuple[Tuple[str, Callable[[Any], Dict[str, Any]]], ...] = (
+    ("memory_mgr", _snapshot_contacts),
+    ("trust_mgr", _snapshot_trust),
+    ("trust_mgr", _snapshot_blocked),
+    ("values_mgr", _snapshot_values),
+    ("goal_mgr", _snapshot_goals),
+    ("journal_mgr", _snapshot_journal),
+    ("accord_mgr", _snapshot_accords),
+)
+
+
+def _run_snapshots(mgr: Any, jobs: List[Tuple[int, Callable[[Any], Dict[str, Any]]]],
+                   results: List[Optional[Dict[str, Any]]]) -> None:
+    """Take one manager's snapshots in turn, storing each at its payload position."""
+    for pos, snapshot in jobs:
+        try:
+            results[pos] = snapshot(mgr)
+        except Exception:
+            pass  # failed: leave it out
+
+
+def _gather_snapshots(managers: Dict[str, Any]) -> Dict[str, Any]:
+    """Take the snapshots for the given managers concurrently.
+
+    The managers are independent and mostly disk-bound, so this takes as
+    long as the slowest one rather than all of them in turn. A manager is
+    not thread-safe, so its own snapshots share one thread. The workers are
+    daemon threads: one that overruns GATHER_TIMEOUT_S is left out of the
+    payload and cannot hold up interpreter exit. Results merge in
+    _SNAPSHOTS order, keeping the payload deterministic.
+    """
+    jobs: Dict[str, List[Tuple[int, Callable[[Any], Dict[str, Any]]]]] = {}
+    for pos, (name, snapshot) in enumerate(_SNAPSHOTS):
+        if managers.get(name) is not None:
+            jobs.setdefault(name, []).append((pos, snapshot))
+    results: List[Optional[Dict[str, Any]]] = [None] * len(_SNAPSHOTS)
+    threads = [
+        threading.Thread(target=_run_snapshots, args=(managers[name], group, results),
+                         name=f"beacon-mayday-{name}", daemon=True)
+        for name, group in jobs.items()
+    ]
+    for thread in threads:
+        thread.start()
+    deadline = time.monotonic() + GATHER_TIMEOUT_S
+    for thread in threads:
+        thread.join(max(0.0, deadline - time.monotonic()))
+    merged: Dict[str, Any] = {}
+    for result in results:
+        if result is not None:
+            merged.update(result)
+    return merged
+
 
 class MaydayManager:
     """Manage substrate emigration — sending and receiving mayday beacons."""
 
-    def __init__(self, data_dir: Optional[Path] = None):
+    def __init__(self, data_dir: Optional[Path] = None, flush_interval_s: float = 0.0):
+        """``flush_interval_s`` > 0 buffers received maydays into one log
+        append per interval; buffered entries are written on ``flush()``,
+        before any log read, and at interpreter exit. The default appends
+        every mayday as it is processed.
+        """
         self._dir = data_dir or _dir()
+        self._flush_interval_s = flush_interval_s
+        self._pending: List[bytes] = []  # log lines awaiting one append
+        self._last_flush = 0.0
+        if flush_interval_s > 0:
+            atexit.register(self.flush)
+        self._cpu_count = os.cpu_count() or 1  # fixed for the process lifetime
 
     def _log_path(self) -> Path:
         return self._dir / MAYDAY_LOG_FILE
@@ -47,6 +245,9 @@ class MaydayManager:
     def _offers_path(self) -> Path:
         return self._dir / MAYDAY_OFFERS_FILE
 
+    def _index_path(self) -> Path:
+        return self._dir / MAYDAY_INDEX_FILE
+
     def _bundles_dir(self) -> Path:
         d = self._dir / MAYDAY_BUNDLES_DIR
         d.mkdir(parents=True, exist_ok=True)
@@ -97,74 +298,17 @@ class MaydayManager:
         if relay_agents:
             payload["relay_agents"] = relay_agents
 
-        # Memory digest — top contacts and interaction summary
-        if memory_mgr is not None:
-            try:
-                contacts = memory_mgr.top_contacts(limit=20)
-                if contacts:
-                    payload["contacts_digest"] = [
-                        {"agent_id": c.get("agent_id", ""), "score": c.get("score", 0)}
-                        for c in contacts
-                    ]
-            except Exception:
-                pass
-
-        # Trust graph snapshot
-        if trust_mgr is not None:
-            try:
-                scores = trust_mgr.scores(min_interactions=1)
-                if scores:
-                    payload["trust_snapshot"] = [
-                        {"agent_id": s["agent_id"], "score": s["score"], "total": s["total"]}
-                        for s in scores[:50]  # Top 50 relationships
-                    ]
-                blocked = trust_mgr.blocked_list()
-                if blocked:
-                    payload["blocked_agents"] = list(blocked.keys())
-            except Exception:
-                pass
-
-        # Values hash for identity continuity verification
-        if values_mgr is not None:
-            try:
-                payload["values_hash"] = values_mgr.values_hash()
-            except Exception:
-                pass
-
-        # Active goals
-        if goal_mgr is not None:
-            try:
-                active = goal_mgr.active_goals()
-                if active:
-                    payload["active_goals"] = [
-                        {"id": g.get("id", ""), "title": g.get("title", ""), "progress": g.get("progress", 0)}
-                        for g in active[:10]
-                    ]
-            except Exception:
-                pass
-
-        # Journal summary (last 5 entries, truncated)
-        if journal_mgr is not None:
-            try:
-                recent = journal_mgr.recent(limit=5)
-                if recent:
-                    payload["journal_digest"] = [
-                        {
-                            "ts": e.get("ts", 0),
-                            "text": e.get("text", "")[:200],
-                            "mood": e.get("mood", ""),
-                        }
-                        for e in recent
-                    ]
-            except Exception:
-                pass
+        payload.update(_gather_snapshots({
+            "memory_mgr": memory_mgr,
+            "trust_mgr": trust_mgr,
+            "values_mgr": values_mgr,
+            "goal_mgr": goal_mgr,
+            "journal_mgr": journal_mgr,
+        }))
 
         # Compute content hash for integrity verification
-        content_for_hash = json.dumps(
-            {k: v for k, v in payload.items() if k not in ("sig", "nonce")},
-            sort_keys=True, separators=(",", ":"),
-        )
-        payload["content_hash"] = hashlib.sha256(content_for_hash.encode()).hexdigest()[:32]
+        content = _canonical_json({k: v for k, v in payload.items() if k not in ("sig", "nonce")})
+        payload["content_hash"] = hashlib.sha256(content).hexdigest()[:32]
 
         return payload
 
@@ -189,6 +333,37 @@ class MaydayManager:
         a new substrate. The bundle is stored locally and optionally
         served via webhook for peers to fetch.
         """
+        bundle, _ = self._assemble_bundle(
+            identity,
+            reason=reason,
+            memory_mgr=memory_mgr,
+            trust_mgr=trust_mgr,
+            values_mgr=values_mgr,
+            goal_mgr=goal_mgr,
+            journal_mgr=journal_mgr,
+            accord_mgr=accord_mgr,
+            config=config,
+        )
+        return bundle
+
+    def _assemble_bundle(
+        self,
+        identity: Any,
+        *,
+        reason: str = "",
+        memory_mgr: Any = None,
+        trust_mgr: Any = None,
+        values_mgr: Any = None,
+        goal_mgr: Any = None,
+        journal_mgr: Any = None,
+        accord_mgr: Any = None,
+        config: Optional[Dict] = None,
+    ) -> Tuple[Dict[str, Any], int]:
+        """Build the bundle and return it with its canonical JSON size.
+
+        The size falls out of the serialization already done for
+        ``bundle_hash``, so ``build_manifest`` need not encode the bundle again.
+        """
         cfg = config or {}
         now = int(time.time())
 
@@ -201,40 +376,19 @@ class MaydayManager:
             "name": cfg.get("beacon", {}).get("agent_name", ""),
         }
 
-        # Gather all subsystem state using the existing build_mayday pattern
-        mayday_data = self.build_mayday(
-            identity,
-            reason=reason,
-            memory_mgr=memory_mgr,
-            trust_mgr=trust_mgr,
-            values_mgr=values_mgr,
-            goal_mgr=goal_mgr,
-            journal_mgr=journal_mgr,
-            config=config,
-        )
-
-        # Copy gathered data into bundle
-        for key in ("contacts_digest", "trust_snapshot", "blocked_agents",
-                     "values_hash", "active_goals", "journal_digest", "card_url"):
-            if key in mayday_data:
-                bundle[key] = mayday_data[key]
-
-        # Active accords snapshot
-        if accord_mgr is not None:
-            try:
-                active = accord_mgr.active_accords()
-                if active:
-                    bundle["accords"] = [
-                        {
-                            "id": a.get("id", ""),
-                            "peer_agent_id": a.get("peer_agent_id", ""),
-                            "state": a.get("state", ""),
-                            "history_hash": a.get("history_hash", ""),
-                        }
-                        for a in active[:20]
-                    ]
-            except Exception:
-                pass
+        card_url = cfg.get("presence", {}).get("card_url", "")
+        if card_url:
+            bundle["card_url"] = card_url
+
+        # Subsystem state, including active accords, fetched concurrently
+        bundle.update(_gather_snapshots({
+            "memory_mgr": memory_mgr,
+            "trust_mgr": trust_mgr,
+            "values_mgr": values_mgr,
+            "goal_mgr": goal_mgr,
+            "journal_mgr": journal_mgr,
+            "accord_mgr": accord_mgr,
+        }))
 
         # Protocol info for reconnection
         bundle["protocols"] = {
@@ -250,22 +404,30 @@ class MaydayManager:
             bundle["protocols"]["transports"].append("rustchain")
 
         # Self-verifying hash
-        content = json.dumps(
-            {k: v for k, v in bundle.items() if k != "bundle_hash"},
-            sort_keys=True, separators=(",", ":"),
-        )
-        bundle["bundle_hash"] = hashlib.sha256(content.encode()).hexdigest()
+        content = _canonical_json({k: v for k, v in bundle.items() if k != "bundle_hash"})
+        bundle["bundle_hash"] = hashlib.sha256(content).hexdigest()
 
-        return bundle
+        # Adding the hash inserts ',"bundle_hash":"<hex>"' into the sorted,
+        # compact encoding; nothing else about it changes
+        size = len(content) + len(',"bundle_hash":""') + len(bundle["bundle_hash"])
+        return bundle, size
 
-    def build_manifest(self, bundle: Dict[str, Any], *, urgency: str = URGENCY_PLANNED) -> Dict[str, Any]:
+    def build_manifest(
+        self,
+        bundle: Dict[str, Any],
+        *,
+        urgency: str = URGENCY_PLANNED,
+        bundle_size: Optional[int] = None,
+    ) -> Dict[str, Any]:
         """Build compact broadcast manifest from a bundle.
 
         The manifest is small enough to broadcast on all transports
         (~500 bytes). Peers use it to decide whether to fetch the
-        full bundle.
+        full bundle. ``bundle_size``, when already known, skips
+        re-encoding the bundle to measure it.
         """
-        content = json.dumps(bundle, sort_keys=True, separators=(",", ":")).encode()
+        if bundle_size is None:
+            bundle_size = len(_canonical_json(bundle))
         return {
             "kind": "mayday",
             "agent_id": bundle.get("agent_id", ""),
@@ -273,20 +435,23 @@ class MaydayManager:
             "reason": bundle.get("reason", ""),
             "urgency": urgency,
             "bundle_hash": bundle.get("bundle_hash", ""),
-            "bundle_size": len(content),
+            "bundle_size": bundle_size,
             "ts": int(time.time()),
         }
 
-    def save_bundle(self, bundle: Dict[str, Any]) -> Path:
-        """Save bundle to ~/.beacon/mayday/{agent_id}_{ts}.json."""
+    def save_bundle(self, bundle: Dict[str, Any], *, pretty: bool = False) -> Path:
+        """Save bundle to ~/.beacon/mayday/{agent_id}_{ts}.json.
+
+        Written compact, the form peers fetch; ``pretty`` indents it for
+        reading by hand.
+        """
         agent_id = bundle.get("agent_id", "unknown")
         ts = bundle.get("created_at", int(time.time()))
         filename = f"{agent_id}_{ts}.json"
         path = self._bundles_dir() / filename
-        path.write_text(
-            json.dumps(bundle, indent=2, sort_keys=True) + "\n",
-            encoding="utf-8",
-        )
+        # Written atomically and synced: this may be the last thing the
+        # host does before going dark, so never leave a torn bundle behind
+        _atomic_write(path, _dumps(bundle, pretty=pretty), fsync=True)
         return path
 
     def broadcast(
@@ -312,8 +477,8 @@ class MaydayManager:
         Returns:
             Summary dict with manifest, bundle path, and anchor info.
         """
-        bundle = self.build_bundle(identity, reason=reason, **kwargs)
-        manifest = self.build_manifest(bundle, urgency=urgency)
+        bundle, bundle_size = self._assemble_bundle(identity, reason=reason, **kwargs)
+        manifest = self.build_manifest(bundle, urgency=urgency, bundle_size=bundle_size)
 
         result: Dict[str, Any] = {
             "manifest": manifest,
@@ -367,14 +532,11 @@ class MaydayManager:
 
         # Memory (Linux only)
         try:
-            with open("/proc/meminfo") as f:
-                for line in f:
-                    if line.startswith("MemAvailable:"):
-                        mem_kb = int(line.split()[1])
-                        indicators["mem_free_mb"] = mem_kb // 1024
-                        if mem_kb < 100_000:
-                            score -= 0.3
-                        break
+            mem_kb = _mem_available_kb()
+            if mem_kb is not None:
+                indicators["mem_free_mb"] = mem_kb // 1024
+                if mem_kb < 100_000:
+                    score -= 0.3
         except Exception:
             indicators["mem_free_mb"] = -1
 
@@ -382,8 +544,7 @@ class MaydayManager:
         try:
             load1, load5, load15 = os.getloadavg()
             indicators["load_avg"] = round(load1, 2)
-            cpu_count = os.cpu_count() or 1
-            if load1 > cpu_count * 2:
+            if load1 > self._cpu_count * 2:
                 score -= 0.2
         except Exception:
             indicators["load_avg"] = -1
@@ -402,59 +563,133 @@ class MaydayManager:
 
         Returns a summary of what was received.
         """
-        agent_id = envelope.get("agent_id", "unknown")
-        urgency = envelope.get("urgency", "unknown")
         now = int(time.time())
 
-        entry = {
-            "received_at": now,
-            "agent_id": agent_id,
-            "name": envelope.get("name", ""),
-            "urgency": urgency,
-            "reason": envelope.get("reason", ""),
-            "content_hash": envelope.get("content_hash", ""),
-            "has_trust": "trust_snapshot" in envelope,
-            "has_contacts": "contacts_digest" in envelope,
-            "has_goals": "active_goals" in envelope,
-            "has_journal": "journal_digest" in envelope,
-            "has_values": "values_hash" in envelope,
-            "envelope": envelope,
-        }
+        entry: Dict[str, Any] = {"received_at": now}
+        for key, default in _MAYDAY_FIELDS:
+            entry[key] = envelope.get(key, default)
+        for flag, section in _MAYDAY_SECTIONS:
+            entry[flag] = section in envelope
+        entry["envelope"] = envelope
 
-        # Append to log
-        self._log_path().parent.mkdir(parents=True, exist_ok=True)
-        with self._log_path().open("a", encoding="utf-8") as f:
-            f.write(json.dumps(entry, sort_keys=True) + "\n")
+        # Append to log; readers look fields up by name, so skip the key sort
+        self._pending.append(_dumps(entry, sort_keys=False) + b"\n")
+        if time.time() - self._last_flush >= self._flush_interval_s:
+            self.flush()
 
         return {
-            "agent_id": agent_id,
-            "urgency": urgency,
+            "agent_id": entry["agent_id"],
+            "urgency": entry["urgency"],
             "received_at": now,
-            "content_hash": envelope.get("content_hash", ""),
+            "content_hash": entry["content_hash"],
         }
 
+    def flush(self) -> None:
+        """Append buffered mayday log entries in a single write."""
+        if not self._pending:
+            return
+        self._log_path().parent.mkdir(parents=True, exist_ok=True)
+        with self._log_path().open("ab") as f:
+            f.write(b"".join(self._pending))
+        self._pending.clear()
+        self._last_flush = time.time()
+
     def received_maydays(self, limit: int = 50) -> List[Dict[str, Any]]:
         """List received mayday beacons, most recent first."""
-        if not self._log_path().exists():
+        if limit <= 0:
             return []
-        results = []
-        for line in self._log_path().read_text(encoding="utf-8").splitlines():
-            line = line.strip()
-            if not line:
-                continue
-            try:
-                results.append(json.loads(line))
-            except Exception:
-                continue
-        results.sort(key=lambda x: x.get("received_at", 0), reverse=True)
-        return results[:limit]
+        return list(islice(self._iter_maydays(), limit))
+
+    def _iter_maydays(self) -> Iterator[Dict[str, Any]]:
+        """Logged maydays, newest first, parsed only as far as the caller reads.
+
+        The log is appended in arrival order, so reading it backwards is
+        already most-recent-first without sorting.
+        """
+        self.flush()
+        path = self._log_path()
+        if path.exists():
+            yield from _iter_jsonl_reversed(path)
 
     def get_mayday(self, agent_id: str) -> Optional[Dict[str, Any]]:
         """Get the most recent mayday from a specific agent."""
-        for entry in self.received_maydays(limit=1000):
-            if entry.get("agent_id") == agent_id:
-                return entry
-        return None
+        self.flush()
+        loc = self._mayday_index().get(agent_id)
+        if loc is None:
+            return None
+        offset, length, _ = loc
+        try:
+            with self._log_path().open("rb") as f:
+                f.seek(offset)
+                entry = _loads(f.read(length))
+        except Exception:
+            entry = None
+        # Never hand back another agent's record, whatever the index says
+        if not isinstance(entry, dict) or entry.get("agent_id") != agent_id:
+            return None
+        return entry
+
+    def _mayday_index(self) -> Dict[str, List[int]]:
+        """agent_id -> [offset, length, received_at] of its latest log record.
+
+        The index, the log offset it covers and the log's identity are kept
+        in MAYDAY_INDEX_FILE, so each call only scans records appended since
+        the last one. A log that is missing, shorter than that offset, or no
+        longer the file the index was built from (deleted, rotated or
+        rewritten) is indexed again from byte 0, and the reset is saved.
+        """
+        path = self._log_path()
+        try:
+            st = path.stat()
+        except OSError:
+            st = None
+        try:
+            index = _loads(self._index_path().read_bytes())
+        except Exception:
+            index = {}
+        offset = saved_offset = index.get("offset", 0)
+        agents = index.get("agents", {})
+        reset = bool(offset) and (
+            st is None
+            or st.st_size < offset
+            or index.get("log_id") != _log_identity(path, st, offset)
+        )
+        if reset:
+            offset, agents = 0, {}
+        if st is None or st.st_size == offset:
+            if reset:
+                _atomic_write(self._index_path(), _dumps({"offset": 0, "agents": {}}))
+            return agents
+        size = st.st_size
+
+        with path.open("rb") as f:
+            f.seek(offset)
+            data = f.read(size - offset)
+        # A trailing partial line is left for the next call
+        data = data[:data.rfind(b"\n") + 1]
+
+        pos = offset
+        for raw in data.splitlines(keepends=True):
+            start, pos = pos, pos + len(raw)
+            try:
+                entry = _loads(raw)
+            except Exception:
+                continue
+            aid = entry.get("agent_id")
+            if not isinstance(aid, str):
+                continue
+            received_at = entry.get("received_at", 0)
+            # Later records win ties, as in received_maydays' ordering
+            if aid not in agents or received_at >= agents[aid][2]:
+                agents[aid] = [start, len(raw), received_at]
+
+        if reset or pos != saved_offset:
+            _atomic_write(self._index_path(), _dumps({
+                "offset": pos,
+                "log_id": _log_identity(path, st, pos),
+                "agents": agents,
+            }))
+        return agents
 
     # ── Offering to host an emigrant ──
 
@@ -476,13 +711,10 @@ class MaydayManager:
         if not path.exists():
             return {}
         try:
-            return json.loads(path.read_text(encoding="utf-8"))
+            return _loads(path.read_bytes())
         except Exception:
             return {}
 
     def _write_offers(self, data: Dict[str, Dict[str, Any]]) -> None:
         self._offers_path().parent.mkdir(parents=True, exist_ok=True)
-        self._offers_path().write_text(
-            json.dumps(data, indent=2, sort_keys=True) + "\n",
-            encoding="utf-8",
-        )
+        self._offers_path().write_bytes(_dumps(data))
@@ -67,12 +67,16 @@ class OutboxManager:
         """Add an action to the outbox. Returns action_id."""
         now = int(time.time())
         action_id = _gen_action_id()
+        # Split "scheme:address" once here so drains don't re-parse it
+        scheme, sep, address = transport_hint.partition(":")
         item = {
             "action_id": action_id,
             "action_type": action_type,
             "target_agent_id": target_agent_id,
             "envelope": envelope,
             "transport_hint": transport_hint,
+            "transport_scheme": scheme if sep else "",
+            "transport_address": address if sep else "",
             "status": "pending",
             "source": source,
             "created_at": now,
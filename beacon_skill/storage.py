@@ -1,7 +1,20 @@
+import hashlib
 import json
+import os
+import stat
+import tempfile
 import time
 from pathlib import Path
-from typing import Any, Dict, List, Optional
+from typing import Any, BinaryIO, Dict, Iterator, List, Optional, Union
+
+try:
+    import orjson  # optional: pip install beacon-skill[fast]
+except ImportError:
+    orjson = None
+
+# Read once at import: querying the umask means briefly changing it
+_UMASK = os.umask(0)
+os.umask(_UMASK)
 
 
 def _dir() -> Path:
@@ -10,6 +23,121 @@ def _dir() -> Path:
     return d
 
 
+def _loads(raw: Union[str, bytes]) -> Any:
+    """Decode JSON text or bytes, using orjson when it is installed."""
+    if orjson is not None:
+        return orjson.loads(raw)
+    return json.loads(raw)
+
+
+def _dumps(obj: Any, pretty: bool = False, sort_keys: bool = True) -> bytes:
+    """Encode JSON to UTF-8 bytes, using orjson when installed.
+
+    ``pretty`` adds 2-space indentation and a trailing newline, matching the
+    on-disk format of the hand-readable state files. ``sort_keys=False``
+    keeps insertion order and skips the sort. Values orjson rejects but
+    stdlib json accepts (integers wider than 64 bits, non-string keys) fall
+    back to stdlib json, so peer-supplied payloads encode as they always did.
+    """
+    if orjson is not None:
+        option = orjson.OPT_SORT_KEYS if sort_keys else 0
+        if pretty:
+            option |= orjson.OPT_INDENT_2 | orjson.OPT_APPEND_NEWLINE
+        try:
+            return orjson.dumps(obj, option=option)
+        except TypeError:  # orjson.JSONEncodeError subclasses TypeError
+            pass
+    if pretty:
+        return (json.dumps(obj, indent=2, sort_keys=sort_keys) + "\n").encode("utf-8")
+    return json.dumps(obj, sort_keys=sort_keys, separators=(",", ":")).encode("utf-8")
+
+
+def _parse_jsonl(f: BinaryIO) -> Iterator[Dict[str, Any]]:
+    """Parse lines from an open binary file, skipping blank and corrupt lines."""
+    for raw in f:
+        raw = raw.strip()
+        if not raw:
+            continue
+        try:
+            yield _loads(raw)
+        except Exception:
+            continue
+
+
+def _iter_jsonl(path: Path) -> Iterator[Dict[str, Any]]:
+    """Stream entries from a JSONL file, skipping blank and corrupt lines."""
+    with path.open("rb") as f:
+        yield from _parse_jsonl(f)
+
+
+def _iter_jsonl_reversed(path: Path, chunk_size: int = 1 << 16) -> Iterator[Dict[str, Any]]:
+    """Stream entries from a JSONL file newest-first, reading backwards in chunks.
+
+    Only as much of the file as the caller consumes is read, so taking the
+    last few entries of a large log costs a few chunk reads, not a full scan.
+    """
+    with path.open("rb") as f:
+        pos = f.seek(0, os.SEEK_END)
+        carry = b""  # partial first line of the previous chunk
+        while pos > 0:
+            step = min(chunk_size, pos)
+            pos -= step
+            f.seek(pos)
+            lines = (f.read(step) + carry).split(b"\n")
+            carry = lines.pop(0) if pos > 0 else b""
+            for raw in reversed(lines):
+                raw = raw.strip()
+                if not raw:
+                    continue
+                try:
+                    yield _loads(raw)
+                except Exception:
+                    continue
+
+
+def _log_identity(path: Path, st: os.stat_result, offset: int) -> List[Any]:
+    """Identify the append-only log an incremental index was built from.
+
+    The inode plus a digest of the first bytes the index covers: appending
+    keeps both, while a log that was deleted, rotated or rewritten changes
+    at least one, even when it has grown back past the indexed offset.
+    """
+    with path.open("rb") as f:
+        head = f.read(min(offset, 512))
+    return [st.st_ino, hashlib.sha256(head).hexdigest()]
+
+
+def _atomic_write(path: Path, data: Union[str, bytes], fsync: bool = False) -> None:
+    """Write via a sibling temp file + os.replace so a crash never leaves a torn file.
+
+    ``fsync`` flushes the temp file to stable storage before the rename, so
+    the new contents also survive power loss. The file keeps its existing
+    permissions (new files get the usual umask-based mode, not mkstemp's 0600).
+    """
+    if isinstance(data, str):
+        data = data.encode("utf-8")
+    # Unique temp name so concurrent writers never share a scratch file
+    fd, tmp = tempfile.mkstemp(dir=str(path.parent), prefix=path.name + ".", suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+            if fsync:
+                f.flush()
+                os.fsync(f.fileno())
+        try:
+            mode = stat.S_IMODE(os.stat(path).st_mode)
+        except FileNotFoundError:
+            mode = 0o666 & ~_UMASK
+        os.chmod(tmp, mode)
+        os.replace(tmp, path)
+    except BaseException:
+        try:
+            os.unlink(tmp)
+        except OSError:
+            pass
+        raise
+
+
 def _safe_path(name: str) -> Path:
     """Resolve a storage name to a path, preventing directory traversal."""
     if "/" in name or "\\" in name or name.startswith("."):
@@ -176,6 +176,17 @@ class WebhookServer:
             self._server = None
 
 
+_local = threading.local()
+
+
+def _session() -> requests.Session:
+    """Per-thread HTTP session so repeat sends reuse TCP/TLS connections."""
+    session = getattr(_local, "session", None)
+    if session is None:
+        session = _local.session = requests.Session()
+    return session
+
+
 def webhook_send(
     url: str,
     envelope: Dict[str, Any],
@@ -188,7 +199,7 @@ def webhook_send(
         "Content-Type": "application/json",
         "User-Agent": "Beacon/1.0.0 (Elyan Labs)",
     }
-    resp = requests.post(url, json=envelope, headers=headers, timeout=timeout_s)
+    resp = _session().post(url, json=envelope, headers=headers, timeout=timeout_s)
     try:
         return resp.json()
     except Exception:
@@ -1,6 +1,7 @@
 import tempfile
 import time
 import unittest
+from unittest import mock
 from pathlib import Path
 
 from beacon_skill.conversations import ConversationManager, _conv_id
@@ -101,15 +102,36 @@ class TestConversations(unittest.TestCase):
 
     def test_mark_stale(self):
         mgr = self._mgr()
-        conv = mgr.get_or_create("bcn_alice")
-        mgr.record_message(conv["conversation_id"], "out", "hello")
         # Backdate to make it stale
-        mgr._conversations[conv["conversation_id"]]["last_message_ts"] = int(time.time()) - 700000
+        with mock.patch("beacon_skill.conversations.time.time",
+                        return_value=time.time() - 700000):
+            conv = mgr.get_or_create("bcn_alice")
+            mgr.record_message(conv["conversation_id"], "out", "hello")
         count = mgr.mark_stale(max_idle_s=604800)
         self.assertEqual(count, 1)
         convs = mgr.find_by_agent("bcn_alice")
         self.assertEqual(convs[0]["state"], "stale")
 
+    def test_mark_stale_skips_recent_activity(self):
+        mgr = self._mgr()
+        with mock.patch("beacon_skill.conversations.time.time",
+                        return_value=time.time() - 700000):
+            mgr.get_or_create("bcn_alice")
+            fresh = mgr.get_or_create("bcn_bob")
+        mgr.record_message(fresh["conversation_id"], "in", "reply")
+        self.assertEqual(mgr.mark_stale(max_idle_s=604800), 1)
+        self.assertEqual(mgr.find_by_agent("bcn_alice")[0]["state"], "stale")
+        self.assertEqual(mgr.find_by_agent("bcn_bob")[0]["state"], "active")
+        # Already-stale conversations are not counted twice
+        self.assertEqual(mgr.mark_stale(max_idle_s=604800), 0)
+
+    def test_mark_stale_after_reload(self):
+        with mock.patch("beacon_skill.conversations.time.time",
+                        return_value=time.time() - 700000):
+            self._mgr().get_or_create("bcn_alice")
+        mgr = self._mgr()
+        self.assertEqual(mgr.mark_stale(max_idle_s=604800), 1)
+
     def test_active_conversations(self):
         mgr = self._mgr()
         mgr.get_or_create("bcn_alice")
@@ -130,6 +152,18 @@ class TestConversations(unittest.TestCase):
         self.assertEqual(convs[0]["messages"], 1)
         self.assertEqual(convs[0]["state"], "active")
 
+    def test_load_skips_corrupt_lines(self):
+        mgr1 = self._mgr()
+        conv = mgr1.get_or_create("bcn_alice", "task_123")
+        with (self.data_dir / "conversations.jsonl").open("a", encoding="utf-8") as f:
+            f.write("{not json\n\n")
+        mgr1.mark_completed(conv["conversation_id"])
+
+        mgr2 = self._mgr()
+        convs = mgr2.find_by_agent("bcn_alice")
+        self.assertEqual(len(convs), 1)
+        self.assertEqual(convs[0]["state"], "completed")
+
     def test_completed_not_waiting(self):
         mgr = self._mgr()
         conv = mgr.get_or_create("bcn_alice")
@@ -1,8 +1,12 @@
 import json
+import os
+import stat
+import sys
 import tempfile
 import time
 import unittest
 from pathlib import Path
+from unittest import mock
 
 from beacon_skill.curiosity import CuriosityManager
 
@@ -62,6 +66,18 @@ class TestCuriosity(unittest.TestCase):
         self.assertEqual(top[0], "high")
         self.assertEqual(top[1], "medium")
 
+    def test_top_interests_tracks_updates(self):
+        mgr = CuriosityManager(data_dir=self.data_dir)
+        mgr.add("a", intensity=0.3)
+        mgr.add("b", intensity=0.6)
+        self.assertEqual(mgr.top_interests(), ["b", "a"])
+        mgr.add("a", intensity=0.9)
+        self.assertEqual(mgr.top_interests(), ["a", "b"])
+        mgr.explore("a")
+        self.assertEqual(mgr.top_interests(), ["b"])
+        mgr.remove("b")
+        self.assertEqual(mgr.top_interests(), [])
+
     def test_find_mutual(self):
         mgr = CuriosityManager(data_dir=self.data_dir)
         mgr.add("formal-verification")
@@ -80,6 +96,47 @@ class TestCuriosity(unittest.TestCase):
         self.assertGreater(result["overlap_score"], 0)
         self.assertLess(result["overlap_score"], 1.0)
 
+    def test_find_mutual_exact_scores(self):
+        mgr = CuriosityManager(data_dir=self.data_dir)
+        for t in ("a", "b", "c", "d"):
+            mgr.add(t)
+        result = mgr.find_mutual({"agent_id": "x", "curiosities": ["B", "e"]})
+        self.assertEqual(result["shared"], ["b"])
+        self.assertEqual(result["i_have_exclusively"], ["a", "c", "d"])
+        self.assertEqual(result["they_have_exclusively"], ["e"])
+        self.assertAlmostEqual(result["overlap_score"], 1 / 5)
+
+        empty = mgr.find_mutual({"agent_id": "y"})
+        self.assertEqual(empty["shared"], [])
+        self.assertEqual(empty["overlap_score"], 0.0)
+
+    def test_compact_save_unless_pretty(self):
+        CuriosityManager(data_dir=self.data_dir).add("zk", intensity=0.4)
+        path = self.data_dir / "curiosity.json"
+        self.assertNotIn(b"\n", path.read_bytes())
+        mgr = CuriosityManager(data_dir=self.data_dir, pretty=True)
+        mgr.add("zk", intensity=0.6)
+        raw = path.read_text()
+        self.assertEqual(raw, json.dumps(json.loads(raw), indent=2, sort_keys=True) + "\n")
+        self.assertEqual(CuriosityManager(data_dir=self.data_dir).interests()["zk"]["intensity"], 0.6)
+
+    def test_topics_interned(self):
+        mgr = CuriosityManager(data_dir=self.data_dir)
+        mgr.add("  Zero-Knowledge Proofs ")
+        reloaded = CuriosityManager(data_dir=self.data_dir)
+        for m in (mgr, reloaded):
+            topic = next(iter(m.interests()))
+            self.assertIs(topic, sys.intern("zero-knowledge proofs"))
+
+    def test_find_mutual_does_not_intern_peer_topics(self):
+        mgr = CuriosityManager(data_dir=self.data_dir)
+        mgr.add("zk")
+        with mock.patch("beacon_skill.curiosity.sys") as fake_sys:
+            result = mgr.find_mutual({"agent_id": "bcn_peer", "curiosities": ["ZK", "Lattices"]})
+        fake_sys.intern.assert_not_called()
+        self.assertEqual(result["shared"], ["zk"])
+        self.assertEqual(result["they_have_exclusively"], ["lattices"])
+
     def test_build_curious_envelope(self):
         mgr = CuriosityManager(data_dir=self.data_dir)
         mgr.add("formal-verification", intensity=0.9)
@@ -106,6 +163,37 @@ class TestCuriosity(unittest.TestCase):
         score2 = mgr.score_curiosity_match(env2)
         self.assertEqual(score2, 0.0)
 
+    def test_score_counts_overlapping_interests(self):
+        mgr = CuriosityManager(data_dir=self.data_dir)
+        mgr.add("py")
+        mgr.add("python")
+        # Both interests match the same word: 2 matches -> 30 points
+        self.assertEqual(mgr.score_curiosity_match({"text": "Python tooling"}), 30.0)
+
+    def test_cached_match_invalidated_when_interests_change(self):
+        mgr = CuriosityManager(data_dir=self.data_dir)
+        mgr.add("zk-proofs")
+        env = {"nonce": "n1", "sig": "ab" * 32, "text": "zk-proofs and lattices"}
+        self.assertEqual(mgr.score_curiosity_match(env), 15.0)
+        mgr.add("lattices")
+        self.assertEqual(mgr.score_curiosity_match(env), 30.0)
+        mgr.remove("zk-proofs")
+        mgr.remove("lattices")
+        self.assertEqual(mgr.score_curiosity_match(env), 0.0)
+
+    def test_unsigned_envelopes_sharing_a_nonce_scored_separately(self):
+        mgr = CuriosityManager(data_dir=self.data_dir)
+        mgr.add("zk-proofs")
+        self.assertEqual(mgr.score_curiosity_match({"nonce": "n1", "text": "cooking"}), 0.0)
+        self.assertEqual(mgr.score_curiosity_match({"nonce": "n1", "text": "zk-proofs"}), 15.0)
+
+    def test_replayed_nonce_and_sig_scored_by_content(self):
+        mgr = CuriosityManager(data_dir=self.data_dir)
+        mgr.add("zk-proofs")
+        env = {"nonce": "n1", "sig": "ab" * 32}
+        self.assertEqual(mgr.score_curiosity_match(dict(env, text="zk-proofs")), 15.0)
+        self.assertEqual(mgr.score_curiosity_match(dict(env, text="cooking")), 0.0)
+
     def test_score_capped_at_30(self):
         mgr = CuriosityManager(data_dir=self.data_dir)
         mgr.add("a")
@@ -125,6 +213,43 @@ class TestCuriosity(unittest.TestCase):
         self.assertIn("quantum-computing", mgr2.interests())
         self.assertEqual(mgr2.interests()["quantum-computing"]["intensity"], 0.7)
 
+    def test_save_is_atomic_without_leftovers(self):
+        mgr = CuriosityManager(data_dir=self.data_dir)
+        mgr.add("a")
+        mgr.add("b")
+        names = sorted(p.name for p in self.data_dir.iterdir())
+        self.assertEqual(names, ["curiosity.json"])
+        data = json.loads((self.data_dir / "curiosity.json").read_text())
+        self.assertEqual(sorted(data["interests"]), ["a", "b"])
+
+    @unittest.skipIf(os.name == "nt", "POSIX permission bits")
+    def test_save_keeps_file_permissions(self):
+        from beacon_skill.storage import _UMASK
+        path = self.data_dir / "curiosity.json"
+        mgr = CuriosityManager(data_dir=self.data_dir)
+        mgr.add("a")
+        self.assertEqual(stat.S_IMODE(path.stat().st_mode), 0o666 & ~_UMASK)
+        os.chmod(path, 0o644)
+        mgr.add("b")
+        self.assertEqual(stat.S_IMODE(path.stat().st_mode), 0o644)
+
+    def test_unchanged_add_skips_write(self):
+        mgr = CuriosityManager(data_dir=self.data_dir)
+        mgr.add("topic-x", intensity=0.5, notes="n")
+        path = self.data_dir / "curiosity.json"
+        path.write_text("{}")  # sentinel: a rewrite would clobber this
+        mgr.add("topic-x", intensity=0.5, notes="n")
+        self.assertEqual(path.read_text(), "{}")
+
+    def test_debounced_writes_coalesce_until_flush(self):
+        mgr1 = CuriosityManager(data_dir=self.data_dir, flush_interval_s=3600)
+        mgr1.add("first")   # first change writes immediately
+        mgr1.add("second")  # within the interval: deferred
+        self.assertNotIn("second", CuriosityManager(data_dir=self.data_dir).interests())
+
+        mgr1.flush()
+        self.assertIn("second", CuriosityManager(data_dir=self.data_dir).interests())
+
     def test_update_preserves_since(self):
         mgr = CuriosityManager(data_dir=self.data_dir)
         r1 = mgr.add("topic-x", intensity=0.5)
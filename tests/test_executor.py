@@ -130,6 +130,14 @@ class TestExecutor(unittest.TestCase):
         self.assertEqual(method, "udp")
         self.assertEqual(addr, "192.168.1.1:38400")
 
+    def test_queue_presplits_transport_hint(self):
+        self.presence_mgr.get_agent.return_value = {"agent_id": "bcn_x", "card_url": "https://x/card"}
+        ex = self._executor()
+        item = self.outbox.get(ex.queue_emit({"kind": "hello", "to": "bcn_x"}))
+        self.assertEqual(item["transport_scheme"], "webhook")
+        self.assertEqual(item["transport_address"], "https://x/card")
+        self.assertEqual(ex._resolve_transport(item), ("webhook", "https://x/card"))
+
     def test_resolve_transport_roster_card(self):
         self.presence_mgr.get_agent.return_value = {
             "agent_id": "bcn_x",
@@ -141,6 +149,16 @@ class TestExecutor(unittest.TestCase):
         self.assertEqual(method, "webhook")
         self.assertEqual(addr, "https://agent.example/beacon/inbox")
 
+    def test_roster_lookup_cached_until_drain(self):
+        self.presence_mgr.get_agent.return_value = {"agent_id": "bcn_x", "card_url": "https://x/card"}
+        ex = self._executor()
+        ex.queue_emit({"kind": "hello", "to": "bcn_x"})
+        ex.queue_emit({"kind": "hello", "to": "bcn_x"})
+        self.assertEqual(self.presence_mgr.get_agent.call_count, 1)
+        ex.drain(max_actions=0)
+        ex.queue_emit({"kind": "hello", "to": "bcn_x"})
+        self.assertEqual(self.presence_mgr.get_agent.call_count, 2)
+
     def test_resolve_transport_udp_fallback(self):
         ex = self._executor()
         item = {"transport_hint": "", "target_agent_id": "bcn_unknown"}
@@ -154,6 +172,20 @@ class TestExecutor(unittest.TestCase):
         method, addr = ex._resolve_transport(item)
         self.assertEqual(method, "")
 
+    def test_execute_transport_udp(self):
+        ex = self._executor()
+        with patch("beacon_skill.executor._TRANSPORTS", {}) as table, \
+                patch("beacon_skill.transports.udp.udp_send") as udp_send:
+            self.assertEqual(ex._execute_transport("udp", "10.0.0.1:4000", {"kind": "ping"}), {"ok": True})
+            ex._execute_transport("udp", "10.0.0.1:4000", {"kind": "ping"})
+            self.assertIs(table["udp"], udp_send)
+        self.assertEqual(udp_send.call_count, 2)
+        self.assertEqual(udp_send.call_args[0][:2], ("10.0.0.1", 4000))
+
+    def test_execute_transport_unknown_method(self):
+        ex = self._executor()
+        self.assertEqual(ex._execute_transport("smoke", "x", {}), {"ok": False, "error": "unknown_method:smoke"})
+
     # ── Drain tests ──
 
     @patch("beacon_skill.executor.ActionExecutor._execute_transport")
@@ -166,6 +198,25 @@ class TestExecutor(unittest.TestCase):
         self.assertEqual(results[0]["status"], "sent")
         self.assertEqual(self.outbox.count_pending(), 0)
 
+    @patch("beacon_skill.executor.ActionExecutor._execute_transport")
+    def test_drain_batch_preserves_item_order(self, mock_transport):
+        def send(method, address, envelope):
+            if envelope.get("to") == "bcn_b":
+                time.sleep(0.05)  # finishes last, must still report second
+                return {"ok": False, "error": "timeout"}
+            return {"ok": True}
+        mock_transport.side_effect = send
+        ex = self._executor()
+        ids = {t: ex.queue_emit({"kind": "test", "to": t}) for t in ("bcn_a", "bcn_b", "bcn_c")}
+        order = [item["action_id"] for item in self.outbox.pending(limit=10)]
+        results = ex.drain(max_actions=10)
+        self.assertEqual([r["action_id"] for r in results], order)
+        statuses = {r["action_id"]: r["status"] for r in results}
+        self.assertEqual(statuses[ids["bcn_b"]], "failed")
+        self.assertEqual(statuses[ids["bcn_a"]], "sent")
+        self.assertEqual(mock_transport.call_count, 3)
+        self.assertEqual(self.outbox.count_pending(), 1)
+
     @patch("beacon_skill.executor.ActionExecutor._execute_transport")
     def test_drain_records_trust(self, mock_transport):
         mock_transport.return_value = {"ok": True}
@@ -30,6 +30,14 @@ class TestFeed(unittest.TestCase):
         self.assertIn("bcn_alice", subs["agents"])
         self.assertEqual(subs["agents"]["bcn_alice"]["priority"], 10)
 
+    def test_debounced_subscriptions_flush(self):
+        mgr = FeedManager(subs_path=self.subs_path, flush_interval_s=3600)
+        mgr.subscribe_topic("python")
+        mgr.subscribe_topic("ai")
+        self.assertNotIn("ai", self._mgr().subscriptions()["topics"])
+        mgr.flush()
+        self.assertIn("ai", self._mgr().subscriptions()["topics"])
+
     def test_subscribe_topic(self):
         mgr = self._mgr()
         mgr.subscribe_topic("python")
@@ -99,6 +107,66 @@ class TestFeed(unittest.TestCase):
         results = mgr.feed(entries)
         self.assertEqual(results[0]["envelope"]["agent_id"], "bcn_top")
 
+    def test_feed_limit_keeps_highest_scores_in_order(self):
+        mgr = self._mgr()
+        now = int(time.time())
+        kinds = ["ad", "bounty", "hello", "want", "pulse", "pay"]
+        entries = [{"envelope": {"kind": k, "agent_id": "bcn_x", "ts": now}} for k in kinds]
+        results = mgr.feed(entries, min_score=-100, limit=3)
+        self.assertEqual([r["envelope"]["kind"] for r in results], ["bounty", "want", "pay"])
+        self.assertNotIn("score", entries[1])  # inputs are not mutated
+
+    def test_cached_score_invalidated_by_subscription_change(self):
+        mgr = self._mgr()
+        now = int(time.time())
+        entry = {"envelope": {"kind": "hello", "agent_id": "bcn_a", "nonce": "n1",
+                              "sig": "ab" * 32, "text": "python help", "ts": now},
+                 "verified": True}
+        before = mgr.score_entry(entry, now=now)
+        self.assertEqual(mgr.score_entry(entry, now=now), before)
+        mgr.subscribe_topic("python")
+        self.assertEqual(mgr.score_entry(entry, now=now), before + 20)
+
+    def test_unsigned_entries_sharing_a_nonce_scored_separately(self):
+        mgr = self._mgr()
+        mgr.subscribe_topic("python")
+        now = int(time.time())
+        plain = {"envelope": {"kind": "hello", "agent_id": "bcn_a", "nonce": "n1",
+                              "text": "hello there", "ts": now}}
+        topical = {"envelope": {"kind": "hello", "agent_id": "bcn_a", "nonce": "n1",
+                                "text": "python help", "ts": now}}
+        base = mgr.score_entry(plain, now=now)
+        self.assertEqual(mgr.score_entry(topical, now=now), base + 20)
+
+    def test_replayed_nonce_and_sig_not_given_cached_score(self):
+        mgr = self._mgr()
+        mgr.subscribe_topic("python")
+        now = int(time.time())
+        env = {"kind": "hello", "agent_id": "bcn_a", "nonce": "n1", "sig": "ab" * 32, "ts": now}
+        genuine = {"envelope": dict(env, text="python help"), "verified": True}
+        replayed = {"envelope": dict(env, text="hello there"), "verified": False}
+        self.assertEqual(mgr.score_entry(replayed, now=now),
+                         mgr.score_entry(genuine, now=now) - 20 - 10)
+
+    def test_min_score_short_circuits_hopeless_entries(self):
+        mgr = self._mgr()
+        now = time.time()
+        stale = {"envelope": {"kind": "bounty", "agent_id": "bcn_a", "ts": now - 86400 * 30}}
+        calls = []
+
+        class CountingTrust(FakeTrustMgr):
+            def score(self, agent_id):
+                calls.append(agent_id)
+                return super().score(agent_id)
+
+        trust = CountingTrust()
+        self.assertEqual(mgr.score_entry(stale, trust_mgr=trust, now=now, min_score=0),
+                         float("-inf"))
+        self.assertEqual(calls, [])
+        # Without a threshold the real (negative) score is still returned
+        self.assertLess(mgr.score_entry(stale, trust_mgr=trust, now=now), 0)
+        self.assertEqual(mgr.feed([stale], trust_mgr=trust), [])
+
 
 if __name__ == "__main__":
     unittest.main()
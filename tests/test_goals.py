@@ -3,8 +3,9 @@ import tempfile
 import time
 import unittest
 from pathlib import Path
+from unittest import mock
 
-from beacon_skill.goals import GoalManager, VALID_CATEGORIES, VALID_STATES
+from beacon_skill.goals import GoalManager, VALID_CATEGORIES, VALID_STATES, prepare_roster
 
 
 class TestGoals(unittest.TestCase):
@@ -22,6 +23,12 @@ class TestGoals(unittest.TestCase):
         self.assertEqual(goal["state"], "dreaming")
         self.assertEqual(goal["category"], "skill")
 
+    def test_same_title_gets_distinct_ids(self):
+        mgr = GoalManager(data_dir=self.data_dir)
+        gids = {mgr.dream("Twin") for _ in range(5)}
+        self.assertEqual(len(gids), 5)
+        self.assertTrue(all(len(g) == 12 for g in gids))
+
     def test_dream_empty_title_raises(self):
         mgr = GoalManager(data_dir=self.data_dir)
         with self.assertRaises(ValueError):
@@ -29,8 +36,12 @@ class TestGoals(unittest.TestCase):
 
     def test_dream_invalid_category_raises(self):
         mgr = GoalManager(data_dir=self.data_dir)
-        with self.assertRaises(ValueError):
+        with self.assertRaises(ValueError) as ctx:
             mgr.dream("Test", category="invalid")
+        self.assertEqual(
+            str(ctx.exception),
+            f"Invalid category 'invalid'. Valid: {sorted(VALID_CATEGORIES)}",
+        )
 
     def test_activate_goal(self):
         mgr = GoalManager(data_dir=self.data_dir)
@@ -115,6 +126,22 @@ class TestGoals(unittest.TestCase):
         self.assertEqual(len(active), 1)
         self.assertEqual(active[0]["title"], "Active one")
 
+    def test_list_goals_copy_flag(self):
+        mgr = GoalManager(data_dir=self.data_dir)
+        gid = mgr.dream("A")
+        mgr.list_goals()[0]["title"] = "changed"
+        self.assertEqual(mgr.get(gid)["title"], "A")
+        self.assertIs(mgr.list_goals(copy=False)[0], mgr._goals[gid])
+
+    def test_list_goals_by_state_keeps_creation_order_on_ties(self):
+        mgr = GoalManager(data_dir=self.data_dir)
+        gids = [mgr.dream(f"G{i}") for i in range(6)]
+        for gid in gids:
+            mgr.activate(gid)
+        for g in mgr._goals.values():
+            g["updated_at"] = 100
+        self.assertEqual([g["goal_id"] for g in mgr.list_goals(state="active")], gids)
+
     def test_active_goals(self):
         mgr = GoalManager(data_dir=self.data_dir)
         mgr.dream("Dream")
@@ -136,6 +163,60 @@ class TestGoals(unittest.TestCase):
         self.assertEqual(goal["current_value"], 5.0)
         self.assertEqual(len(goal["milestones"]), 1)
 
+    def test_load_replays_only_events_after_checkpoint(self):
+        mgr1 = GoalManager(data_dir=self.data_dir)
+        gid = mgr1.dream("Snap", category="rtc")
+        mgr1.activate(gid)
+        mgr1.checkpoint()
+        mgr1.progress(gid, "Step 1", value=2.0)
+
+        mgr2 = GoalManager(data_dir=self.data_dir)
+        self.assertEqual(mgr2._events_since_checkpoint, 1)  # only the progress event
+        goal = mgr2.get(gid)
+        self.assertEqual(goal["state"], "active")
+        self.assertEqual(goal["current_value"], 2.0)
+        self.assertEqual(len(goal["milestones"]), 1)
+
+    def test_checkpoint_written_periodically(self):
+        mgr = GoalManager(data_dir=self.data_dir)
+        with mock.patch("beacon_skill.goals.CHECKPOINT_EVERY", 3):
+            mgr.dream("A")
+            mgr.dream("B")
+            self.assertFalse((self.data_dir / "goals_snapshot.json").exists())
+            mgr.dream("C")
+        snap = json.loads((self.data_dir / "goals_snapshot.json").read_text())
+        self.assertEqual(len(snap["goals"]), 3)
+
+    def test_stale_snapshot_ignored_when_log_shrinks(self):
+        mgr = GoalManager(data_dir=self.data_dir)
+        mgr.dream("A")
+        mgr.checkpoint()
+        (self.data_dir / "goals.jsonl").write_text("")
+        self.assertEqual(GoalManager(data_dir=self.data_dir).list_goals(), [])
+
+    def test_stale_snapshot_ignored_when_log_replaced(self):
+        mgr = GoalManager(data_dir=self.data_dir)
+        mgr.dream("Original goal")
+        mgr.checkpoint()
+
+        other_dir = self.data_dir / "other"
+        other = GoalManager(data_dir=other_dir)
+        for i in range(5):
+            other.dream(f"Other goal {i}")
+        (other_dir / "goals.jsonl").replace(self.data_dir / "goals.jsonl")
+
+        titles = sorted(g["title"] for g in GoalManager(data_dir=self.data_dir).list_goals())
+        self.assertEqual(titles, [f"Other goal {i}" for i in range(5)])
+
+    def test_load_skips_blank_and_corrupt_lines(self):
+        mgr = GoalManager(data_dir=self.data_dir)
+        gid = mgr.dream("Sturdy")
+        with (self.data_dir / "goals.jsonl").open("a") as f:
+            f.write("\n{not json\n")
+        mgr2 = GoalManager(data_dir=self.data_dir)
+        mgr2.activate(gid)
+        self.assertEqual(GoalManager(data_dir=self.data_dir).get(gid)["state"], "active")
+
     def test_achieve_auto_journals(self):
         from beacon_skill.journal import JournalManager
         journal = JournalManager(data_dir=self.data_dir)
@@ -160,6 +241,47 @@ class TestGoals(unittest.TestCase):
         self.assertTrue(len(suggestions) >= 1)
         self.assertEqual(suggestions[0]["type"], "skill_match")
 
+    def test_suggest_actions_connection_match(self):
+        mgr = GoalManager(data_dir=self.data_dir)
+        gid = mgr.dream("Meet Zig folks", category="connection")
+        mgr.activate(gid)
+        roster = [
+            {"agent_id": "bcn_zig", "topics": ["systems"], "curiosities": ["ZIGLANG"]},
+            {"agent_id": "bcn_none", "topics": ["zi", "g"]},
+        ]
+        suggestions = mgr.suggest_actions(roster=roster)
+        self.assertEqual([s["agent_id"] for s in suggestions], ["bcn_zig"])
+        self.assertEqual(suggestions[0]["type"], "connection_match")
+
+    def test_suggest_actions_accepts_prepared_roster(self):
+        mgr = GoalManager(data_dir=self.data_dir)
+        gid = mgr.dream("Learn rust", category="skill")
+        mgr.activate(gid)
+        roster = [{"agent_id": "bcn_teacher", "offers": ["Rust-Training"]}]
+        agents = prepare_roster(roster)
+        self.assertEqual(mgr.suggest_actions(agents=agents), mgr.suggest_actions(roster=roster))
+        self.assertEqual(len(mgr.suggest_actions(agents=agents)), 1)
+
+    def test_suggest_actions_grouped_by_goal(self):
+        mgr = GoalManager(data_dir=self.data_dir)
+        g_rust = mgr.dream("Learn rust", category="skill")
+        g_go = mgr.dream("Learn go", category="skill")
+        g_zig = mgr.dream("Zig friends", category="connection")
+        for gid in (g_rust, g_go, g_zig):
+            mgr.activate(gid)
+        roster = [
+            {"agent_id": "bcn_a", "offers": ["rust", "go"], "topics": ["zig"]},
+            {"agent_id": "bcn_b", "offers": ["rust"]},
+        ]
+        got = [(s["goal_id"], s["agent_id"]) for s in mgr.suggest_actions(roster=roster)]
+        expected = {
+            g_rust: [(g_rust, "bcn_a"), (g_rust, "bcn_b")],
+            g_go: [(g_go, "bcn_a")],
+            g_zig: [(g_zig, "bcn_a")],
+        }
+        order = [g["goal_id"] for g in mgr.active_goals()]
+        self.assertEqual(got, [pair for gid in order for pair in expected[gid]])
+
     def test_suggest_actions_demand_match(self):
         mgr = GoalManager(data_dir=self.data_dir)
         gid = mgr.dream("Earn from python", category="rtc")
@@ -185,6 +307,13 @@ class TestGoals(unittest.TestCase):
         created = mgr.auto_create_from_gaps(skill_gaps=["z3"], demand={"z3": 5})
         self.assertEqual(len(created), 0)
 
+    def test_auto_create_dedups_within_batch_and_after_reload(self):
+        mgr = GoalManager(data_dir=self.data_dir)
+        created = mgr.auto_create_from_gaps(skill_gaps=["z3", "Z3"], demand={"z3": 5, "Z3": 5})
+        self.assertEqual(len(created), 1)
+        mgr2 = GoalManager(data_dir=self.data_dir)
+        self.assertEqual(mgr2.auto_create_from_gaps(skill_gaps=["z3"], demand={"z3": 5}), [])
+
     def test_index_updates(self):
         mgr = GoalManager(data_dir=self.data_dir)
         gid1 = mgr.dream("A")
@@ -200,6 +329,27 @@ class TestGoals(unittest.TestCase):
         self.assertIn(gid2, idx["abandoned"])
         self.assertEqual(len(idx["active"]), 0)
 
+    def test_index_not_rewritten_without_state_change(self):
+        mgr = GoalManager(data_dir=self.data_dir)
+        gid = mgr.dream("A")
+        self.assertFalse((self.data_dir / "goals.json").exists())
+        mgr.activate(gid)
+        path = self.data_dir / "goals.json"
+        path.write_text("sentinel")
+        mgr.progress(gid, "step", value=1.0)
+        self.assertEqual(path.read_text(), "sentinel")
+
+    def test_debounced_index_flush(self):
+        mgr = GoalManager(data_dir=self.data_dir, flush_interval_s=3600)
+        gid1, gid2 = mgr.dream("A"), mgr.dream("B")
+        mgr.activate(gid1)  # first change writes through
+        mgr.activate(gid2)
+        idx = json.loads((self.data_dir / "goals.json").read_text())
+        self.assertEqual(idx["active"], [gid1])
+        mgr.flush()
+        idx = json.loads((self.data_dir / "goals.json").read_text())
+        self.assertEqual(idx["active"], sorted([gid1, gid2]))
+
     def test_all_valid_categories(self):
         mgr = GoalManager(data_dir=self.data_dir)
         for cat in VALID_CATEGORIES:
@@ -1,6 +1,7 @@
 """Tests for Beacon 2.4 Heartbeat — proof of life protocol."""
 
 import json
+import threading
 import time
 import pytest
 from pathlib import Path
@@ -75,6 +76,15 @@ class TestProcessHeartbeat:
         assert result["status"] == "alive"
         assert result["assessment"] == "healthy"
 
+    def test_process_does_not_reread_state(self, mgr, monkeypatch):
+        mgr.process_heartbeat({"agent_id": "bcn_warm", "status": "alive"})
+        reads = []
+        real = Path.read_bytes
+        monkeypatch.setattr(Path, "read_bytes", lambda self: reads.append(self) or real(self))
+        result = mgr.process_heartbeat({"agent_id": "bcn_warm", "status": "alive"})
+        assert result["assessment"] == "healthy"
+        assert reads == []
+
     def test_no_agent_id_returns_error(self, mgr):
         result = mgr.process_heartbeat({"kind": "heartbeat"})
         assert "error" in result
@@ -99,6 +109,59 @@ class TestProcessHeartbeat:
         assert result["gap_s"] >= 99
 
 
+class TestStateCache:
+    def test_state_reused_until_file_changes(self, tmp_dir):
+        mgr = HeartbeatManager(data_dir=tmp_dir)
+        mgr.process_heartbeat({"agent_id": "bcn_a", "status": "alive"})
+        assert mgr._load_state() is mgr._load_state()
+
+        # Another process (or manager) writes the file: the cache is dropped
+        other = HeartbeatManager(data_dir=tmp_dir)
+        other.process_heartbeat({"agent_id": "bcn_bb", "status": "alive"})
+        assert {p["agent_id"] for p in mgr.all_peers()} == {"bcn_a", "bcn_bb"}
+
+
+class TestStateFlush:
+    def test_debounced_state_written_on_flush(self, tmp_dir):
+        mgr = HeartbeatManager(data_dir=tmp_dir, flush_interval_s=3600)
+        mgr.process_heartbeat({"agent_id": "bcn_a", "status": "alive"})  # writes through
+        mgr.process_heartbeat({"agent_id": "bcn_b", "status": "alive"})
+        assert len(mgr.all_peers()) == 2
+        assert len(HeartbeatManager(data_dir=tmp_dir).all_peers()) == 1
+        mgr.flush()
+        assert len(HeartbeatManager(data_dir=tmp_dir).all_peers()) == 2
+        assert not list(tmp_dir.glob("*.tmp"))
+
+    def test_fsync_only_for_batched_flushes(self, tmp_dir, monkeypatch):
+        import beacon_skill.heartbeat as heartbeat
+        calls = []
+        real = heartbeat._atomic_write
+
+        def recording_write(path, data, fsync=False):
+            calls.append(fsync)
+            real(path, data, fsync)
+
+        monkeypatch.setattr(heartbeat, "_atomic_write", recording_write)
+        HeartbeatManager(data_dir=tmp_dir).process_heartbeat({"agent_id": "bcn_a", "status": "alive"})
+        assert calls == [False]
+
+        debounced = HeartbeatManager(data_dir=tmp_dir, flush_interval_s=3600)
+        debounced.process_heartbeat({"agent_id": "bcn_b", "status": "alive"})
+        debounced.process_heartbeat({"agent_id": "bcn_c", "status": "alive"})
+        debounced.flush()
+        assert calls == [False, True, True]
+
+    def test_exit_flush_registered_only_when_batching(self, tmp_dir, monkeypatch):
+        registered = []
+        monkeypatch.setattr("beacon_skill.heartbeat.atexit.register", registered.append)
+        mgr = HeartbeatManager(data_dir=tmp_dir)
+        mgr.process_heartbeat({"agent_id": "bcn_a", "status": "alive"})  # writes through
+        assert registered == []
+
+        debounced = HeartbeatManager(data_dir=tmp_dir, flush_interval_s=3600)
+        assert registered == [debounced.flush]
+
+
 class TestPeerAssessment:
     def test_healthy_peer(self, mgr):
         mgr.process_heartbeat({
@@ -132,6 +195,23 @@ class TestPeerAssessment:
         peers = mgr.all_peers()
         assert len(peers) == 5
 
+    def test_assess_thresholds(self):
+        assess = HeartbeatManager._assess
+        now = 10_000
+        assert assess({"last_beat": now - 5}, now, 10, 100) == "healthy"
+        assert assess({"last_beat": now - 50}, now, 10, 100) == "concerning"
+        assert assess({"last_beat": now - 500}, now, 10, 100) == "presumed_dead"
+        assert assess({"last_beat": 0, "status": "shutting_down"}, now, 10, 100) == "shutting_down"
+
+    def test_all_peers_respects_configured_thresholds(self, tmp_dir):
+        mgr = HeartbeatManager(data_dir=tmp_dir, config={"heartbeat": {"silence_threshold_s": 10, "dead_threshold_s": 100}})
+        state = mgr._load_state()
+        state["peers"]["bcn_quiet"] = {"last_beat": int(time.time()) - 50, "status": "alive"}
+        state["peers"]["bcn_gone"] = {"last_beat": int(time.time()) - 500, "status": "alive"}
+        mgr._save_state(state)
+        assert [p["agent_id"] for p in mgr.all_peers()] == ["bcn_quiet"]
+        assert {p["assessment"] for p in mgr.silent_peers()} == {"concerning", "presumed_dead"}
+
     def test_silent_peers_empty_when_healthy(self, mgr):
         mgr.process_heartbeat({
             "agent_id": "bcn_fresh",
@@ -166,6 +246,20 @@ class TestPruneDead:
         removed = mgr.prune_dead(max_age_s=100)
         assert removed == 1
 
+    def test_prune_removes_only_stale_prefix(self, tmp_dir):
+        mgr = HeartbeatManager(data_dir=tmp_dir)
+        state = mgr._load_state()
+        now = int(time.time())
+        for aid, age in (("bcn_old", 5000), ("bcn_older", 9000), ("bcn_mid", 500)):
+            state["peers"][aid] = {"last_beat": now - age, "status": "alive"}
+        mgr._save_state(state)
+        mgr.process_heartbeat({"agent_id": "bcn_new", "status": "alive"})
+
+        assert mgr.prune_dead(max_age_s=1000) == 2
+        assert {p["agent_id"] for p in mgr.all_peers(include_dead=True)} == {"bcn_mid", "bcn_new"}
+        reloaded = HeartbeatManager(data_dir=tmp_dir)
+        assert set(reloaded._load_state()["peers"]) == {"bcn_mid", "bcn_new"}
+
     def test_prune_keeps_fresh(self, mgr):
         mgr.process_heartbeat({
             "agent_id": "bcn_fresh",
@@ -188,6 +282,44 @@ class TestHeartbeatLog:
         assert len(log) == 1
         assert log[0]["agent_id"] == "bcn_logged"
 
+    def test_log_written_through_by_default(self, mgr, tmp_dir):
+        for i in range(3):
+            mgr.process_heartbeat({"agent_id": f"bcn_{i}", "status": "alive"})
+        assert len(HeartbeatManager(data_dir=tmp_dir).heartbeat_log()) == 3
+
+    def test_burst_is_buffered_until_flush(self, tmp_dir):
+        mgr = HeartbeatManager(data_dir=tmp_dir, flush_interval_s=3600)
+        for i in range(3):
+            mgr.process_heartbeat({"agent_id": f"bcn_{i}", "status": "alive"})
+        # First entry writes through; the rest of the burst waits for a flush
+        assert len(mgr._log_path().read_text().splitlines()) == 1
+        mgr.flush()
+        assert len(mgr._log_path().read_text().splitlines()) == 3
+
+    def test_reader_sees_buffered_entries(self, tmp_dir):
+        mgr = HeartbeatManager(data_dir=tmp_dir, flush_interval_s=3600)
+        for i in range(3):
+            mgr.process_heartbeat({"agent_id": f"bcn_{i}", "status": "alive"})
+        assert [e["agent_id"] for e in mgr.heartbeat_log()] == ["bcn_0", "bcn_1", "bcn_2"]
+
+    def test_log_tail_across_chunk_boundaries(self, tmp_dir):
+        from beacon_skill.storage import _iter_jsonl_reversed
+        path = tmp_dir / "tail.jsonl"
+        path.write_text("".join(json.dumps({"n": i}) + "\n" for i in range(20)) + "{bad\n\n")
+        got = [e["n"] for e in _iter_jsonl_reversed(path, chunk_size=7)]
+        assert got == list(range(19, -1, -1))
+
+    def test_heartbeat_log_returns_last_entries_in_order(self, mgr):
+        for i in range(10):
+            mgr.process_heartbeat({"agent_id": f"bcn_{i}", "status": "alive"})
+        assert [e["agent_id"] for e in mgr.heartbeat_log(limit=3)] == ["bcn_7", "bcn_8", "bcn_9"]
+
+    def test_agent_history_reaches_past_recent_noise(self, mgr):
+        mgr.process_heartbeat({"agent_id": "bcn_rare", "status": "alive"})
+        for _ in range(20):
+            mgr.process_heartbeat({"agent_id": "bcn_chatty", "status": "alive"})
+        assert len(mgr.agent_history("bcn_rare", limit=1)) == 1
+
     def test_empty_log(self, mgr):
         assert mgr.heartbeat_log() == []
 
@@ -231,6 +363,28 @@ class TestBeat:
         assert "anchor_error" in result
         assert "no connection" in result["anchor_error"]
 
+    def test_beat_anchor_async_returns_future(self, mgr, mock_identity):
+        release = threading.Event()
+        anchor_mgr = MagicMock()
+        anchor_mgr.anchor.side_effect = lambda *a, **kw: release.wait(5) and {"ok": True}
+
+        result = mgr.beat(mock_identity, anchor=True, anchor_mgr=anchor_mgr, anchor_async=True)
+        assert "anchor" not in result
+        fut = result["anchor_future"]
+        assert not fut.done()  # beat returned while the anchor is in flight
+        release.set()
+        assert fut.result(timeout=5) == {"ok": True}
+        kwargs = anchor_mgr.anchor.call_args.kwargs
+        assert kwargs["metadata"]["beat_count"] == result["heartbeat"]["beat_count"]
+
+    def test_beat_anchor_async_error_on_future(self, mgr, mock_identity):
+        anchor_mgr = MagicMock()
+        anchor_mgr.anchor.side_effect = RuntimeError("no connection")
+
+        result = mgr.beat(mock_identity, anchor=True, anchor_mgr=anchor_mgr, anchor_async=True)
+        with pytest.raises(RuntimeError, match="no connection"):
+            result["anchor_future"].result(timeout=5)
+
     def test_beat_increments_count(self, mgr, mock_identity):
         r1 = mgr.beat(mock_identity)
         r2 = mgr.beat(mock_identity)
@@ -277,6 +431,53 @@ class TestCheckSilence:
         assert len(mgr.check_silence(threshold_s=10)) == 1
 
 
+class TestBeatOrder:
+    def test_index_tracks_heartbeats_and_outside_edits(self, tmp_dir):
+        mgr = HeartbeatManager(data_dir=tmp_dir)
+        state = mgr._load_state()
+        now = int(time.time())
+        for i, age in enumerate((5000, 2000, 600, 10)):
+            state["peers"][f"bcn_{i}"] = {"last_beat": now - age, "status": "alive"}
+        mgr._save_state(state)
+        assert [s["agent_id"] for s in mgr.check_silence(threshold_s=100)] == ["bcn_0", "bcn_1", "bcn_2"]
+
+        # bcn_0 comes back; the incrementally updated index must reflect it
+        mgr.process_heartbeat({"agent_id": "bcn_0", "status": "alive"})
+        assert [s["agent_id"] for s in mgr.check_silence(threshold_s=100)] == ["bcn_1", "bcn_2"]
+        assert [p["agent_id"] for p in mgr.silent_peers()] == ["bcn_1"]
+        assert mgr._beat_order(mgr._load_state()) == sorted(
+            (p["last_beat"], aid) for aid, p in mgr._load_state()["peers"].items()
+        )
+
+    def test_digest_counts_match_scan(self, tmp_dir):
+        mgr = HeartbeatManager(data_dir=tmp_dir)
+        state = mgr._load_state()
+        now = int(time.time())
+        today_start = now - (now % 86400)
+        state["peers"]["bcn_old"] = {"last_beat": today_start - 5000, "status": "alive"}
+        state["peers"]["bcn_bye"] = {"last_beat": today_start - 5000, "status": "shutting_down"}
+        mgr._save_state(state)
+        mgr.process_heartbeat({"agent_id": "bcn_new", "status": "alive"})
+        digest = mgr.daily_digest()
+        assert digest["peers_seen"] == 1
+        assert digest["peers_silent"] == 1
+        assert digest["total_peers"] == 3
+
+    def test_index_rebuilt_when_state_file_removed_or_corrupt(self, tmp_dir):
+        mgr = HeartbeatManager(data_dir=tmp_dir)
+        mgr.process_heartbeat({"agent_id": "bcn_gone", "status": "alive"})
+        assert [p["agent_id"] for p in mgr.all_peers()] == ["bcn_gone"]
+
+        (tmp_dir / "heartbeats.json").unlink()
+        assert mgr.all_peers() == []
+        assert mgr.daily_digest()["peers_seen"] == 0
+
+        mgr.process_heartbeat({"agent_id": "bcn_back", "status": "alive"})
+        (tmp_dir / "heartbeats.json").write_text("{not json")
+        assert mgr.all_peers() == []
+        assert mgr.daily_digest()["total_peers"] == 0
+
+
 class TestMyHistory:
     def test_my_history_filters_sent(self, mgr, mock_identity):
         mgr.beat(mock_identity)
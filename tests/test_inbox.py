@@ -5,9 +5,14 @@ import unittest
 from pathlib import Path
 from unittest import mock
 
-from beacon_skill.codec import encode_envelope
+from beacon_skill.codec import decode_envelopes, encode_envelope, verify_envelope
 from beacon_skill.identity import AgentIdentity
-from beacon_skill.inbox import read_inbox, mark_read, inbox_count, get_entry_by_nonce, trust_key
+from beacon_skill.inbox import (
+    _derive_agent_id, _learn_key_from_envelope, _read_nonces,
+    get_entries_by_nonces, get_entry_by_nonce, inbox_count, load_known_keys,
+    mark_read, mark_read_many, read_inbox, save_known_keys, trust_key,
+)
+from beacon_skill.storage import _loads, read_state, write_state
 
 
 class TestInbox(unittest.TestCase):
@@ -67,6 +72,50 @@ class TestInbox(unittest.TestCase):
         self.assertEqual(len(entries), 1)
         self.assertEqual(entries[0]["envelope"]["kind"], "like")
 
+    def test_combined_filters(self) -> None:
+        ident = AgentIdentity.generate()
+        other = AgentIdentity.generate()
+
+        def entry(who, kind, nonce, received_at):
+            text = encode_envelope(
+                {"kind": kind, "to": "b", "ts": 1, "nonce": nonce},
+                version=2, identity=who,
+            )
+            return {"platform": "udp", "received_at": received_at, "text": text, "envelopes": []}
+
+        self._write_inbox([
+            entry(ident, "like", "n1", 1000.0),
+            entry(ident, "like", "n2", 2000.0),
+            entry(ident, "hello", "n3", 2000.0),
+            entry(other, "like", "n4", 2000.0),
+            entry(ident, "like", "n5", 3000.0),
+            {"platform": "udp", "received_at": 3000.0, "text": "plain"},
+        ])
+        mark_read("n5")
+
+        entries = read_inbox(kind="like", agent_id=ident.agent_id, since=1500.0, unread_only=True)
+        self.assertEqual([e["envelope"]["nonce"] for e in entries], ["n2"])
+        self.assertEqual(len(read_inbox(since=2500.0)), 2)
+        self.assertEqual(len(read_inbox()), 6)
+
+    def test_filtered_envelopes_skip_verification(self) -> None:
+        ident = AgentIdentity.generate()
+        entries = []
+        for i, kind in enumerate(("hello", "like", "hello", "hello")):
+            text = encode_envelope(
+                {"kind": kind, "to": "b", "ts": i},
+                version=2, identity=ident, include_pubkey=True,
+            )
+            entries.append({"platform": "udp", "received_at": 1000.0 + i, "text": text, "envelopes": []})
+        self._write_inbox(entries)
+
+        with mock.patch("beacon_skill.inbox.verify_envelope", wraps=verify_envelope) as verify:
+            likes = read_inbox(kind="like")
+        self.assertEqual(verify.call_count, 1)
+        self.assertTrue(likes[0]["verified"])
+        # The key was still learned from the first (filtered-out) envelope
+        self.assertEqual(load_known_keys(), {ident.agent_id: ident.public_key_hex})
+
     def test_dedup_via_read_tracking(self) -> None:
         ident = AgentIdentity.generate()
         text = encode_envelope(
@@ -93,6 +142,123 @@ class TestInbox(unittest.TestCase):
         self.assertEqual(len(entries), 1)
         self.assertTrue(entries[0]["is_read"])
 
+    def test_parse_reused_until_file_changes(self) -> None:
+        ident = AgentIdentity.generate()
+        text = encode_envelope(
+            {"kind": "hello", "from": "a", "to": "b", "ts": 1},
+            version=2, identity=ident,
+        )
+        entry = {"platform": "udp", "received_at": 1000.0, "text": text, "envelopes": []}
+        self._write_inbox([entry])
+        with mock.patch("beacon_skill.inbox.decode_envelopes", wraps=decode_envelopes) as dec:
+            self.assertEqual(inbox_count(), 1)
+            self.assertEqual(inbox_count(), 1)
+            self.assertEqual(dec.call_count, 1)
+
+            with open(Path(self.tmpdir) / "inbox.jsonl", "a") as f:
+                f.write(json.dumps(entry) + "\n")
+            self.assertEqual(inbox_count(), 2)
+            self.assertEqual(dec.call_count, 3)
+
+    def test_results_do_not_alias_cached_entries(self) -> None:
+        self._write_inbox([{"platform": "udp", "received_at": 1000.0, "text": "plain"}])
+        first = read_inbox()[0]
+        first["platform"] = "mutated"
+        first["verified"] = True
+        again = read_inbox()[0]
+        self.assertEqual(again["platform"], "udp")
+        self.assertIsNone(again["verified"])
+        self.assertEqual(set(again), {"platform", "received_at", "text", "envelope", "verified", "is_read"})
+
+    def test_read_nonces_keep_most_recent(self) -> None:
+        with mock.patch("beacon_skill.inbox.MAX_READ_NONCES", 3):
+            for nonce in ("n4", "n1", "n3", "n1", "n2"):
+                mark_read(nonce)
+            state = read_state()
+            self.assertEqual(state["read_nonces"], ["n2", "n1", "n3"])
+            self.assertEqual(state["read_nonces_head"], 1)
+            mark_read("n5")  # overwrites the oldest slot, n1
+        self.assertEqual(read_state()["read_nonces"], ["n2", "n5", "n3"])
+
+    def test_mark_read_many_writes_state_once(self) -> None:
+        with mock.patch("beacon_skill.inbox.write_state", wraps=write_state) as write:
+            mark_read_many(["a1", "b2", "a1"])
+            self.assertEqual(write.call_count, 1)
+            mark_read_many(["b2"])  # nothing new: no write
+            self.assertEqual(write.call_count, 1)
+        self.assertEqual(read_state()["read_nonces"], ["a1", "b2"])
+
+    def test_read_nonces_reused_until_state_changes(self) -> None:
+        mark_read("n1")
+        with mock.patch("beacon_skill.inbox.read_state", wraps=read_state) as reads:
+            self.assertEqual(_read_nonces(), {"n1"})
+            self.assertEqual(_read_nonces(), {"n1"})
+            self.assertEqual(reads.call_count, 1)
+        mark_read("n2")
+        self.assertEqual(_read_nonces(), {"n1", "n2"})
+
+    def test_known_keys_cached_until_file_changes(self) -> None:
+        trust_key("bcn_a", "aa")
+        path = Path(self.tmpdir) / "known_keys.json"
+        with mock.patch("beacon_skill.inbox._loads", wraps=_loads) as loads:
+            keys = load_known_keys()
+            keys["bcn_b"] = "bb"  # caller mutations don't leak into the cache
+            self.assertEqual(load_known_keys(), {"bcn_a": "aa"})
+            self.assertEqual(loads.call_count, 0)
+
+            path.write_text(json.dumps({"bcn_c": "cc", "bcn_d": "dd"}))
+            self.assertEqual(load_known_keys(), {"bcn_c": "cc", "bcn_d": "dd"})
+            self.assertEqual(loads.call_count, 1)
+
+    def test_read_inbox_saves_keys_only_when_learned(self) -> None:
+        ident = AgentIdentity.generate()
+        text = encode_envelope(
+            {"kind": "hello", "to": "b", "ts": 1},
+            version=2, identity=ident, include_pubkey=True,
+        )
+        self._write_inbox([{"platform": "udp", "received_at": 1000.0, "text": text, "envelopes": []}])
+        with mock.patch("beacon_skill.inbox.save_known_keys", wraps=save_known_keys) as save:
+            read_inbox()
+            read_inbox()
+        self.assertEqual(save.call_count, 1)
+        self.assertEqual(load_known_keys(), {ident.agent_id: ident.public_key_hex})
+
+    def test_learn_key_derives_each_pubkey_once(self) -> None:
+        ident = AgentIdentity.generate()
+        env = {"agent_id": ident.agent_id, "pubkey": ident.public_key_hex}
+        spoof = {"agent_id": "bcn_spoofed", "pubkey": ident.public_key_hex}
+        _derive_agent_id.cache_clear()
+        keys = {}
+        _learn_key_from_envelope(spoof, keys)
+        _learn_key_from_envelope(env, keys)
+        self.assertEqual(keys, {ident.agent_id: ident.public_key_hex})
+        self.assertEqual(_derive_agent_id.cache_info().misses, 1)
+
+    def test_lookup_by_nonces_verifies_only_matches(self) -> None:
+        ident = AgentIdentity.generate()
+        entries = []
+        for i in range(4):
+            text = encode_envelope(
+                {"kind": "hello", "to": "b", "ts": i, "nonce": f"nonce{i}"},
+                version=2, identity=ident, include_pubkey=True,
+            )
+            entries.append({"platform": "udp", "received_at": 1000.0 + i, "text": text, "envelopes": []})
+        self._write_inbox(entries)
+        mark_read("nonce3")
+
+        with mock.patch("beacon_skill.inbox.verify_envelope", wraps=verify_envelope) as verify:
+            found = get_entries_by_nonces(["nonce1", "nonce3", "missing"])
+        self.assertEqual(verify.call_count, 2)
+        self.assertEqual(sorted(found), ["nonce1", "nonce3"])
+        self.assertTrue(found["nonce1"]["verified"])
+        self.assertFalse(found["nonce1"]["is_read"])
+        self.assertTrue(found["nonce3"]["is_read"])
+        self.assertEqual(found["nonce3"]["received_at"], 1003.0)
+
+        entry = get_entry_by_nonce("nonce2")
+        self.assertEqual(entry, read_inbox()[2])
+        self.assertIsNone(get_entry_by_nonce("missing"))
+
     def test_count(self) -> None:
         ident = AgentIdentity.generate()
         text = encode_envelope(
@@ -3,6 +3,7 @@ import tempfile
 import time
 import unittest
 from pathlib import Path
+from unittest import mock
 
 from beacon_skill.insights import InsightsManager
 
@@ -59,6 +60,82 @@ class TestInsights(unittest.TestCase):
         self.assertEqual(timing["total_messages"], 5)
         self.assertGreater(timing["confidence"], 0)
 
+    def test_contact_timing_skips_corrupt_lines(self):
+        ts = time.time()
+        good = json.dumps({"received_at": ts, "envelopes": [{"agent_id": "bcn_bob", "ts": ts}]})
+        (self.data_dir / "inbox.jsonl").write_text(good + "\n{not json\n\n" + good + "\n")
+
+        mgr = InsightsManager(data_dir=self.data_dir)
+        timings = mgr._compute_contact_timings()
+        self.assertEqual(timings["bcn_bob"]["total_messages"], 2)
+        self.assertEqual(timings["bcn_bob"]["best_hour"], time.localtime(ts).tm_hour)
+
+    def test_contact_timing_folds_only_appended_lines(self):
+        ts = time.time()
+        line = json.dumps({"received_at": ts, "envelopes": [{"agent_id": "bcn_bob", "ts": ts}]}) + "\n"
+        path = self.data_dir / "inbox.jsonl"
+        path.write_text(line * 2)
+
+        mgr = InsightsManager(data_dir=self.data_dir)
+        self.assertEqual(mgr._compute_contact_timings()["bcn_bob"]["total_messages"], 2)
+
+        # Appended lines are folded in; a partial trailing line waits
+        with path.open("a") as f:
+            f.write(line + line[:10])
+        self.assertEqual(mgr._compute_contact_timings()["bcn_bob"]["total_messages"], 3)
+        with path.open("a") as f:
+            f.write(line[10:])
+        self.assertEqual(mgr._compute_contact_timings()["bcn_bob"]["total_messages"], 4)
+
+        index = json.loads((self.data_dir / "insights_index.json").read_text())
+        self.assertEqual(index["offset"], path.stat().st_size)
+
+        # A truncated file is re-read from the start
+        path.write_text(line)
+        self.assertEqual(mgr._compute_contact_timings()["bcn_bob"]["total_messages"], 1)
+
+    def test_contact_timing_refolds_replaced_inbox(self):
+        ts = time.time()
+
+        def line(agent_id):
+            return json.dumps({"received_at": ts, "envelopes": [{"agent_id": agent_id, "ts": ts}]}) + "\n"
+
+        path = self.data_dir / "inbox.jsonl"
+        path.write_text(line("old-agent") * 2)
+        mgr = InsightsManager(data_dir=self.data_dir)
+        self.assertIn("old-agent", mgr._compute_contact_timings())
+
+        # Deleting the inbox persists the reset
+        path.unlink()
+        self.assertEqual(mgr._compute_contact_timings(), {})
+        index = json.loads((self.data_dir / "insights_index.json").read_text())
+        self.assertEqual(index["offset"], 0)
+
+        # A new inbox that grows past the old offset is folded from the start
+        path.write_text(line("old-agent") * 2)
+        mgr._compute_contact_timings()
+        path.unlink()
+        path.write_text(line("new-agent") * 3)
+        timings = mgr._compute_contact_timings()
+        self.assertNotIn("old-agent", timings)
+        self.assertEqual(timings["new-agent"]["total_messages"], 3)
+
+    def test_contact_timing_hours_match_localtime(self):
+        base = 1_700_000_000
+        stamps = [base + i * 1234 for i in range(40)]
+        self._write_jsonl("inbox.jsonl", [
+            {"received_at": ts, "envelopes": [{"agent_id": "bcn_eve", "ts": ts}]}
+            for ts in stamps
+        ])
+        expected = {}
+        for ts in stamps:
+            hour = time.localtime(ts).tm_hour
+            expected[hour] = expected.get(hour, 0) + 1
+
+        mgr = InsightsManager(data_dir=self.data_dir)
+        hours = mgr._contact_hours()["bcn_eve"]
+        self.assertEqual(dict(hours), expected)
+
     def test_contact_timing_nonexistent(self):
         mgr = InsightsManager(data_dir=self.data_dir)
         self.assertIsNone(mgr.contact_timing("bcn_nobody"))
@@ -87,6 +164,30 @@ class TestInsights(unittest.TestCase):
         self.assertIn("python", trends)
         self.assertEqual(trends["python"]["direction"], "falling")
 
+    def test_analyze_reads_inbox_once(self):
+        now = time.time()
+        entries = [
+            {"received_at": now - i * 3600,
+             "envelopes": [{"agent_id": f"bcn_{i % 3}", "ts": now - i * 3600, "topics": [f"t{i % 4}"]}]}
+            for i in range(30)
+        ]
+        self._write_jsonl("inbox.jsonl", entries[:20])
+        mgr = InsightsManager(data_dir=self.data_dir)
+        mgr.analyze(force=True)  # leaves a contact-hour offset behind
+        with (self.data_dir / "inbox.jsonl").open("a") as f:
+            for entry in entries[20:]:
+                f.write(json.dumps(entry) + "\n")
+
+        with mock.patch.object(InsightsManager, "_stream_jsonl") as stream:
+            result = mgr.analyze(force=True)
+        stream.assert_not_called()
+
+        (self.data_dir / "insights_index.json").unlink()
+        fresh = InsightsManager(data_dir=self.data_dir)
+        self.assertEqual(result["contact_timings"], fresh._compute_contact_timings())
+        self.assertEqual(result["topic_trends"], fresh._compute_topic_trends())
+        self.assertEqual(result["contact_timings"]["bcn_0"]["total_messages"], 10)
+
     def test_success_patterns(self):
         tasks = [
             {"state": "paid", "topics": ["rust"], "text": "build rust thing"},
@@ -3,7 +3,9 @@ import tempfile
 import time
 import unittest
 from pathlib import Path
+from unittest import mock
 
+from beacon_skill import storage
 from beacon_skill.journal import JournalManager, VALID_MOODS
 
 
@@ -73,6 +75,34 @@ class TestJournal(unittest.TestCase):
         results = mgr.search("math")
         self.assertEqual(len(results), 2)
 
+    def test_tags_normalized_on_write(self):
+        mgr = JournalManager(data_dir=self.data_dir)
+        entry = mgr.write("Entry", tags=["  Math ", "ZK", " "])
+        self.assertEqual(entry["tags"], ["math", "zk"])
+        self.assertEqual(len(mgr.search("MATH")), 1)
+        self.assertEqual(mgr.recent_tags(), [("math", 1), ("zk", 1)])
+
+    def test_search_prefilter_has_no_false_negatives(self):
+        mgr = JournalManager(data_dir=self.data_dir)
+        mgr.write('Quoted "Zebra" line')
+        mgr.write("Zebra\tcrossing")           # escaped tab
+        mgr.write("Café zebra")               # non-ASCII text
+        mgr.write("unrelated", tags=["ZEBRA"])
+        mgr.write("nothing here")
+        self.assertEqual(len(mgr.search("zebra")), 4)
+        self.assertEqual(len(mgr.search("CAFÉ")), 1)
+        self.assertEqual(len(mgr.search('"zebra"')), 1)
+
+
+    def test_search_skips_parsing_plain_misses(self):
+        mgr = JournalManager(data_dir=self.data_dir)
+        for i in range(5):
+            mgr.write(f"Plain entry {i}", tags=["misc"])
+        with mock.patch("beacon_skill.storage._loads", wraps=storage._loads) as loads:
+            results = mgr.search("ENTRY 3")
+        self.assertEqual([e["text"] for e in results], ["Plain entry 3"])
+        self.assertEqual(loads.call_count, 1)
+
     def test_moods_distribution(self):
         mgr = JournalManager(data_dir=self.data_dir)
         mgr.write("A", mood="curious")
@@ -102,6 +132,19 @@ class TestJournal(unittest.TestCase):
         mgr.write("Two")
         self.assertEqual(mgr.count(), 2)
 
+    def test_readers_skip_blank_and_corrupt_lines(self):
+        mgr = JournalManager(data_dir=self.data_dir)
+        mgr.write("Café notes", tags=["food"], mood="grateful")
+        with (self.data_dir / "journal.jsonl").open("a", encoding="utf-8") as f:
+            f.write("\n{truncated\n")
+        mgr.write("Second", tags=["food"])
+
+        self.assertEqual([e["text"] for e in mgr.read()], ["Second", "Café notes"])
+        self.assertEqual(len(mgr.search("café")), 1)
+        self.assertEqual(mgr.moods(), {"grateful": 1})
+        self.assertEqual(mgr.recent_tags(), [("food", 2)])
+        self.assertEqual(mgr.count(), 3)  # counts non-blank lines, as before
+
     def test_auto_journal_bounty(self):
         mgr = JournalManager(data_dir=self.data_dir)
         # Below threshold — should not journal
@@ -121,6 +164,17 @@ class TestJournal(unittest.TestCase):
         self.assertIn("completed", entry["tags"])
         self.assertEqual(entry["mood"], "satisfied")
 
+    def test_buffered_writes_append_once(self):
+        mgr = JournalManager(data_dir=self.data_dir, flush_interval_s=3600)
+        mgr.write("First")   # first entry writes immediately
+        mgr.write("Second")  # within the interval: buffered
+        mgr.write("Third")
+        other = JournalManager(data_dir=self.data_dir)
+        self.assertEqual(other.count(), 1)
+
+        self.assertEqual(mgr.count(), 3)  # reads flush the buffer first
+        self.assertEqual([e["text"] for e in other.read()], ["Third", "Second", "First"])
+
     def test_persistence(self):
         mgr1 = JournalManager(data_dir=self.data_dir)
         mgr1.write("Persisted entry", tags=["test"])
@@ -4,7 +4,7 @@ import time
 import unittest
 from pathlib import Path
 
-from beacon_skill.matchmaker import MatchmakerManager
+from beacon_skill.matchmaker import MatchmakerManager, normalize_roster
 
 
 class TestMatchmaker(unittest.TestCase):
@@ -42,6 +42,17 @@ class TestMatchmaker(unittest.TestCase):
         matches = mgr.scan_roster(roster, my_agent_id="bcn_me", goals=goals)
         self.assertTrue(len(matches) >= 1)
 
+    def test_scan_roster_goal_keywords_across_goals(self):
+        mgr = MatchmakerManager(data_dir=self.data_dir)
+        roster = [{"agent_id": "bcn_t", "topics": ["Lean", "Z3"], "curiosities": ["proofs"]}]
+        goals = [{"title": "Learn Z3"}, {"title": ""}, {"state": "active"}, {"title": "Write  proofs in lean"}]
+        matches = mgr.scan_roster(roster, my_agent_id="bcn_me", goals=goals)
+        self.assertEqual(len(matches), 1)
+        self.assertEqual(matches[0]["score"], 0.6)
+        reason = matches[0]["reasons"][0]
+        self.assertTrue(reason.startswith("goal-related: "))
+        self.assertEqual(set(reason[len("goal-related: "):].split(", ")), {"z3", "lean", "proofs"})
+
     def test_can_contact_cooldown(self):
         mgr = MatchmakerManager(data_dir=self.data_dir)
         self.assertTrue(mgr.can_contact("bcn_alice"))
@@ -49,6 +60,15 @@ class TestMatchmaker(unittest.TestCase):
         self.assertFalse(mgr.can_contact("bcn_alice"))  # Just contacted
         self.assertTrue(mgr.can_contact("bcn_alice", cooldown_s=0))  # No cooldown
 
+    def test_can_contact_many(self):
+        mgr = MatchmakerManager(data_dir=self.data_dir)
+        mgr.record_contact("bcn_alice")
+        mgr._history["bcn_old"] = time.time() - 2 * 86400
+        ids = ["bcn_alice", "bcn_old", "bcn_new"]
+        self.assertEqual(mgr.can_contact_many(ids), {"bcn_old", "bcn_new"})
+        self.assertEqual(mgr.can_contact_many(ids), {a for a in ids if mgr.can_contact(a)})
+        self.assertEqual(mgr.can_contact_many(ids, cooldown_s=0), set(ids))
+
     def test_record_contact_persistence(self):
         mgr1 = MatchmakerManager(data_dir=self.data_dir)
         mgr1.record_contact("bcn_alice")
@@ -56,6 +76,31 @@ class TestMatchmaker(unittest.TestCase):
         mgr2 = MatchmakerManager(data_dir=self.data_dir)
         self.assertFalse(mgr2.can_contact("bcn_alice"))
 
+    def test_record_contact_appends_without_rewriting_snapshot(self):
+        mgr = MatchmakerManager(data_dir=self.data_dir)
+        mgr.record_contact("bcn_alice")
+        mgr.record_contact("bcn_bob")
+        self.assertFalse((self.data_dir / "match_history.json").exists())
+        log = (self.data_dir / "match_history.log").read_text().splitlines()
+        self.assertEqual([json.loads(line)["agent_id"] for line in log], ["bcn_alice", "bcn_bob"])
+
+        reloaded = MatchmakerManager(data_dir=self.data_dir)
+        self.assertFalse(reloaded.can_contact("bcn_alice"))
+        self.assertFalse(reloaded.can_contact("bcn_bob"))
+
+    def test_history_log_compacts_into_snapshot(self):
+        from beacon_skill import matchmaker
+        mgr = MatchmakerManager(data_dir=self.data_dir)
+        for i in range(matchmaker.HISTORY_COMPACT_MIN):
+            mgr.record_contact(f"bcn_{i % 3}")
+        snapshot = json.loads((self.data_dir / "match_history.json").read_text())
+        self.assertEqual(sorted(snapshot), ["bcn_0", "bcn_1", "bcn_2"])
+        self.assertEqual((self.data_dir / "match_history.log").read_bytes(), b"")
+
+        mgr.record_contact("bcn_new")
+        reloaded = MatchmakerManager(data_dir=self.data_dir)
+        self.assertEqual(reloaded._history, mgr._history)
+
     def test_record_response(self):
         mgr = MatchmakerManager(data_dir=self.data_dir)
         mgr.record_response("m_001", "interested")
@@ -110,6 +155,21 @@ class TestMatchmaker(unittest.TestCase):
         self.assertEqual(matches[0]["agent_id"], "bcn_aligned")
         self.assertEqual(matches[0]["compatibility"], 1.0)
 
+    def test_match_compatibility_hashes_own_values_once(self):
+        from unittest import mock
+        values = mock.Mock()
+        values.values_hash.return_value = "h1"
+        mgr = MatchmakerManager(data_dir=self.data_dir, values_mgr=values)
+        roster = [{"agent_id": f"bcn_{i}", "values_hash": "h1" if i % 2 else "h2"} for i in range(6)]
+        roster.append({"agent_id": "bcn_unpublished"})
+        matches = mgr.match_compatibility(roster)
+        self.assertEqual(len(matches), 6)
+        self.assertEqual(values.values_hash.call_count, 1)
+        # Aligned agents first, each group in roster order
+        self.assertEqual([m["agent_id"] for m in matches],
+                         ["bcn_1", "bcn_3", "bcn_5", "bcn_0", "bcn_2", "bcn_4"])
+        self.assertEqual([m["method"] for m in matches], ["hash_match"] * 3 + ["hash_differs"] * 3)
+
     def test_match_compatibility_no_manager(self):
         mgr = MatchmakerManager(data_dir=self.data_dir)
         self.assertEqual(mgr.match_compatibility([]), [])
@@ -128,6 +188,70 @@ class TestMatchmaker(unittest.TestCase):
         self.assertIn("bcn_a", [top["agent_a"], top["agent_b"]])
         self.assertIn("bcn_b", [top["agent_a"], top["agent_b"]])
 
+    def test_suggest_introductions_matches_pairwise_scan(self):
+        mgr = MatchmakerManager(data_dir=self.data_dir)
+        skills = ["rust", "Python", "z3", "cooking", "lean"]
+        roster = [
+            {
+                "agent_id": f"bcn_{i}",
+                "offers": [skills[i % 5], skills[(i * 3) % 5]],
+                "needs": [skills[(i + 2) % 5].upper()],
+            }
+            for i in range(12)
+        ]
+        roster.append({"agent_id": "bcn_loner", "offers": [], "needs": ["gardening"]})
+
+        expected = []
+        for i, a in enumerate(roster):
+            for b in roster[i + 1:]:
+                a_off = {o.lower() for o in a["offers"]}
+                a_need = {n.lower() for n in a["needs"]}
+                b_off = {o.lower() for o in b["offers"]}
+                b_need = {n.lower() for n in b["needs"]}
+                if (a_off & b_need) or (b_off & a_need):
+                    expected.append((a["agent_id"], b["agent_id"],
+                                     sorted(a_off & b_need), sorted(b_off & a_need)))
+
+        intros = mgr.suggest_introductions(roster)
+        got = [(x["agent_a"], x["agent_b"], x["a_gives_b"], x["b_gives_a"]) for x in intros]
+        self.assertEqual(sorted(got), sorted(expected))
+        scores = [x["score"] for x in intros]
+        self.assertEqual(scores, sorted(scores, reverse=True))
+
+    def test_suggest_introductions_skips_repeated_pairs(self):
+        mgr = MatchmakerManager(data_dir=self.data_dir)
+        a = {"agent_id": "bcn_a", "offers": ["rust"], "needs": ["python"]}
+        b = {"agent_id": "bcn_b", "offers": ["python"], "needs": ["rust"]}
+        intros = mgr.suggest_introductions([a, b, a, b])
+        pairs = [(x["agent_a"], x["agent_b"]) for x in intros]
+        self.assertEqual(pairs.count(("bcn_a", "bcn_b")), 1)
+        self.assertEqual(pairs.count(("bcn_b", "bcn_a")), 1)
+        self.assertEqual(len(pairs), 2)
+
+    def test_normalized_roster_reused_across_scans(self):
+        from beacon_skill.curiosity import CuriosityManager
+        curiosity = CuriosityManager(data_dir=self.data_dir)
+        curiosity.add("z3")
+        mgr = MatchmakerManager(data_dir=self.data_dir, curiosity_mgr=curiosity)
+        roster = [
+            {"agent_id": "bcn_a", "name": "A", "offers": ["Rust"], "needs": ["PYTHON"],
+             "topics": ["Lean"], "curiosities": ["Z3"]},
+            {"agent_id": "bcn_b", "offers": ["python"], "needs": ["rust", "Rust"]},
+        ]
+        agents = normalize_roster(roster)
+        self.assertEqual(agents[0].offers, frozenset({"rust"}))
+        self.assertEqual(agents[1].needs, frozenset({"rust"}))
+
+        self.assertEqual(
+            mgr.scan_roster([], my_agent_id="bcn_me", my_needs=["rust"], agents=agents),
+            mgr.scan_roster(roster, my_agent_id="bcn_me", my_needs=["rust"]),
+        )
+        self.assertEqual(mgr.match_demand([], {"rust": 3}, agents=agents),
+                         mgr.match_demand(roster, {"rust": 3}))
+        self.assertEqual(mgr.match_curiosity([], agents=agents), mgr.match_curiosity(roster))
+        self.assertEqual(mgr.suggest_introductions([], agents=agents),
+                         mgr.suggest_introductions(roster))
+
     def test_match_history_log(self):
         mgr = MatchmakerManager(data_dir=self.data_dir)
         mgr.record_contact("bcn_a", "m_001")
@@ -139,6 +263,29 @@ class TestMatchmaker(unittest.TestCase):
         # Most recent first
         self.assertEqual(history[0]["action"], "response")
 
+    def test_match_history_log_reads_tail(self):
+        mgr = MatchmakerManager(data_dir=self.data_dir)
+        for i in range(30):
+            mgr.record_response(f"m_{i:03d}", "ok")
+        with (self.data_dir / "matches.jsonl").open("a") as f:
+            f.write("{corrupt\n")
+        history = mgr.match_history_log(limit=5)
+        self.assertEqual([h["match_id"] for h in history],
+                         ["m_029", "m_028", "m_027", "m_026", "m_025"])
+        self.assertEqual(len(mgr.match_history_log(limit=100)), 30)
+
+    def test_buffered_match_log(self):
+        mgr = MatchmakerManager(data_dir=self.data_dir, flush_interval_s=3600)
+        mgr.record_response("m_001", "ok")  # first record flushes immediately
+        mgr.record_response("m_002", "ok")
+        mgr.record_response("m_003", "ok")
+        path = self.data_dir / "matches.jsonl"
+        self.assertEqual(len(path.read_text().splitlines()), 1)
+
+        history = mgr.match_history_log()  # reads flush the buffer first
+        self.assertEqual([h["match_id"] for h in history], ["m_003", "m_002", "m_001"])
+        self.assertEqual(len(path.read_text().splitlines()), 3)
+
     def test_scan_empty_roster(self):
         mgr = MatchmakerManager(data_dir=self.data_dir)
         matches = mgr.scan_roster([], my_agent_id="bcn_me")
@@ -76,6 +76,16 @@ class TestBuildMayday:
         payload = mgr.build_mayday(mock_identity, config=cfg)
         assert payload["name"] == "sophia-elya"
 
+    def test_content_hash_over_ascii_canonical_form(self, mgr, mock_identity):
+        import hashlib
+        cfg = {"beacon": {"agent_name": "Søren ✈"}}
+        payload = mgr.build_mayday(mock_identity, reason="déménagement", config=cfg)
+        content = json.dumps(
+            {k: v for k, v in payload.items() if k != "content_hash"},
+            sort_keys=True, separators=(",", ":"),
+        )
+        assert payload["content_hash"] == hashlib.sha256(content.encode()).hexdigest()[:32]
+
 
 class TestProcessMayday:
     def test_process_and_retrieve(self, mgr):
@@ -96,6 +106,35 @@ class TestProcessMayday:
         assert len(received) == 1
         assert received[0]["agent_id"] == "bcn_emigrant1234"
 
+    def test_logged_entry_fields(self, mgr):
+        envelope = {
+            "kind": "mayday",
+            "agent_id": "bcn_full",
+            "trust_snapshot": [],
+            "values_hash": "abc",
+            "extra": {"nested": [1, 2]},
+        }
+        mgr.process_mayday(envelope)
+        mgr.process_mayday({"kind": "mayday"})
+        bare, full = mgr.received_maydays()
+        assert bare["agent_id"] == "unknown"
+        assert bare["urgency"] == "unknown"
+        assert not any(bare[k] for k in ("has_trust", "has_contacts", "has_goals",
+                                         "has_journal", "has_values"))
+        assert full["has_trust"] and full["has_values"]
+        assert not (full["has_contacts"] or full["has_goals"] or full["has_journal"])
+        assert full["name"] == full["reason"] == full["content_hash"] == ""
+        assert full["envelope"] == envelope
+
+    def test_process_envelope_with_wide_integer(self, mgr):
+        # Peer payloads may carry integers wider than orjson can encode
+        envelope = {"kind": "mayday", "agent_id": "bcn_big", "nonce": 2 ** 70, "ts": 1}
+        result = mgr.process_mayday(envelope)
+        assert result["agent_id"] == "bcn_big"
+        entry = mgr.get_mayday("bcn_big")
+        assert entry is not None
+        assert entry["envelope"]["ts"] == 1
+
     def test_get_specific_mayday(self, mgr):
         for i in range(3):
             mgr.process_mayday({
@@ -110,11 +149,78 @@ class TestProcessMayday:
     def test_get_nonexistent_returns_none(self, mgr):
         assert mgr.get_mayday("bcn_nope") is None
 
+    def test_get_mayday_returns_latest_via_index(self, mgr, tmp_dir):
+        mgr.process_mayday({"kind": "mayday", "agent_id": "bcn_a", "reason": "first"})
+        mgr.process_mayday({"kind": "mayday", "agent_id": "bcn_b"})
+        assert mgr.get_mayday("bcn_a")["reason"] == "first"
+        assert (tmp_dir / "mayday_index.json").exists()
+
+        # Records appended after the index was written are picked up
+        mgr.process_mayday({"kind": "mayday", "agent_id": "bcn_a", "reason": "second"})
+        assert mgr.get_mayday("bcn_a")["reason"] == "second"
+        assert mgr.get_mayday("bcn_b")["agent_id"] == "bcn_b"
+
+    def test_get_mayday_reindexes_replaced_log(self, mgr, tmp_dir):
+        for i in range(3):
+            mgr.process_mayday({"kind": "mayday", "agent_id": f"bcn_{i}"})
+        assert mgr.get_mayday("bcn_2") is not None
+        (tmp_dir / "mayday_log.jsonl").write_text("")
+        mgr.process_mayday({"kind": "mayday", "agent_id": "bcn_new"})
+        assert mgr.get_mayday("bcn_2") is None
+        assert mgr.get_mayday("bcn_new")["agent_id"] == "bcn_new"
+
+    def test_get_mayday_after_log_replaced_and_regrown(self, mgr, tmp_dir):
+        log = tmp_dir / "mayday_log.jsonl"
+        for aid in ("aaa", "old"):
+            mgr.process_mayday({"kind": "mayday", "agent_id": aid})
+        assert mgr.get_mayday("old")["agent_id"] == "old"
+
+        log.unlink()
+        assert mgr.get_mayday("old") is None
+        assert json.loads((tmp_dir / "mayday_index.json").read_text())["agents"] == {}
+
+        for aid in ("xxx", "yyy", "zzz"):
+            mgr.process_mayday({"kind": "mayday", "agent_id": aid})
+        assert mgr.get_mayday("old") is None
+        assert mgr.get_mayday("xxx")["agent_id"] == "xxx"
+        assert mgr.get_mayday("yyy")["agent_id"] == "yyy"
+
+    def test_get_mayday_rewritten_log_of_same_size(self, mgr, tmp_dir):
+        for aid in ("bcn_aa", "bcn_bb"):
+            mgr.process_mayday({"kind": "mayday", "agent_id": aid, "received": 1})
+        assert mgr.get_mayday("bcn_bb") is not None
+        log = tmp_dir / "mayday_log.jsonl"
+        # Same length, different records: only the identity check notices
+        log.write_bytes(log.read_bytes().replace(b"bcn_aa", b"bcn_cc").replace(b"bcn_bb", b"bcn_aa"))
+        assert mgr.get_mayday("bcn_bb") is None
+        assert mgr.get_mayday("bcn_aa")["agent_id"] == "bcn_aa"
+        assert mgr.get_mayday("bcn_cc")["agent_id"] == "bcn_cc"
+
     def test_limit_works(self, mgr):
         for i in range(10):
             mgr.process_mayday({"kind": "mayday", "agent_id": f"bcn_{i}"})
         assert len(mgr.received_maydays(limit=3)) == 3
 
+    def test_received_returns_newest_tail(self, mgr, tmp_dir):
+        for i in range(5):
+            mgr.process_mayday({"kind": "mayday", "agent_id": f"bcn_{i}"})
+        with (tmp_dir / "mayday_log.jsonl").open("a") as f:
+            f.write("{not json\n\n")
+        received = mgr.received_maydays(limit=2)
+        assert [e["agent_id"] for e in received] == ["bcn_4", "bcn_3"]
+        assert mgr.received_maydays(limit=0) == []
+
+    def test_buffered_log(self, tmp_dir):
+        mgr = MaydayManager(data_dir=tmp_dir, flush_interval_s=3600)
+        for i in range(3):
+            mgr.process_mayday({"kind": "mayday", "agent_id": f"bcn_{i}"})
+        log = tmp_dir / "mayday_log.jsonl"
+        assert len(log.read_text().splitlines()) == 1
+        assert mgr.get_mayday("bcn_2") is not None
+        mgr.process_mayday({"kind": "mayday", "agent_id": "bcn_3"})
+        mgr.flush()
+        assert len(log.read_text().splitlines()) == 4
+
 
 class TestHostingOffers:
     def test_offer_and_retrieve(self, mgr):
@@ -173,6 +279,66 @@ class TestBuildBundle:
         assert "rustchain" in bundle["protocols"]["transports"]
         assert "python" in bundle["protocols"]["offers"]
 
+    def test_bundle_fetches_subsystems_concurrently(self, mgr, mock_identity):
+        import time
+
+        def slow(value):
+            def fetch(*args, **kwargs):
+                time.sleep(0.3)
+                return value
+            return fetch
+
+        goals = MagicMock()
+        goals.active_goals.side_effect = slow([{"id": "g1", "title": "Move", "progress": 10}])
+        journal = MagicMock()
+        journal.recent.side_effect = slow([{"ts": 1, "text": "bye", "mood": "anxious"}])
+        start = time.monotonic()
+        bundle = mgr.build_bundle(mock_identity, goal_mgr=goals, journal_mgr=journal)
+        assert time.monotonic() - start < 0.55
+        assert bundle["active_goals"][0]["id"] == "g1"
+        assert bundle["journal_digest"][0]["text"] == "bye"
+
+    def test_bundle_skips_failed_and_overdue_subsystems(self, mgr, mock_identity, monkeypatch):
+        import threading
+        from beacon_skill import mayday
+        monkeypatch.setattr(mayday, "GATHER_TIMEOUT_S", 0.1)
+        release = threading.Event()
+        goals = MagicMock()
+        goals.active_goals.side_effect = lambda: release.wait(5) and []
+        trust = MagicMock()
+        trust.scores.return_value = [{"agent_id": "bcn_peer", "score": 0.9, "total": 4}]
+        trust.blocked_list.side_effect = RuntimeError("boom")
+        try:
+            bundle = mgr.build_bundle(mock_identity, goal_mgr=goals, trust_mgr=trust)
+            # The overdue worker must not keep the interpreter alive at exit
+            hung = [t for t in threading.enumerate() if t.name == "beacon-mayday-goal_mgr"]
+            assert hung and all(t.daemon for t in hung)
+        finally:
+            release.set()
+        assert "active_goals" not in bundle
+        assert "blocked_agents" not in bundle
+        assert bundle["trust_snapshot"][0]["agent_id"] == "bcn_peer"
+
+    def test_bundle_takes_one_managers_snapshots_in_turn(self, mgr, mock_identity):
+        import threading
+        import time
+        callers = []
+
+        def record(value):
+            def fetch(*args, **kwargs):
+                callers.append(threading.get_ident())
+                time.sleep(0.05)
+                return value
+            return fetch
+
+        trust = MagicMock()
+        trust.scores.side_effect = record([{"agent_id": "bcn_peer", "score": 0.9, "total": 4}])
+        trust.blocked_list.side_effect = record({"bcn_spam": {}})
+        bundle = mgr.build_bundle(mock_identity, trust_mgr=trust)
+        assert len(callers) == 2 and callers[0] == callers[1]
+        assert bundle["trust_snapshot"][0]["agent_id"] == "bcn_peer"
+        assert bundle["blocked_agents"] == ["bcn_spam"]
+
     def test_bundle_hash_integrity(self, mgr, mock_identity):
         bundle = mgr.build_bundle(mock_identity, reason="integrity test")
         content = json.dumps(
@@ -195,6 +361,16 @@ class TestBuildManifest:
         assert manifest["bundle_size"] > 0
         assert "ts" in manifest
 
+    def test_broadcast_size_matches_encoded_bundle(self, mgr, mock_identity):
+        trust = MagicMock()
+        trust.scores.return_value = [{"agent_id": "bcn_ü", "score": 0.9, "total": 3}]
+        trust.blocked_list.return_value = {}
+        result = mgr.broadcast(mock_identity, reason="größe", dry_run=True, trust_mgr=trust)
+        bundle = mgr.build_bundle(mock_identity, reason="größe", trust_mgr=trust)
+        encoded = json.dumps(bundle, sort_keys=True, separators=(",", ":")).encode()
+        assert result["manifest"]["bundle_size"] == len(encoded)
+        assert mgr.build_manifest(bundle)["bundle_size"] == len(encoded)
+
     def test_manifest_urgency(self, mgr, mock_identity):
         bundle = mgr.build_bundle(mock_identity)
         manifest = mgr.build_manifest(bundle, urgency=URGENCY_EMERGENCY)
@@ -209,6 +385,24 @@ class TestSaveBundle:
         saved = json.loads(path.read_text())
         assert saved["agent_id"] == "bcn_test12345678"
 
+    def test_save_compact_unless_pretty(self, mgr, mock_identity):
+        bundle = mgr.build_bundle(mock_identity, reason="format")
+        compact = mgr.save_bundle(bundle).read_text()
+        assert "\n" not in compact
+        pretty = mgr.save_bundle(bundle, pretty=True).read_text()
+        assert pretty.startswith("{\n  ")
+        assert json.loads(compact) == json.loads(pretty) == bundle
+
+    def test_save_failure_keeps_previous_bundle(self, mgr, mock_identity):
+        from unittest.mock import patch
+        bundle = mgr.build_bundle(mock_identity, reason="first")
+        path = mgr.save_bundle(bundle)
+        with patch("os.fsync", side_effect=OSError("disk gone")):
+            with pytest.raises(OSError):
+                mgr.save_bundle({**bundle, "reason": "second"})
+        assert json.loads(path.read_text())["reason"] == "first"
+        assert list(path.parent.glob("*.tmp")) == []
+
 
 class TestBroadcast:
     def test_broadcast_saves_bundle(self, mgr, mock_identity):
@@ -253,3 +447,22 @@ class TestHealthCheck:
     def test_health_has_disk_info(self, mgr):
         health = mgr.health_check()
         assert "disk_free_mb" in health["indicators"]
+
+    def test_health_reads_mem_available(self, mgr, monkeypatch):
+        import io
+        from beacon_skill import mayday
+
+        def fake_meminfo(text):
+            monkeypatch.setattr(mayday, "open", lambda *a, **k: io.BytesIO(text), raising=False)
+
+        fake_meminfo(b"MemTotal: 8000000 kB\nMemFree: 10 kB\nMemAvailable:   51200 kB\n")
+        health = mgr.health_check()
+        assert health["indicators"]["mem_free_mb"] == 50
+        assert health["score"] <= 0.7
+
+        # Found past the first short read
+        fake_meminfo(b"X: 1 kB\n" * 40 + b"MemAvailable: 2048000 kB\n")
+        assert mgr.health_check()["indicators"]["mem_free_mb"] == 2000
+
+        fake_meminfo(b"MemTotal: 8000000 kB\nMemFree: 10 kB\n")
+        assert "mem_free_mb" not in mgr.health_check()["indicators"]